@@ -0,0 +1,397 @@
+# SPDX-FileCopyrightText: 2024 EasyCrystallography contributors
+# SPDX-License-Identifier: BSD-3-Clause
+# © 2022-2024 Contributors to the EasyCrystallography project <https://github.com/EasyScience/EasyCrystallography>
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Union
+
+import numpy as np
+
+from .Site import Atoms
+from .Site import PeriodicAtoms
+from .Site import Site
+
+if TYPE_CHECKING:
+    from .Lattice import PeriodicLattice
+
+# Parameters of each displacement and susceptibility type, in the order of `get_parameters`
+ADP_PARAMETERS = {
+    'Uiso': ('Uiso',),
+    'Biso': ('Biso',),
+    'Uani': ('U_11', 'U_12', 'U_13', 'U_22', 'U_23', 'U_33'),
+    'Bani': ('B_11', 'B_12', 'B_13', 'B_22', 'B_23', 'B_33'),
+}
+MSP_PARAMETERS = {
+    'Ciso': ('chi',),
+    'Cani': ('chi_11', 'chi_12', 'chi_13', 'chi_22', 'chi_23', 'chi_33'),
+}
+
+
+class AtomsTable:
+    """
+    The sites of a structure as columns of contiguous arrays, one row per site, for bulk work which does not refine
+    anything. Parameter values are kept, the other properties of the parameters (errors, bounds, fixed) are not.
+
+    Displacements and susceptibilities are stored as the type of each site with the values of its parameters, in
+    the order of `ADP_PARAMETERS` and `MSP_PARAMETERS`. Unused columns are NaN, sites without a susceptibility have
+    an empty type.
+
+    Rows are read as `SiteRecord`s, which create the refinable `Site` of their row only when it is needed.
+    """
+
+    def __init__(
+        self,
+        labels: Sequence[str],
+        species: Sequence[str],
+        fract_coords: np.ndarray,
+        occupancies: Optional[np.ndarray] = None,
+        adp_types: Optional[Sequence[str]] = None,
+        adp_values: Optional[np.ndarray] = None,
+        msp_types: Optional[Sequence[str]] = None,
+        msp_values: Optional[np.ndarray] = None,
+    ):
+        """
+        Create a table from its columns. Arrays which are already contiguous and of the right type are used without
+        a copy.
+
+        :param labels: (N,) labels of the sites
+        :param species: (N,) species of the sites, e.g. `Fe3+`
+        :param fract_coords: (N, 3) fractional coordinates
+        :param occupancies: (N,) occupancies. Default 1
+        :param adp_types: (N,) displacement types. Default `Uiso`
+        :param adp_values: (N, 6) displacement parameters. Default 0
+        :param msp_types: (N,) susceptibility types, empty for none. Default none
+        :param msp_values: (N, 6) susceptibility parameters. Default NaN
+        """
+        self.labels = np.asarray(labels, dtype=str).reshape(-1)
+        n = len(self.labels)
+        names, codes = np.unique(np.asarray(species, dtype=str).reshape(-1), return_inverse=True)
+        if len(codes) != n:
+            raise ValueError('Every site needs a specie.')
+        self.species_names: List[str] = names.tolist()
+        self.specie_codes = codes.astype(np.int32)
+        self.fract_coords = np.ascontiguousarray(fract_coords, dtype=np.float64).reshape(n, 3)
+        self.occupancies = _column(occupancies, (n,), 1.0)
+        self.adp_types = np.asarray(['Uiso'] * n if adp_types is None else adp_types, dtype=str).reshape(n)
+        self.adp_values = _column(adp_values, (n, 6), np.nan)
+        if adp_values is None:
+            self.adp_values[:, 0] = 0.0
+        self.msp_types = np.asarray([''] * n if msp_types is None else msp_types, dtype=str).reshape(n)
+        self.msp_values = _column(msp_values, (n, 6), np.nan)
+        self._sites: Dict[int, Site] = {}
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __repr__(self) -> str:
+        return f'Table of {len(self)} sites.'
+
+    def __getitem__(self, idx: Union[int, slice, np.ndarray]) -> AtomsTable:
+        """
+        A table of some of the sites. Slices give views onto the arrays of this table.
+        """
+        if isinstance(idx, (int, np.integer)):
+            idx = [idx]
+        return AtomsTable(
+            self.labels[idx],
+            self.species[idx],
+            self.fract_coords[idx],
+            self.occupancies[idx],
+            self.adp_types[idx],
+            self.adp_values[idx],
+            self.msp_types[idx],
+            self.msp_values[idx],
+        )
+
+    @property
+    def species(self) -> np.ndarray:
+        """
+        Specie of each site.
+        """
+        return np.asarray(self.species_names, dtype=str)[self.specie_codes]
+
+    @property
+    def fract_x(self) -> np.ndarray:
+        return self.fract_coords[:, 0]
+
+    @property
+    def fract_y(self) -> np.ndarray:
+        return self.fract_coords[:, 1]
+
+    @property
+    def fract_z(self) -> np.ndarray:
+        return self.fract_coords[:, 2]
+
+    @property
+    def adp_matrices(self) -> np.ndarray:
+        """
+        (N, 3, 3) symmetric displacement tensors. Isotropic types are diagonal.
+        """
+        return _tensors(self.adp_types, self.adp_values)
+
+    @property
+    def msp_matrices(self) -> np.ndarray:
+        """
+        (N, 3, 3) symmetric susceptibility tensors. Isotropic types are diagonal, sites without a susceptibility zero.
+        """
+        return _tensors(self.msp_types, self.msp_values)
+
+    @classmethod
+    def from_atoms(cls, atoms: Iterable[Site]) -> AtomsTable:
+        """
+        Create a table of the values of a collection of sites.
+
+        :param atoms: Sites, e.g. `Atoms` or `PeriodicAtoms`
+        :return: Table of the sites
+        :rtype: AtomsTable
+        """
+        atoms = list(atoms)
+        n = len(atoms)
+        fract_coords = np.empty((n, 3))
+        occupancies = np.empty(n)
+        adp_values = np.full((n, 6), np.nan)
+        msp_values = np.full((n, 6), np.nan)
+        adp_types = []
+        msp_types = []
+        for idx, atom in enumerate(atoms):
+            fract_coords[idx] = (atom.fract_x.value, atom.fract_y.value, atom.fract_z.value)
+            occupancies[idx] = atom.occupancy.value
+            adp_types.append(_read_tensor(getattr(atom, 'adp', None), 'adp', adp_values[idx]))
+            msp_types.append(_read_tensor(getattr(atom, 'msp', None), 'msp', msp_values[idx]))
+        return cls(
+            [atom.label.value for atom in atoms],
+            [str(atom.specie) for atom in atoms],
+            fract_coords,
+            occupancies,
+            adp_types,
+            adp_values,
+            msp_types,
+            msp_values,
+        )
+
+    def record(self, idx: int) -> SiteRecord:
+        """
+        Read-only record of a row of the table.
+
+        :param idx: Row of the site
+        :return: Record of the site
+        :rtype: SiteRecord
+        """
+        if not -len(self) <= idx < len(self):
+            raise IndexError(f'Site {idx} out of range for a table of {len(self)} sites.')
+        return SiteRecord(self, idx % len(self))
+
+    def records(self) -> List[SiteRecord]:
+        """
+        Read-only records of all rows of the table.
+
+        :return: Records of the sites, in the order of the rows
+        :rtype: List[SiteRecord]
+        """
+        return [SiteRecord(self, idx) for idx in range(len(self))]
+
+    def promote(self, idx: int) -> Site:
+        """
+        The refinable site of a row of the table, created from the values of the row on the first request and kept
+        for later requests. Changes to the site are not written back to the table.
+
+        :param idx: Row of the site
+        :return: Site with the values of the row
+        :rtype: Site
+        """
+        site = self._sites.get(idx)
+        if site is None:
+            site = self._sites[idx] = self.to_site(idx)
+        return site
+
+    def to_atoms(self, name: str = 'atoms', lattice: Optional[PeriodicLattice] = None) -> Union[Atoms, PeriodicAtoms]:
+        """
+        Create the sites of the table.
+
+        :param name: Name of the collection
+        :param lattice: Lattice of the sites. If given, `PeriodicAtoms` are created
+        :return: Collection of the sites
+        :rtype: Union[Atoms, PeriodicAtoms]
+        """
+        sites = [self.to_site(idx) for idx in range(len(self))]
+        if lattice is not None:
+            return PeriodicAtoms(name, *sites, lattice=lattice)
+        return Atoms(name, *sites)
+
+    def to_site(self, idx: int) -> Site:
+        """
+        Create the site of a row of the table.
+
+        :param idx: Row of the site
+        :return: Site with the values of the row
+        :rtype: Site
+        """
+        kwargs = {}
+        adp_type = str(self.adp_types[idx])
+        kwargs['adp'] = adp_type
+        kwargs.update(zip(ADP_PARAMETERS[adp_type], self.adp_values[idx].tolist()))
+        msp_type = str(self.msp_types[idx])
+        if msp_type:
+            kwargs['msp'] = msp_type
+            kwargs.update(zip(MSP_PARAMETERS[msp_type], self.msp_values[idx].tolist()))
+        x, y, z = self.fract_coords[idx].tolist()
+        return Site(
+            str(self.labels[idx]),
+            self.species_names[self.specie_codes[idx]],
+            float(self.occupancies[idx]),
+            x,
+            y,
+            z,
+            **kwargs,
+        )
+
+
+# Attributes of a `Site` which a `SiteRecord` gives by creating its site
+_SITE_ATTRIBUTES = frozenset(
+    {
+        'adp',
+        'msp',
+        'x',
+        'y',
+        'z',
+        'b_iso_or_equiv',
+        'u_iso_or_equiv',
+        'is_magnetic',
+        'add_adp',
+        'add_msp',
+        'fract_distance',
+        'name',
+        'unique_name',
+        'interface',
+        'get_parameters',
+        'get_fit_parameters',
+        'as_dict',
+        'encode',
+    }
+)
+
+
+class SiteRecord:
+    """
+    Read-only view of a row of an `AtomsTable`, with the values of a site as plain numbers and strings. A record
+    holds no parameters, the refinable `Site` of the row is created by `site` when it is first needed. The attributes
+    of the site listed in `_SITE_ATTRIBUTES`, e.g. `adp` or `get_parameters`, are those of that site and create it.
+    """
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: AtomsTable, index: int):
+        self._table = table
+        self._index = index
+
+    def __repr__(self) -> str:
+        x, y, z = self.fract_coords
+        return f'Record {self.label} ({self.specie}) @ ({x}, {y}, {z})'
+
+    def __getattr__(self, item: str) -> Any:
+        if item not in _SITE_ATTRIBUTES:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{item}'")
+        return getattr(self.site, item)
+
+    @property
+    def label(self) -> str:
+        return str(self._table.labels[self._index])
+
+    @property
+    def specie(self) -> str:
+        return self._table.species_names[self._table.specie_codes[self._index]]
+
+    @property
+    def occupancy(self) -> float:
+        return float(self._table.occupancies[self._index])
+
+    @property
+    def fract_coords(self) -> np.ndarray:
+        """
+        Read-only view of the fractional coordinates.
+        """
+        coords = self._table.fract_coords[self._index]
+        coords.flags.writeable = False
+        return coords
+
+    @property
+    def fract_x(self) -> float:
+        return float(self._table.fract_coords[self._index, 0])
+
+    @property
+    def fract_y(self) -> float:
+        return float(self._table.fract_coords[self._index, 1])
+
+    @property
+    def fract_z(self) -> float:
+        return float(self._table.fract_coords[self._index, 2])
+
+    @property
+    def adp_type(self) -> str:
+        return str(self._table.adp_types[self._index])
+
+    @property
+    def adp_values(self) -> Dict[str, float]:
+        """
+        Displacement parameters by name.
+        """
+        return dict(zip(ADP_PARAMETERS[self.adp_type], self._table.adp_values[self._index].tolist()))
+
+    @property
+    def msp_type(self) -> str:
+        """
+        Susceptibility type, empty if the site has no susceptibility.
+        """
+        return str(self._table.msp_types[self._index])
+
+    @property
+    def msp_values(self) -> Dict[str, float]:
+        """
+        Susceptibility parameters by name, empty if the site has no susceptibility.
+        """
+        return dict(zip(MSP_PARAMETERS.get(self.msp_type, ()), self._table.msp_values[self._index].tolist()))
+
+    @property
+    def is_promoted(self) -> bool:
+        return self._index in self._table._sites
+
+    @property
+    def site(self) -> Site:
+        """
+        The refinable site of the record, see `AtomsTable.promote`.
+        """
+        return self._table.promote(self._index)
+
+
+def _column(values: Optional[np.ndarray], shape: tuple, default: float) -> np.ndarray:
+    if values is None:
+        return np.full(shape, default)
+    return np.ascontiguousarray(values, dtype=np.float64).reshape(shape)
+
+
+def _read_tensor(component, kind: str, out: np.ndarray) -> str:
+    # Type of a displacement or susceptibility, with its parameter values written to `out`
+    if component is None:
+        return ''
+    values = [p.value for p in getattr(component, f'{kind}_class').get_parameters()]
+    out[: len(values)] = values
+    return getattr(component, f'{kind}_type').value
+
+
+def _tensors(types: np.ndarray, values: np.ndarray) -> np.ndarray:
+    tensors = np.zeros((len(types), 3, 3))
+    anisotropic = np.char.endswith(types, 'ani')
+    isotropic = np.char.endswith(types, 'iso')
+    rows, cols = np.triu_indices(3)
+    tensors[:, rows, cols] = np.where(anisotropic[:, np.newaxis], values, 0)
+    tensors[:, cols, rows] = tensors[:, rows, cols]
+    tensors[isotropic] = values[isotropic, 0, np.newaxis, np.newaxis] * np.eye(3)
+    return tensors
@@ -4,7 +4,6 @@
 
 from __future__ import annotations
 
-import collections
 import itertools
 import math
 import warnings
@@ -12,8 +11,11 @@ from copy import deepcopy
 from fractions import Fraction
 from functools import reduce
 from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
 from typing import ClassVar
 from typing import List
+from typing import NamedTuple
 from typing import Optional
 from typing import Sequence
 from typing import Tuple
@@ -25,7 +27,9 @@ import numpy as np
 from easyscience.Constraints import ObjConstraint
 from easyscience.Objects.ObjectClasses import BaseObj
 from easyscience.Objects.variable import Parameter
-from easyscience.Utils.decorators import memoized
+
+from easycrystallography.Utils.cache import CacheInfo
+from easycrystallography.Utils.cache import LRUCache
 
 from .SpaceGroup import SpaceGroup
 
@@ -56,6 +60,10 @@ CELL_DETAILS = {
     },
 }
 
+# Process-wide cache of lattice matrices, keyed on the six cell parameters. The size can be changed, or the cache
+# disabled with a size of 0, through `LATTICE_MATRIX_CACHE.maxsize`.
+LATTICE_MATRIX_CACHE = LRUCache(maxsize=1024)
+
 
 class Lattice(BaseObj):
     _REDIRECT = {'ang_unit': None}
@@ -92,6 +100,10 @@ class Lattice(BaseObj):
             angle_gamma=Parameter('angle_gamma', **THESE_CELL_DETAILS['angle']),
             **kwargs,
         )
+        # Derived geometry of the cell, valid for the cell parameters in `_geometry_key`
+        self._geometry = {}
+        self._geometry_key = None
+        self._geometry_stats = [0, 0, 0]
         if length_a is not None:
             self.length_a = length_a
         if length_b is not None:
@@ -397,7 +409,7 @@ class Lattice(BaseObj):
         :return: Lattice matrix in the form of a 9x9 matrix
         :rtype: np.ndarray
         """
-        return self.__matrix(*self.lengths, *self.angles)
+        return self._matrix().copy()
 
     @property
     def volume(self) -> float:
@@ -407,8 +419,8 @@ class Lattice(BaseObj):
         :return: Volume of the unit cell
         :rtype: ureg.Quantity
         """
-        m = self.matrix
-        vol = float(abs(np.dot(np.cross(m[0], m[1]), m[2])))
+        m = self._matrix()
+        vol = self._derived('volume', lambda key: float(abs(np.dot(np.cross(m[0], m[1]), m[2]))))
         # unit = ureg(self.length_a.unit) * ureg(self.length_b.unit) * ureg(self.length_c.unit)
         p = Parameter(name='Volume', value=vol, unit=(self.length_a * self.length_b * self.length_c).unit)
         return p
@@ -422,7 +434,7 @@ class Lattice(BaseObj):
         :return: Inverse of lattice matrix
         :rtype: np.ndarray
         """
-        return np.linalg.inv(self.matrix)
+        return self._inv_matrix().copy()
 
     @property
     def metric_tensor(self) -> np.ndarray:
@@ -432,8 +444,39 @@ class Lattice(BaseObj):
         :return metric tensor of the lattice
         :rtype: np.ndarray
         """
-        matrix = self.matrix
-        return np.dot(matrix, self.matrix.T)
+        return self._metric_tensor().copy()
+
+    @property
+    def reciprocal_metric_tensor(self) -> np.ndarray:
+        """
+        The metric tensor of the *crystallographic* reciprocal lattice, i.e., no factor of 2 * pi.
+
+        :return: reciprocal metric tensor of the lattice
+        :rtype: np.ndarray
+        """
+        return self._reciprocal_metric_tensor().copy()
+
+    @property
+    def reciprocal_matrix(self) -> np.ndarray:
+        """
+        The matrix of the *crystallographic* reciprocal lattice vectors, i.e., no factor of 2 * pi. The rows are the
+        reciprocal lattice vectors in the cartesian frame of `matrix`.
+
+        :return: reciprocal lattice matrix
+        :rtype: np.ndarray
+        """
+        return self._reciprocal_matrix().copy()
+
+    @property
+    def b_matrix(self) -> np.ndarray:
+        """
+        The B matrix of Busing and Levy, which transforms Miller indices to the scattering vector (without a factor
+        of 2 * pi) in a cartesian frame with x along a* and y in the a*-b* plane.
+
+        :return: B matrix
+        :rtype: np.ndarray
+        """
+        return self._derived('b_matrix', self.__b_matrix).copy()
 
     # Functions that create new copies
     @property
@@ -447,8 +490,7 @@ class Lattice(BaseObj):
         :return: New cell in the reciprocal lattice
         :rtype: Lattice
         """
-        v = np.linalg.inv(self.matrix).T
-        return self.__class__.from_matrix(v * 2 * np.pi, interface=self.interface)
+        return self.__class__.from_matrix(self._reciprocal_matrix() * 2 * np.pi, interface=self.interface)
 
     @property
     def reciprocal_lattice_crystallographic(self) -> L:
@@ -459,7 +501,7 @@ class Lattice(BaseObj):
         :return: New cell in the *crystallographic* reciprocal lattice
         :rtype: Lattice
         """
-        return self.__class__.from_matrix(self.reciprocal_lattice.matrix / (2 * np.pi), interface=self.interface)
+        return self.__class__.from_matrix(self._reciprocal_matrix(), interface=self.interface)
 
     def scale(self, new_volume: float) -> L:
         """
@@ -474,7 +516,7 @@ class Lattice(BaseObj):
         """
 
         lengths = self.lengths
-        versors = self.matrix / lengths
+        versors = self._matrix() / lengths
         geo_factor = np.abs(np.dot(np.cross(versors[0], versors[1]), versors[2]))
         ratios = np.array(lengths) / lengths[2]
         new_c = (new_volume / (geo_factor * np.prod(ratios))) ** (1 / 3.0)
@@ -505,7 +547,7 @@ class Lattice(BaseObj):
         :return: Cartesian coordinates
         :rtype: np.ndarray
         """
-        return np.dot(fractional_coords, self.matrix)
+        return np.dot(fractional_coords, self._matrix())
 
     def get_fractional_coords(self, cart_coords: Vector3Like) -> np.ndarray:
         """
@@ -516,7 +558,7 @@ class Lattice(BaseObj):
         :return: Fractional coordinates.
         :rtype: np.ndarray
         """
-        return np.dot(cart_coords, self.inv_matrix)
+        return np.dot(cart_coords, self._inv_matrix())
 
     def get_vector_along_lattice_directions(self, cart_coords: Vector3Like) -> np.ndarray:
         """
@@ -532,19 +574,53 @@ class Lattice(BaseObj):
         """
         return self.lengths * self.get_fractional_coords(cart_coords)
 
-    def d_hkl(self, miller_index: Vector3Like) -> float:
+    def d_hkl(self, miller_index: Union[Vector3Like, np.ndarray]) -> Union[float, np.ndarray]:
         """
         Returns the distance between the hkl plane and the origin
 
-        :param miller_index: (h. k. l) Miller index of plane
+        :param miller_index: (h. k. l) Miller index of plane, or a Nx3 array of Miller indices
         :type miller_index: Vector3Like
-        :return: Distance between the hkl plane and the origin
-        :rtype: float
-        """
-
-        gstar = self.reciprocal_lattice_crystallographic.metric_tensor
-        hkl = np.array(miller_index)
-        return 1 / ((np.dot(np.dot(hkl, gstar), hkl.T)) ** (1 / 2))
+        :return: Distance between the hkl plane and the origin, an array of N distances for N Miller indices
+        :rtype: Union[float, np.ndarray]
+        """
+
+        gstar = self._reciprocal_metric_tensor()
+        hkl = np.asarray(miller_index, dtype=np.float64)
+        d = 1 / np.sqrt(np.einsum('...i,ij,...j->...', hkl, gstar, hkl))
+        return float(d) if d.ndim == 0 else d
+
+    def generate_reflections(self, d_min: float, d_max: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Generate all reflections with a d-spacing between `d_min` and `d_max`, i.e. all hkl within the shell
+        1/d_max <= |hkl*| <= 1/d_min of reciprocal space. The (0, 0, 0) reflection is not included.
+
+        :param d_min: Minimum d-spacing
+        :type d_min: float
+        :param d_max: Maximum d-spacing
+        :type d_max: float
+        :return: Nx3 array of Miller indices and the N d-spacings, sorted by decreasing d-spacing
+        :rtype: Tuple[np.ndarray, np.ndarray]
+        """
+        if d_min <= 0:
+            raise ValueError('The minimum d-spacing must be positive')
+        # |h| <= |a| / d_min, as h is the projection of the scattering vector on the direct lattice vector a.
+        # One more index is added to be safe from rounding.
+        h_max, k_max, l_max = np.floor(np.array(self.lengths) / d_min).astype(int) + 1
+        hkl = np.stack(
+            np.meshgrid(
+                np.arange(-h_max, h_max + 1),
+                np.arange(-k_max, k_max + 1),
+                np.arange(-l_max, l_max + 1),
+                indexing='ij',
+            ),
+            axis=3,
+        ).reshape((-1, 3))
+        hkl = hkl[np.any(hkl != 0, axis=1)]
+        d = self.d_hkl(hkl)
+        in_shell = (d >= d_min) & (d <= d_max)
+        hkl, d = hkl[in_shell], d[in_shell]
+        order = np.argsort(-d, kind='stable')
+        return hkl[order], d[order]
 
     # Checking
     def is_orthogonal(self) -> bool:
@@ -576,11 +652,93 @@ class Lattice(BaseObj):
             and abs(lengths[right_angles[0]] - lengths[right_angles[1]]) < hex_length_tol
         )
 
+    def geometry_cache_info(self) -> CacheInfo:
+        """
+        Statistics of the cache of derived geometry (matrices, metric tensors and volume). The cache is cleared, and
+        an eviction counted per entry, when one of the cell parameters changes.
+
+        :return: Hits, misses, evictions and current size of the cache
+        :rtype: CacheInfo
+        """
+        hits, misses, evictions = self._geometry_stats
+        return CacheInfo(hits, misses, evictions, None, len(self._geometry))
+
+    def _derived(self, name: str, factory: Callable[[Tuple[float, ...]], Any]) -> Any:
+        """
+        Get a derived quantity of the cell, calculating it with `factory(cell_parameters)` if it is not cached for
+        the current cell parameters. Cached arrays are read-only as they are shared between calls, public properties
+        return copies of them.
+        """
+        key = (*self.lengths, *self.angles)
+        if key != self._geometry_key:
+            self._geometry_stats[2] += len(self._geometry)
+            self._geometry.clear()
+            self._geometry_key = key
+        try:
+            value = self._geometry[name]
+            self._geometry_stats[0] += 1
+        except KeyError:
+            self._geometry_stats[1] += 1
+            value = factory(key)
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+            self._geometry[name] = value
+        return value
+
+    # The cached arrays are read-only and shared between calls, the public properties return copies of them
+    def _matrix(self) -> np.ndarray:
+        return self._derived('matrix', lambda key: LATTICE_MATRIX_CACHE.get_or_create(key, lambda: self.__matrix(*key)))
+
+    def _inv_matrix(self) -> np.ndarray:
+        return self._derived('inv_matrix', lambda key: np.linalg.inv(self._matrix()))
+
+    def _metric_tensor(self) -> np.ndarray:
+        return self._derived('metric_tensor', lambda key: np.dot(self._matrix(), self._matrix().T))
+
+    def _reciprocal_metric_tensor(self) -> np.ndarray:
+        return self._derived('reciprocal_metric_tensor', lambda key: np.linalg.inv(self._metric_tensor()))
+
+    def _reciprocal_matrix(self) -> np.ndarray:
+        return self._derived('reciprocal_matrix', lambda key: self._inv_matrix().T)
+
+    def __b_matrix(self, key: Tuple[float, ...]) -> np.ndarray:
+        gstar = self._reciprocal_metric_tensor()
+        a_s, b_s, c_s = np.sqrt(np.diag(gstar))
+        cos_beta_s = gstar[0, 2] / (a_s * c_s)
+        cos_gamma_s = gstar[0, 1] / (a_s * b_s)
+        sin_beta_s = np.sqrt(1 - cos_beta_s**2)
+        sin_gamma_s = np.sqrt(1 - cos_gamma_s**2)
+        return np.array(
+            [
+                [a_s, b_s * cos_gamma_s, c_s * cos_beta_s],
+                [0.0, b_s * sin_gamma_s, -c_s * sin_beta_s * np.cos(np.radians(key[3]))],
+                [0.0, 0.0, 1 / key[2]],
+            ]
+        )
+
+    @staticmethod
+    def matrix_cache_info() -> CacheInfo:
+        """
+        Statistics of the process-wide cache of lattice matrices.
+
+        :return: Hits, misses, evictions, maximum size and current size of the cache
+        :rtype: CacheInfo
+        """
+        return LATTICE_MATRIX_CACHE.info()
+
+    @staticmethod
+    def clear_matrix_cache() -> None:
+        """
+        Remove all lattice matrices from the process-wide cache and reset its statistics.
+        """
+        LATTICE_MATRIX_CACHE.clear()
+        LATTICE_MATRIX_CACHE.reset_stats()
+
     @staticmethod
-    @memoized
     def __matrix(a: float, b: float, c: float, alpha: float, beta: float, gamma: float) -> np.ndarray:
         """
-        Calculating the crystallographic matrix is time consuming and we use it often, so we have memoized it.
+        Calculating the crystallographic matrix is time consuming and we use it often, so the results are kept in
+        the bounded `LATTICE_MATRIX_CACHE`.
         :param a: *a* lattice parameter
         :type a: float
         :param b: *b* lattice parameter
@@ -722,6 +880,34 @@ class Lattice(BaseObj):
             return neighbors
         return [np.array(i) for i in list(zip(*neighbors))]
 
+    def get_neighbor_list(
+        self,
+        frac_points: List[Vector3Like],
+        center_coords: List[Vector3Like],
+        r: float,
+        max_neighbors: Optional[int] = None,
+    ) -> NeighborList:
+        """
+        Find all points within spheres around the centers taking into account periodic boundary conditions, as
+        `get_points_in_sphere` does for a single center.
+        Args:
+            frac_points: All points in the lattice in fractional coordinates.
+            center_coords: Cartesian coordinates of the centers of the spheres.
+            r: radius of the spheres.
+            max_neighbors: Keep only the closest `max_neighbors` points of each center.
+        Returns:
+            NeighborList with offsets, indices, distances, images and cartesian coordinates of the points
+        """
+        return get_neighbor_list(
+            all_coords=self.get_cartesian_coords(frac_points),
+            center_coords=center_coords,
+            r=r,
+            pbc=True,
+            numerical_tol=1e-8,
+            lattice=self,
+            max_neighbors=max_neighbors,
+        )
+
 
 L = TypeVar('L', bound=Lattice)
 
@@ -986,18 +1172,32 @@ def get_integer_index(miller_index: Sequence[float], round_dp: int = 4, verbose:
     return tuple(mi)  # type: ignore
 
 
-def get_points_in_spheres(
+class NeighborList(NamedTuple):
+    """
+    Neighbors of a set of centers in compressed sparse row form. The neighbors of center `i` are the entries
+    `offsets[i]:offsets[i + 1]` of the other arrays.
+    """
+
+    offsets: np.ndarray  #: (n_centers + 1,) start of the neighbors of each center
+    indices: np.ndarray  #: (n_pairs,) index of the neighboring point
+    distances: np.ndarray  #: (n_pairs,) distance from the center to the neighbor
+    images: np.ndarray  #: (n_pairs, 3) periodic image of the neighbor
+    coords: np.ndarray  #: (n_pairs, 3) cartesian coordinates of the neighbor
+
+
+def get_neighbor_list(
     all_coords: np.ndarray,
     center_coords: np.ndarray,
     r: float,
     pbc: Union[bool, List[bool]] = True,
     numerical_tol: float = 1e-8,
     lattice: Lattice = None,
-    return_fcoords: bool = False,
-) -> List[List[Tuple[np.ndarray, float, int, np.ndarray]]]:
+    max_neighbors: Optional[int] = None,
+) -> NeighborList:
     """
     For each point in `center_coords`, get all the neighboring points in `all_coords` that are within the
-    cutoff radius `r`.
+    cutoff radius `r`. The points are sorted by the id of the cube they fall in, and the neighbors are taken from
+    the `searchsorted` ranges of the 27 cubes around each center.
     Args:
         all_coords: (list of cartesian coordinates) all available points
         center_coords: (list of cartesian coordinates) all centering points
@@ -1005,15 +1205,16 @@ def get_points_in_spheres(
         pbc: (bool or a list of bool) whether to set periodic boundaries
         numerical_tol: (float) numerical tolerance
         lattice: (Lattice) lattice to consider when PBC is enabled
-        return_fcoords: (bool) whether to return fractional coords when pbc is set.
+        max_neighbors: (int) keep only the closest `max_neighbors` neighbors of each center, sorted by distance.
     Returns:
-        List[List[Tuple[coords, distance, index, image]]]
+        NeighborList with the neighbors of the centers
     """
+    all_coords = np.asarray(all_coords, dtype=float).reshape((-1, 3))
+    center_coords = np.asarray(center_coords, dtype=float).reshape((-1, 3))
     if isinstance(pbc, bool):
         pbc = [pbc] * 3
     pbc = np.array(pbc, dtype=bool)
-    if return_fcoords and lattice is None:
-        raise ValueError('Lattice needs to be supplied to compute fractional coordinates')
+    n_centers = len(center_coords)
     center_coords_min = np.min(center_coords, axis=0)
     center_coords_max = np.max(center_coords, axis=0)
     # The lower bound of all considered atom coords
@@ -1022,7 +1223,7 @@ def get_points_in_spheres(
     if np.any(pbc):
         if lattice is None:
             raise ValueError('Lattice needs to be supplied when considering periodic boundary')
-        recp_len = np.array(lattice.reciprocal_lattice.lengths)
+        recp_len = 2 * math.pi * np.linalg.norm(lattice.reciprocal_matrix, axis=1)
         maxr = np.ceil((r + 0.15) * recp_len / (2 * math.pi))
         frac_coords = lattice.get_fractional_coords(center_coords)
         nmin_temp = np.floor(np.min(frac_coords, axis=0)) - maxr
@@ -1032,85 +1233,92 @@ def get_points_in_spheres(
         nmax = np.ones_like(nmax_temp)
         nmax[pbc] = nmax_temp[pbc]
         all_ranges = [np.arange(x, y, dtype='int64') for x, y in zip(nmin, nmax)]
+        all_images = np.stack(np.meshgrid(*all_ranges, indexing='ij'), axis=3).reshape((-1, 3))
         matrix = lattice.matrix
         # temporarily hold the fractional coordinates
         image_offsets = lattice.get_fractional_coords(all_coords)
-        all_fcoords = []
         # only wrap periodic boundary
-        for k in range(3):
-            if pbc[k]:  # type: ignore
-                all_fcoords.append(np.mod(image_offsets[:, k : k + 1], 1))
-            else:
-                all_fcoords.append(image_offsets[:, k : k + 1])
-        all_fcoords = np.concatenate(all_fcoords, axis=1)
+        all_fcoords = np.where(pbc[None, :], np.mod(image_offsets, 1), image_offsets)
         image_offsets = image_offsets - all_fcoords
         coords_in_cell = np.dot(all_fcoords, matrix)
-        # Filter out those beyond max range
-        valid_coords = []
-        valid_images = []
-        valid_indices = []
-        for image in itertools.product(*all_ranges):
-            coords = np.dot(image, matrix) + coords_in_cell
-            valid_index_bool = np.all(
-                np.bitwise_and(coords > global_min[None, :], coords < global_max[None, :]),
-                axis=1,
-            )
-            ind = np.arange(len(all_coords))
-            if np.any(valid_index_bool):
-                valid_coords.append(coords[valid_index_bool])
-                valid_images.append(np.tile(image, [np.sum(valid_index_bool), 1]) - image_offsets[valid_index_bool])
-                valid_indices.extend([k for k in ind if valid_index_bool[k]])
-        if len(valid_coords) < 1:
-            return [[]] * len(center_coords)
-        valid_coords = np.concatenate(valid_coords, axis=0)
-        valid_images = np.concatenate(valid_images, axis=0)
-
+        # Filter out those beyond max range, images x points
+        coords = np.dot(all_images, matrix)[:, None, :] + coords_in_cell[None, :, :]
+        valid = np.all((coords > global_min) & (coords < global_max), axis=2)
+        valid_image, valid_indices = np.nonzero(valid)
+        valid_coords = coords[valid_image, valid_indices]
+        valid_images = all_images[valid_image] - image_offsets[valid_indices]
     else:
-        valid_coords = all_coords
-        valid_images = [[0, 0, 0]] * len(valid_coords)
-        valid_indices = np.arange(len(valid_coords))
+        valid_indices = np.flatnonzero(np.all((all_coords > global_min) & (all_coords < global_max), axis=1))
+        valid_coords = all_coords[valid_indices]
+        valid_images = np.zeros((len(valid_indices), 3))
 
-    # Divide the valid 3D space into cubes and compute the cube ids
-    all_cube_index = _compute_cube_index(valid_coords, global_min, r)
+    # Divide the valid 3D space into cubes and sort the points by cube id
     nx, ny, nz = _compute_cube_index(global_max, global_min, r) + 1
-    all_cube_index = _three_to_one(all_cube_index, ny, nz)
-    site_cube_index = _three_to_one(_compute_cube_index(center_coords, global_min, r), ny, nz)
-    # create cube index to coordinates, images, and indices map
-    cube_to_coords = collections.defaultdict(list)  # type: Dict[int, List]
-    cube_to_images = collections.defaultdict(list)  # type: Dict[int, List]
-    cube_to_indices = collections.defaultdict(list)  # type: Dict[int, List]
-    for i, j, k, m in zip(all_cube_index.ravel(), valid_coords, valid_images, valid_indices):
-        cube_to_coords[i].append(j)
-        cube_to_images[i].append(k)
-        cube_to_indices[i].append(m)
-
-    # find all neighboring cubes for each atom in the lattice cell
-    site_neighbors = find_neighbors(site_cube_index, nx, ny, nz)
-    neighbors = []  # type: List[List[Tuple[np.ndarray, float, int, np.ndarray]]]
-
-    for i, j in zip(center_coords, site_neighbors):
-        l1 = np.array(_three_to_one(j, ny, nz), dtype=int).ravel()
-        # use the cube index map to find the all the neighboring
-        # coords, images, and indices
-        ks = [k for k in l1 if k in cube_to_coords]
-        if not ks:
-            neighbors.append([])
-            continue
-        nn_coords = np.concatenate([cube_to_coords[k] for k in ks], axis=0)
-        nn_images = itertools.chain(*[cube_to_images[k] for k in ks])
-        nn_indices = itertools.chain(*[cube_to_indices[k] for k in ks])
-        dist = np.linalg.norm(nn_coords - i[None, :], axis=1)
-        nns: List[Tuple[np.ndarray, float, int, np.ndarray]] = []
-        for coord, index, image, d in zip(nn_coords, nn_indices, nn_images, dist):
-            # filtering out all sites that are beyond the cutoff
-            # Here there is no filtering of overlapping sites
-            if d < r + numerical_tol:
-                if return_fcoords and (lattice is not None):
-                    coord = np.round(lattice.get_fractional_coords(coord), 10)
-                nn = (coord, float(d), int(index), image)
-                nns.append(nn)
-        neighbors.append(nns)
-    return neighbors
+    point_cubes = _three_to_one(_compute_cube_index(valid_coords, global_min, r), ny, nz).ravel()
+    order = np.argsort(point_cubes, kind='stable')
+    point_cubes = point_cubes[order]
+    # The neighboring cubes of each center, cubes out of bounds are marked with -1
+    neighbor_vectors = np.array(list(itertools.product(*[[-1, 0, 1]] * 3)), dtype=int)
+    center_cubes = _compute_cube_index(center_coords, global_min, r)[:, None, :] - neighbor_vectors[None, :, :]
+    in_bounds = np.all((center_cubes >= 0) & (center_cubes < np.array([nx, ny, nz])), axis=2)
+    center_cubes = np.where(in_bounds, _three_to_one(center_cubes.reshape((-1, 3)), ny, nz).reshape(in_bounds.shape), -1)
+    first = np.searchsorted(point_cubes, center_cubes, side='left')
+    counts = np.searchsorted(point_cubes, center_cubes, side='right') - first
+
+    # Gather the candidates of all centers in the order of the neighboring cubes
+    counts = counts.ravel()
+    n_candidates = int(np.sum(counts))
+    pos = np.arange(n_candidates) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(first.ravel(), counts)
+    candidates = order[pos]
+    centers = np.repeat(np.arange(n_centers), np.sum(counts.reshape((n_centers, -1)), axis=1))
+    distances = np.linalg.norm(valid_coords[candidates] - center_coords[centers], axis=1)
+    # filtering out all sites that are beyond the cutoff
+    # Here there is no filtering of overlapping sites
+    keep = distances < r + numerical_tol
+    candidates, centers, distances = candidates[keep], centers[keep], distances[keep]
+    if max_neighbors is not None:
+        keep = np.lexsort((distances, centers))
+        candidates, centers, distances = candidates[keep], centers[keep], distances[keep]
+        start = np.searchsorted(centers, centers, side='left')
+        keep = np.arange(len(centers)) - start < max_neighbors
+        candidates, centers, distances = candidates[keep], centers[keep], distances[keep]
+    offsets = np.zeros(n_centers + 1, dtype=int)
+    offsets[1:] = np.cumsum(np.bincount(centers, minlength=n_centers))
+    return NeighborList(offsets, valid_indices[candidates], distances, valid_images[candidates], valid_coords[candidates])
+
+
+def get_points_in_spheres(
+    all_coords: np.ndarray,
+    center_coords: np.ndarray,
+    r: float,
+    pbc: Union[bool, List[bool]] = True,
+    numerical_tol: float = 1e-8,
+    lattice: Lattice = None,
+    return_fcoords: bool = False,
+) -> List[List[Tuple[np.ndarray, float, int, np.ndarray]]]:
+    """
+    For each point in `center_coords`, get all the neighboring points in `all_coords` that are within the
+    cutoff radius `r`. See `get_neighbor_list` for the same result as arrays.
+    Args:
+        all_coords: (list of cartesian coordinates) all available points
+        center_coords: (list of cartesian coordinates) all centering points
+        r: (float) cutoff radius
+        pbc: (bool or a list of bool) whether to set periodic boundaries
+        numerical_tol: (float) numerical tolerance
+        lattice: (Lattice) lattice to consider when PBC is enabled
+        return_fcoords: (bool) whether to return fractional coords when pbc is set.
+    Returns:
+        List[List[Tuple[coords, distance, index, image]]]
+    """
+    if return_fcoords and lattice is None:
+        raise ValueError('Lattice needs to be supplied to compute fractional coordinates')
+    neighbors = get_neighbor_list(all_coords, center_coords, r, pbc, numerical_tol, lattice)
+    coords = neighbors.coords
+    if return_fcoords:
+        coords = np.round(lattice.get_fractional_coords(coords), 10)
+    rows = list(zip(coords, neighbors.distances.tolist(), neighbors.indices.tolist(), neighbors.images))
+    offsets = neighbors.offsets.tolist()
+    return [rows[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
 
 
 # The following internal methods are used in the get_points_in_sphere method.
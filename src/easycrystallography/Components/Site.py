@@ -4,15 +4,18 @@
 
 from __future__ import annotations
 
+import weakref
 from typing import TYPE_CHECKING
 from typing import ClassVar
 from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Set
 from typing import TypeVar
 from typing import Union
 
 import numpy as np
+from easyscience.global_object.undo_redo import property_stack_deco
 from easyscience.Objects.Groups import BaseCollection
 from easyscience.Objects.ObjectClasses import BaseObj
 from easyscience.Objects.variable import DescriptorStr
@@ -50,6 +53,51 @@ _SITE_DETAILS = {
 S = TypeVar('S', bound='Site')
 
 
+class _SiteLabel(DescriptorStr):
+    """
+    Label of a site, which tells the `Atoms` collections indexing the site when its value changes, including by undo
+    and redo. It is the same as, and serialised as, a `DescriptorStr`.
+    """
+
+    __old_class__ = DescriptorStr
+
+    @property
+    def value(self) -> str:
+        """
+        Get the value of self.
+
+        :return: Value of self
+        """
+        return self._string
+
+    @value.setter
+    @property_stack_deco
+    def value(self, value: str) -> None:
+        """
+        Set the value of self.
+
+        :param value: New value of self
+        :return: None
+        """
+        if not isinstance(value, str):
+            raise ValueError(f'{value=} must be type str')
+        old = self._string
+        self._string = value
+        if old != value:
+            for atoms in list(self.__dict__.get('_watchers', ())):
+                atoms._relabel(self, old, value)
+
+    def _watch(self, atoms: Atoms):
+        watchers = self.__dict__.get('_watchers')
+        if watchers is None:
+            watchers = self.__dict__['_watchers'] = weakref.WeakSet()
+        watchers.add(atoms)
+
+
+# Named as its base, so that the label is encoded as a `DescriptorStr`
+_SiteLabel.__name__ = _SiteLabel.__qualname__ = DescriptorStr.__name__
+
+
 class Site(BaseObj):
     label: ClassVar[DescriptorStr]
     specie: ClassVar[Specie]
@@ -111,7 +159,7 @@ class Site(BaseObj):
 
         super(Site, self).__init__(
             'site',
-            label=DescriptorStr('label', **_SITE_DETAILS['label']),
+            label=_SiteLabel('label', **_SITE_DETAILS['label']),
             specie=Specie(_SITE_DETAILS['label']['value']),
             occupancy=Parameter('occupancy', **_SITE_DETAILS['occupancy']),
             fract_x=Parameter('fract_x', **_SITE_DETAILS['position']),
@@ -258,8 +306,7 @@ class PeriodicSite(Site):
         Generate all orbits for a given fractional position.
 
         """
-        sym_op = self.lattice.spacegroup._sg_data.get_orbit
-        return sym_op(self.fract_coords)
+        return self.lattice.spacegroup.get_orbit(self)
 
     @property
     def cart_coords(self) -> np.ndarray:
@@ -280,20 +327,56 @@ class Atoms(BaseCollection):
         super(Atoms, self).__init__(name, *args, **kwargs)
         self.interface = interface
         self._kwargs._stack_enabled = True
+        # Keys of the sites by label. Kept up to date on insertion, deletion and relabelling, the size of the
+        # collection it was built for detects changes made around it (e.g. undo), which trigger a rebuild. Labels
+        # which do not report their changes, e.g. a `DescriptorStr` given to a site, are kept in `_label_unwatched`
+        # and make a lookup of a missing label rebuild the index.
+        self._label_index: Dict[str, List[str]] = {}
+        self._label_index_size = -1
+        self._label_unwatched: Set[str] = set()
 
     def __repr__(self) -> str:
         return f'Collection of {len(self)} sites.'
 
     def __getitem__(self, idx: Union[int, slice, str]) -> Union[Parameter, DescriptorStr, BaseObj, 'BaseCollection']:
-        if isinstance(idx, str) and idx in self.atom_labels:
-            idx = self.atom_labels.index(idx)
+        if isinstance(idx, str):
+            key = self._label_key(idx)
+            if key is not None:
+                return self._kwargs[key]
         return super(Atoms, self).__getitem__(idx)
 
+    def __setitem__(self, key: int, value: Union[Site, float]):
+        super(Atoms, self).__setitem__(key, value)
+        self._label_index_size = -1
+
     def __delitem__(self, key: Union[int, str]):
-        if isinstance(key, str) and key in self.atom_labels:
-            key = self.atom_labels.index(key)
+        if isinstance(key, str):
+            label_key = self._label_key(key)
+            if label_key is not None:
+                item = self._kwargs[label_key]
+                self._global_object.map.prune_vertex_from_edge(self, item)
+                del self._kwargs[label_key]
+                self._unindex(label_key, item)
+                return
+        if isinstance(key, int) and not isinstance(key, bool):
+            label_key = list(self._kwargs.keys())[key]
+            item = self._kwargs[label_key]
+            super(Atoms, self).__delitem__(key)
+            self._unindex(label_key, item)
+            return
         return super(Atoms, self).__delitem__(key)
 
+    def insert(self, index: int, value: Site):
+        if index >= len(self) and issubclass(type(value), BaseObj):
+            # Appending does not need the reordering of `BaseCollection.insert`
+            self._kwargs.data[value.unique_name] = value
+            self._global_object.map.add_edge(self, value)
+            self._global_object.map.reset_type(value, 'created_internal')
+            value.interface = self.interface
+        else:
+            super(Atoms, self).insert(index, value)
+        self._index(value.unique_name, value)
+
     def remove(self, key: Union[int, str]):
         self.__delitem__(key)
 
@@ -328,6 +411,84 @@ class Atoms(BaseCollection):
     def atom_occupancies(self) -> np.ndarray:
         return np.array([atom.occupancy.value for atom in self])
 
+    def has_label(self, label: str) -> bool:
+        """
+        Check if a site of the collection has a label, in constant time.
+
+        :param label: Label of the site
+        :return: True if a site has the label
+        """
+        return self._label_key(label) is not None
+
+    def _label_key(self, label: str) -> Optional[str]:
+        """
+        Key of the first site with a label, None if no site has the label.
+        """
+        if self._label_index_size != len(self._kwargs):
+            self._build_label_index()
+        keys = self._label_index.get(label)
+        if (not keys and self._label_unwatched) or (
+            keys and any(self._kwargs.data.get(key) is None or _label_of(self._kwargs[key]).value != label for key in keys)
+        ):
+            # A label changed without telling the index
+            self._build_label_index()
+            keys = self._label_index.get(label)
+        if not keys:
+            return None
+        if len(keys) == 1:
+            return keys[0]
+        order = {key: idx for idx, key in enumerate(self._kwargs.keys())}
+        return min(keys, key=order.__getitem__)
+
+    def _build_label_index(self):
+        self._label_index = {}
+        self._label_unwatched = set()
+        for key, site in self._kwargs.items():
+            self._add_label(key, _label_of(site))
+        self._label_index_size = len(self._kwargs)
+
+    def _add_label(self, key: str, label: DescriptorStr):
+        self._label_index.setdefault(label.value, []).append(key)
+        if isinstance(label, _SiteLabel):
+            label._watch(self)
+        else:
+            self._label_unwatched.add(key)
+
+    def _index(self, key: str, site: Site):
+        if self._label_index_size != len(self._kwargs) - 1:
+            self._label_index_size = -1
+            return
+        self._add_label(key, _label_of(site))
+        self._label_index_size += 1
+
+    def _unindex(self, key: str, site: Site):
+        label = _label_of(site).value
+        keys = self._label_index.get(label, [])
+        if key not in keys or self._label_index_size != len(self._kwargs) + 1:
+            self._label_index_size = -1
+            return
+        keys.remove(key)
+        if not keys:
+            del self._label_index[label]
+        self._label_unwatched.discard(key)
+        self._label_index_size -= 1
+
+    def _relabel(self, label: _SiteLabel, old: str, new: str):
+        # Called by the label of an indexed site when its value changes
+        for key in self._label_index.get(old, []):
+            site = self._kwargs.data.get(key)
+            if site is not None and _label_of(site) is label:
+                self._label_index[old].remove(key)
+                if not self._label_index[old]:
+                    del self._label_index[old]
+                self._label_index.setdefault(new, []).append(key)
+                return
+
+
+def _label_of(site: Site) -> DescriptorStr:
+    # The label component of a site, without the logging of attribute access
+    return site._kwargs['label']
+
 
 A = TypeVar('A', bound=Atoms)
 
@@ -367,16 +528,16 @@ class PeriodicAtoms(Atoms):
     def append(self, item: S):
         if not issubclass(item.__class__, Site):
             raise TypeError('Item must be a Site or periodic site')
-        if item.label.value in self.atom_labels:
+        if self.has_label(item.label.value):
             raise AttributeError(f'An atom of name {item.label.value} already exists.')
         # if isinstance(item, Site):
         item = self._SITE_CLASS.from_site(self.lattice, item)
         super(PeriodicAtoms, self).append(item)
 
     def get_orbits(self, magnetic_only: bool = False):
-        orbit_dict = {}
-        for item in self:
-            if magnetic_only and not item.is_magnetic:
-                continue
-            orbit_dict[item.label.value] = item.get_orbit()
-        return orbit_dict
+        items = [item for item in self if not magnetic_only or item.is_magnetic]
+        if not items:
+            return {}
+        # The orbits of all sites in one pass
+        orbits, index = self.lattice.spacegroup.get_orbits([item.fract_coords for item in items])
+        return {item.label.value: orbits[index == idx] for idx, item in enumerate(items)}
@@ -4,6 +4,7 @@
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from copy import deepcopy
 from typing import TYPE_CHECKING
 from typing import ClassVar
@@ -20,8 +21,12 @@ from easyscience.Objects.variable import DescriptorAnyType
 from easyscience.Objects.variable import DescriptorStr
 
 from easycrystallography.Symmetry.functions import get_default_it_coordinate_system_code_by_it_number
+from easycrystallography.Symmetry.functions import get_settings_by_it_number
 from easycrystallography.Symmetry.functions import get_spacegroup_by_name_ext
 from easycrystallography.Symmetry.SymOp import SymmOp
+from easycrystallography.Symmetry.SymOp import SymmOpSet
+from easycrystallography.Utils.cache import CacheInfo
+from easycrystallography.Utils.cache import LRUCache
 
 SG_DETAILS = {
     'space_group_HM_name': {
@@ -62,6 +67,12 @@ class easyOp(DescriptorAnyType):
     _REDIRECT = _D_REDIRECT
 
 
+# Process-wide cache of resolved space groups, keyed by the requested name/number and setting.
+SPACEGROUP_CACHE = LRUCache(maxsize=512)
+# Bytes of orbits kept by each space group
+ORBIT_CACHE_BYTES = 2**22
+
+
 class SpaceGroup(BaseObj):
     _space_group_HM_name: ClassVar[DescriptorStr]
     _setting: ClassVar[DescriptorStr]
@@ -142,6 +153,9 @@ class SpaceGroup(BaseObj):
         """
         ops = [gemmi.Op(op.as_xyz_string()) for op in sym_ops]
         sg_data = gemmi.find_spacegroup_by_ops(gemmi.GroupOps(ops))
+        if sg_data is None:
+            # Not a tabulated space group, e.g. a magnetic or subgroup derived structure
+            return cls(symmetry_ops=list(sym_ops), interface=interface)
         return cls(sg_data.hm, sg_data.ext, interface=interface)
 
     @classmethod
@@ -228,28 +242,94 @@ class SpaceGroup(BaseObj):
         Find the IT_coordinate_system_code by group's number.
         gemmi doesn't do it natively.
         """
-        ext = []
-        for item in gemmi.spacegroup_table():
-            if item.number > number:
-                break
-            if item.number == number:
-                st = ''
-                # Cases where ext and qualifier are not empty
-                if item.ext and item.ext != '\x00':
-                    st += item.ext
-                if item.qualifier:
-                    st += item.qualifier
-                # special cases of defaul settings, not explicitly defined in gemmi
-                system = item.crystal_system_str()
-                if system == 'orthorhombic' and not item.qualifier:
-                    st += 'abc'
-                elif (system == 'trigonal' or system == 'hexagonal') and not item.qualifier:
-                    st += 'h'
-                # failed, just assign "1" to triclinic/monoclinic/tetragonal
-                if not st:
-                    st = '1'
-                ext.append(st)
-        return ext
+        return get_settings_by_it_number(number)
+
+    @staticmethod
+    def cache_info() -> CacheInfo:
+        """
+        Statistics of the process-wide cache of resolved space groups.
+
+        :return: Hits, misses, evictions, maximum size and current size of the cache
+        """
+        return SPACEGROUP_CACHE.info()
+
+    @staticmethod
+    def clear_cache() -> NoReturn:
+        """
+        Remove all resolved space groups from the process-wide cache and reset its statistics.
+        """
+        SPACEGROUP_CACHE.clear()
+        SPACEGROUP_CACHE.reset_stats()
+
+    @classmethod
+    def _resolve(
+        cls, new_spacegroup: Union[int, str], new_setting: Optional[str] = None
+    ) -> Tuple[gemmi.SpaceGroup, str, Tuple[SymmOp, ...], SymmOpSet]:
+        """
+        Resolve a space group name, Hall symbol or number and a setting to the gemmi space group, the setting code and
+        the symmetry operations. Results are kept in the process-wide `SPACEGROUP_CACHE`, so the operations are
+        read-only and shared between space groups.
+
+        :param new_spacegroup: Space group number, name or Hall symbol
+        :param new_setting: Space group setting
+        :return: gemmi space group, setting code, symmetry operations and the symmetry operations as a set
+        """
+        try:
+            key = (new_spacegroup, new_setting)
+            hash(key)
+        except TypeError:
+            return cls.__resolve(new_spacegroup, new_setting)
+        return SPACEGROUP_CACHE.get_or_create(key, lambda: cls.__resolve(new_spacegroup, new_setting))
+
+    @classmethod
+    def __resolve(
+        cls, new_spacegroup: Union[int, str], new_setting: Optional[str] = None
+    ) -> Tuple[gemmi.SpaceGroup, str, Tuple[SymmOp, ...], SymmOpSet]:
+        setting = '\x00'
+        if isinstance(new_spacegroup, str):
+            if ':' in new_spacegroup:
+                new_spacegroup, new_setting = new_spacegroup.split(':')
+            sg_data = gemmi.find_spacegroup_by_name(new_spacegroup)
+            if sg_data is None:
+                try:
+                    sg_data = gemmi.find_spacegroup_by_ops(gemmi.symops_from_hall(new_spacegroup))
+                except RuntimeError:
+                    sg_data = None
+        else:
+            sg_data = gemmi.find_spacegroup_by_number(int(new_spacegroup))
+
+        if sg_data is None:
+            raise ValueError(f"Spacegroup '{new_spacegroup}' not found in database.")
+
+        settings = cls.find_settings_by_number(sg_data.number)
+        reference = get_default_it_coordinate_system_code_by_it_number(sg_data.number)
+
+        if new_setting is None or new_setting == '' or new_setting == '\x00':
+            if reference is not None:
+                setting = reference
+        else:
+            try:
+                new_setting = int(new_setting)
+            except ValueError:
+                pass
+            new_setting = str(new_setting)
+            # modify the space group with the new setting
+            new_sg_data = get_spacegroup_by_name_ext(sg_data.number, new_setting)
+            if new_sg_data is None and new_setting in settings:
+                new_sg_data = get_spacegroup_by_name_ext(sg_data.number, reference)
+            if new_sg_data is None:
+                raise ValueError(f"Spacegroup '{new_spacegroup}:{new_setting}' not found in database.")
+            sg_data = new_sg_data
+            setting = get_default_it_coordinate_system_code_by_it_number(sg_data.number)
+            if new_setting in settings:
+                setting = new_setting
+
+        operations = []
+        for op in sg_data.operations():
+            operation = SymmOp.from_rotation_and_translation(np.array(op.rot) / op.DEN, np.array(op.tran) / op.DEN)
+            operation.affine_matrix.setflags(write=False)
+            operations.append(operation)
+        return sg_data, setting, tuple(operations), SymmOpSet.from_symm_ops(operations)
 
     def __on_change(
         self,
@@ -266,67 +346,40 @@ class SpaceGroup(BaseObj):
         :param new_setting: New space group setting
         :param set_internal: Should internal objects be updated
         """
-        setting = '\x00'
         if operations_set is None:
-            if isinstance(new_spacegroup, str):
-                if ':' in new_spacegroup:
-                    new_spacegroup, new_setting = new_spacegroup.split(':')
-                sg_data = gemmi.find_spacegroup_by_name(new_spacegroup)
-                if sg_data is None:
-                    try:
-                        sg_data = gemmi.find_spacegroup_by_ops(gemmi.symops_from_hall(new_spacegroup))
-                    except RuntimeError:
-                        sg_data = None
-            else:
-                sg_data = gemmi.find_spacegroup_by_number(int(new_spacegroup))
-
-            if sg_data is None:
-                raise ValueError(f"Spacegroup '{new_spacegroup}' not found in database.")
-
-            settings = self.find_settings_by_number(sg_data.number)
-            reference = get_default_it_coordinate_system_code_by_it_number(sg_data.number)
-
-            if new_setting is None or new_setting == '' or new_setting == '\x00':
-                if reference is not None:
-                    setting = reference
-            else:
-                try:
-                    new_setting = int(new_setting)
-                except ValueError:
-                    pass
-                new_setting = str(new_setting)
-                # modify the space group with the new setting
-                new_sg_data = get_spacegroup_by_name_ext(sg_data.number, new_setting)
-                if new_sg_data is None and new_setting in settings:
-                    new_sg_data = get_spacegroup_by_name_ext(sg_data.number, reference)
-                if new_sg_data is None:
-                    raise ValueError(f"Spacegroup '{new_spacegroup}:{new_setting}' not found in database.")
-                sg_data = new_sg_data
-                setting = get_default_it_coordinate_system_code_by_it_number(sg_data.number)
-                if new_setting in settings:
-                    setting = new_setting
-
+            sg_data, setting, operations, op_set = self._resolve(new_spacegroup, new_setting)
             hm_name = sg_data.hm
-
-            if operations_set is None:
-                operations_set = sg_data.operations()
-            operations = [
-                SymmOp.from_rotation_and_translation(np.array(op.rot) / op.DEN, np.array(op.tran) / op.DEN)
-                for op in operations_set
-            ]
+            operations = list(operations)
         else:
             sg_data = None
+            setting = '\x00'
             hm_name = 'custom'
+            op_set = None
             if isinstance(operations_set, str):
                 operations_set = [SymmOp.from_xyz_string(s) for s in operations_set.split(';')]
             operations = operations_set
         if set_internal:
+            self._op_set = op_set
+            self._orbit_cache = OrderedDict()
+            self._orbit_cache_bytes = 0
             self._sg_data = sg_data
             self._space_group_HM_name.value = hm_name
             self._setting.value = setting
             self._symmetry_ops.value = operations
+            self._ops_source = self._symmetry_ops.value
         return sg_data, setting, operations
 
+    def __check_ops(self) -> NoReturn:
+        """
+        Drop the cached operation set and orbits if the operations were replaced without passing `__on_change`, e.g.
+        by an undo or redo of the operations descriptor.
+        """
+        if self._symmetry_ops.value is not self._ops_source:
+            self._op_set = None
+            self._orbit_cache = OrderedDict()
+            self._orbit_cache_bytes = 0
+            self._ops_source = self._symmetry_ops.value
+
     @property
     def is_custom(self) -> bool:
         return self._sg_data is None
@@ -557,32 +610,84 @@ class SpaceGroup(BaseObj):
             r = self._sg_data.is_reference_setting()
         return r
 
+    @property
+    def symmetry_op_set(self) -> SymmOpSet:
+        """
+        All symmetry operations of the space group as one array backed set. For tabulated space groups the set is
+        shared through the space group cache, for custom space groups it is generated on first use. The set is
+        dropped whenever the operations change.
+
+        :return: Symmetry operations of the space group
+        """
+        self.__check_ops()
+        if self._op_set is None:
+            self._op_set = SymmOpSet.from_symm_ops(self.symmetry_ops)
+        return self._op_set
+
     def symmetry_matrices(self) -> Tuple[List[np.ndarray], List[np.ndarray]]:
         """
         Get the rotational and translational matrices of the space group
 
         :return: Rotation and translation matrices
         """
-        ops = self.symmetry_ops
-        return [op.rotation_matrix.copy() for op in ops], [op.translation_vector.copy() for op in ops]
+        op_set = self.symmetry_op_set
+        return list(op_set.rotation_matrices.copy()), list(op_set.translation_vectors.copy())
 
     def get_orbit(self, point: T, tol: float = 1e-5) -> np.ndarray:
         """
-        Returns the orbit for a point.
+        Returns the orbit for a point. The orbit positions are wrapped into the unit cell. The orbit of a site is
+        cached under the name of the site, so that the orbit of a moved site replaces its previous orbit.
 
-        :param point: Point to get the orbit for
+        :param point: Point or site to get the orbit for
         :param tol: Tolerance for the orbit
         :return: Orbits of the point
         """
-        orbit = []
-        if not hasattr(point, '__iter__'):
-            point = point.fract_coords
-        point = np.array(point)
-        for o in self.symmetry_ops:
-            pp = np.array(o.operate(point))
-            if not in_array_list(orbit, pp, tol=tol):
-                orbit.append(pp)
-        return np.array(orbit)
+        if hasattr(point, '__iter__'):
+            orbit, _ = self._cached_orbits(point, tol)
+        else:
+            orbit, _ = self._cached_orbits(point.fract_coords, tol, owner=getattr(point, 'unique_name', None))
+        return orbit
+
+    def get_orbits(self, points: npt.ArrayLike, tol: float = 1e-5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the orbits for a set of points. All symmetry operations are applied to all points at once, the new
+        positions are wrapped into the unit cell and duplicates within each orbit are removed. This is the same for
+        tabulated and custom space groups. The results are cached until the operations change, so the returned arrays
+        are read-only. The least recently used orbits are dropped when the cache holds more than `ORBIT_CACHE_BYTES`.
+
+        :param points: Points to get the orbits for [n*[1x3]]
+        :param tol: Tolerance for the orbit
+        :return: Orbit positions [m*[1x3]] and the index of the point each orbit position was generated from [m]
+        """
+        return self._cached_orbits(points, tol)
+
+    def _cached_orbits(self, points: npt.ArrayLike, tol: float, owner: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Orbits of the points, cached under `owner` if given and under the points otherwise.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        signature = (points.shape, points.tobytes(), tol)
+        key = signature if owner is None else owner
+        self.__check_ops()
+        entry = self._orbit_cache.get(key)
+        if entry is not None and entry[0] == signature:
+            self._orbit_cache.move_to_end(key)
+            return entry[1]
+        op_set = self.symmetry_op_set
+        orbits = generate_orbits(op_set.rotation_matrices, op_set.translation_vectors, points, tol=tol)
+        for array in orbits:
+            array.flags.writeable = False
+        if entry is not None:
+            self._orbit_cache_bytes -= _orbit_entry_bytes(entry)
+            del self._orbit_cache[key]
+        entry = (signature, orbits)
+        self._orbit_cache[key] = entry
+        self._orbit_cache_bytes += _orbit_entry_bytes(entry)
+        while self._orbit_cache_bytes > ORBIT_CACHE_BYTES and len(self._orbit_cache) > 1:
+            # drop the least recently used entry
+            _, dropped = self._orbit_cache.popitem(last=False)
+            self._orbit_cache_bytes -= _orbit_entry_bytes(dropped)
+        return orbits
 
     def get_site_multiplicity(self, site: T, tol=1e-5) -> int:
         """
@@ -595,12 +700,8 @@ class SpaceGroup(BaseObj):
         if not hasattr(site, '__iter__'):
             site = site.fract_coords
         site = np.array(site)
-        multiplicity = 1
-        for o in self.symmetry_ops:
-            new_site = o.operate(site)
-            if np.isclose(new_site, site, atol=tol).all():
-                multiplicity += 1
-        return multiplicity
+        new_sites = self.symmetry_op_set.operate(site)
+        return 1 + int(np.count_nonzero(np.isclose(new_sites, site, atol=tol).all(axis=-1)))
 
     def __repr__(self) -> str:
         out_str = "<Spacegroup: system: '{:s}', number: {}, H-M: '{:s}'".format(
@@ -611,6 +712,11 @@ class SpaceGroup(BaseObj):
         return out_str + '>'
 
 
+def _orbit_entry_bytes(entry: Tuple[tuple, Tuple[np.ndarray, np.ndarray]]) -> int:
+    signature, orbits = entry
+    return len(signature[1]) + sum(array.nbytes for array in orbits)
+
+
 def in_array_list(array_list, a, tol=1e-5) -> bool:
     """
     Extremely efficient nd-array comparison using numpy's broadcasting. This
@@ -632,3 +738,52 @@ def in_array_list(array_list, a, tol=1e-5) -> bool:
     if not tol:
         return np.any(np.all(np.equal(array_list, a[None, :]), axes))
     return np.any(np.sum(np.abs(array_list - a[None, :]), axes) < tol)
+
+
+def generate_orbits(
+    rotations: np.ndarray,
+    translations: np.ndarray,
+    points: npt.ArrayLike,
+    tol: float = 1e-5,
+    chunk_size: int = 2**22,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Generate the orbits of many points under a set of symmetry operations in one pass. The operations are applied
+    as a stacked rotation tensor plus translations, the images are wrapped into the unit cell and duplicates are
+    removed with a periodic tolerance, keeping the first occurrence in operation order.
+
+    Args:
+        rotations (array): Rotation matrices of the operations [n_ops*[3x3]].
+        translations (array): Translation vectors of the operations [n_ops*[1x3]].
+        points (array): Fractional coordinates of the points [n*[1x3]].
+        tol (float): The tolerance. Defaults to 1e-5. If 0, an exact match is
+            done.
+        chunk_size (int): Maximum number of elements in the temporary comparison array.
+
+    Returns:
+        (array, array): The orbit positions [m*[1x3]] and the index of the point
+            each orbit position was generated from [m].
+    """
+    rotations = np.asarray(rotations, dtype=np.float64).reshape((-1, 3, 3))
+    translations = np.asarray(translations, dtype=np.float64).reshape((-1, 3))
+    points = np.asarray(points, dtype=np.float64).reshape((-1, 3))
+    n_ops = rotations.shape[0]
+
+    images = np.einsum('oij,pj->poi', rotations, points) + translations[None, :, :]
+    images = np.mod(np.round(images, decimals=10), 1)
+
+    keep = np.empty(images.shape[:2], dtype=bool)
+    step = max(1, chunk_size // max(1, n_ops * n_ops))
+    for start in range(0, points.shape[0], step):
+        block = images[start : start + step]
+        # Periodic L1 distance between all pairs of images of a point, one axis at a time
+        dist = np.zeros((block.shape[0], n_ops, n_ops))
+        for axis in range(3):
+            coord = block[:, :, axis]
+            diff = coord[:, :, None] - coord[:, None, :]
+            diff -= np.rint(diff)
+            dist += np.abs(diff)
+        close = dist == 0 if not tol else dist < tol
+        # An image is a duplicate if it is close to an image generated by an earlier operation
+        keep[start : start + step] = ~np.any(np.tril(close, k=-1), axis=-1)
+    return images[keep], np.nonzero(keep)[0]
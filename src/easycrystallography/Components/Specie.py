@@ -4,14 +4,20 @@
 
 import re
 from copy import deepcopy
+from types import MappingProxyType
 from typing import Any
 from typing import Dict
+from typing import Mapping
+from typing import NamedTuple
+from typing import NoReturn
 from typing import Union
 
+import numpy as np
 import periodictable as pt
 from easyscience.Objects.variable import DescriptorStr
-from easyscience.Utils.classTools import addProp
-from easyscience.Utils.classTools import removeProp
+
+from easycrystallography.Utils.cache import CacheInfo
+from easycrystallography.Utils.cache import LRUCache
 
 _SPECIE_DETAILS = {
     'type_symbol': {
@@ -24,6 +30,16 @@ _REDIRECT = deepcopy(DescriptorStr._REDIRECT)
 _REDIRECT['specie'] = lambda obj: obj._raw_data['str']
 
 
+class SpecieData(NamedTuple):
+    raw_data: Mapping[str, Any]
+    props: Mapping[str, Any]
+    rep: str
+
+
+# Process-wide cache of parsed species, keyed by the specie string. The data is read-only and shared between species.
+SPECIE_CACHE = LRUCache(maxsize=1024)
+
+
 class Specie(DescriptorStr):
     _REDIRECT = _REDIRECT
 
@@ -31,28 +47,73 @@ class Specie(DescriptorStr):
         if 'value' in kwargs.keys():
             specie = kwargs.pop('value')
 
-        self._raw_data: Dict[str, Union[str, int]] = {}
-        self._props: Dict[str, Any] = {}
+        self._raw_data: Mapping[str, Union[str, int]] = {}
+        self._props: Mapping[str, Any] = {}
 
         self._reset_data()
         super(Specie, self).__init__('specie', self.__gen_data(specie), **_SPECIE_DETAILS['type_symbol'])
 
-        # Monkey patch the unit and the value to take into account the new type situation
-        self.__previous_set = self.__class__.value.fset
+    @property
+    def value(self) -> str:
+        return DescriptorStr.value.fget(self)
+
+    @value.setter
+    def value(self, value: str):
+        # The value is set to the normalised specie string, with the data of the new specie
+        DescriptorStr.value.fset(self, self.__gen_data(value))
+
+    def __getattr__(self, item: str) -> Any:
+        # Properties of the periodictable element, isotope or ion, e.g. `mass` or `neutron`
+        props = self.__dict__.get('_props', {})
+        if item not in props:
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{item}'")
+        return props[item]
 
-        addProp(
-            self,
-            'value',
-            fget=self.__class__.value.fget,
-            fset=lambda obj, val: self.__previous_set(obj, obj.__gen_data(val)),
-            fdel=self.__class__.value.fdel,
-        )
+    def __dir__(self):
+        return sorted(set(super(Specie, self).__dir__()).union(self._props))
 
     def _reset_data(self):
         self._raw_data = dict.fromkeys(['str', 'observed', 'element', 'isotope', 'oxi_state', 'spin'])
         self._props = {}
 
-    def __gen_data(self, value_str: str):
+    def __gen_data(self, value_str: str) -> str:
+        data = self._parse(value_str)
+        self._raw_data = data.raw_data
+        self._props = data.props
+        return data.rep
+
+    @staticmethod
+    def cache_info() -> CacheInfo:
+        """
+        Statistics of the process-wide cache of parsed species.
+
+        :return: Hits, misses, evictions, maximum size and current size of the cache
+        """
+        return SPECIE_CACHE.info()
+
+    @staticmethod
+    def clear_cache() -> NoReturn:
+        """
+        Remove all parsed species from the process-wide cache and reset its statistics.
+        """
+        SPECIE_CACHE.clear()
+        SPECIE_CACHE.reset_stats()
+
+    @classmethod
+    def _parse(cls, value_str: str) -> SpecieData:
+        """
+        Parse a specie string to the periodictable element, isotope and ion and their properties. Results are kept
+        in the process-wide `SPECIE_CACHE`, so the data is read-only and shared between species.
+
+        :param value_str: Specie string, e.g. `Fe3+` or `57Fe`
+        :return: Raw data, properties and normalised string of the specie
+        """
+        if not isinstance(value_str, str):
+            raise ValueError(f'{value_str=} must be type str')
+        return SPECIE_CACHE.get_or_create(value_str, lambda: cls.__parse(value_str))
+
+    @staticmethod
+    def __parse(value_str: str) -> SpecieData:
         s = re.search(r'([0-9.]*)([A-Z][a-z]*)([0-9.]*)([+\-]*)', value_str)
         # group(1) = Isotope
         # group(2) = Element
@@ -66,57 +127,32 @@ class Specie(DescriptorStr):
         if element is None:
             raise ValueError(f'Element ({s.group(2)}) not found in periodictable')
 
-        if self._props is not None:
-            for k in self._props.keys():
-                removeProp(self, k)
+        raw_data = dict.fromkeys(['str', 'observed', 'element', 'isotope', 'oxi_state', 'spin'])
+        raw_data['str'] = value_str
+        raw_data['element'] = element
+        raw_data['observed'] = element
 
-        self._reset_data()
-        self._raw_data['str'] = value_str
-        self._raw_data['element'] = element
-        self._raw_data['observed'] = element
-
-        props = {
-            s: getattr(self._raw_data['observed'], s)
-            for s in self._raw_data['observed'].__dir__()
-            if not s.startswith('_') and hasattr(self._raw_data['observed'], s)
-        }
+        props = _public_attributes(raw_data['observed'])
         isotope_str = s.group(1)
-        self._raw_data['isotope'] = None
         if isotope_str:
-            self._raw_data['isotope'] = int(isotope_str)
-            self._raw_data['observed'] = pt.core.Isotope(self._raw_data['observed'], self._raw_data['isotope'])
-            props.update(
-                {
-                    s: getattr(self._raw_data['observed'], s)
-                    for s in self._raw_data['observed'].__dir__()
-                    if not s.startswith('_') and hasattr(self._raw_data['observed'], s)
-                }
-            )
+            raw_data['isotope'] = int(isotope_str)
+            raw_data['observed'] = pt.core.Isotope(raw_data['observed'], raw_data['isotope'])
+            props.update(_public_attributes(raw_data['observed']))
         oxi_state_str = s.group(3)
         oxi_pm_str = s.group(4)
-        self._raw_data['oxi_state'] = None
         if oxi_state_str:
-            self._raw_data['oxi_state'] = int(oxi_pm_str + oxi_state_str)
-            self._raw_data['observed'] = pt.core.Ion(self._raw_data['observed'], self._raw_data['oxi_state'])
-            props.update(
-                {
-                    s: getattr(self._raw_data['observed'], s)
-                    for s in self._raw_data['observed'].__dir__()
-                    if not s.startswith('_') and hasattr(self._raw_data['observed'], s)
-                }
-            )
+            raw_data['oxi_state'] = int(oxi_pm_str + oxi_state_str)
+            raw_data['observed'] = pt.core.Ion(raw_data['observed'], raw_data['oxi_state'])
+            props.update(_public_attributes(raw_data['observed']))
         props['common_name'] = props.pop('name')
-        self._props = props
-        for k, v in props.items():
-            addProp(self, k, fget=self.__getter_periodic(k))
-        rep = f'{self._raw_data["element"]}'
-        if self.is_ion:
-            rep += f'{abs(self._raw_data["oxi_state"])}'
-            if self._raw_data['oxi_state'] > 0:
+        rep = f'{raw_data["element"]}'
+        if raw_data['oxi_state'] is not None:
+            rep += f'{abs(raw_data["oxi_state"])}'
+            if raw_data['oxi_state'] > 0:
                 rep += '+'
             else:
                 rep += '-'
-        return rep
+        return SpecieData(MappingProxyType(raw_data), MappingProxyType(props), rep)
 
     def __repr__(self) -> str:
         rep = f"<{self.__class__.__name__} '{self.name}': "
@@ -143,13 +179,6 @@ class Specie(DescriptorStr):
                 rep += f'{str(self._raw_data["oxi_state"])[1:]}-'
         return rep
 
-    @staticmethod
-    def __getter_periodic(key: str):
-        def getter(obj):
-            return obj._props.get(key)
-
-        return getter
-
     @property
     def is_ion(self):
         return self._raw_data['oxi_state'] is not None
@@ -157,3 +186,30 @@ class Specie(DescriptorStr):
     @property
     def is_isotope(self):
         return self._raw_data['isotope'] is not None
+
+    @property
+    def scattering_length(self) -> complex:
+        """
+        Bound coherent neutron scattering length in fm, with the absorption as the imaginary part.
+        Isotopes use the tabulated value of the isotope.
+        """
+        element = self._raw_data['element']
+        if self.is_isotope:
+            element = element[self._raw_data['isotope']]
+        b_c = element.neutron.b_c_complex
+        if b_c is None:
+            raise ValueError(f'No neutron scattering length is tabulated for {self}.')
+        return complex(b_c)
+
+    def form_factor(self, q: Union[float, np.ndarray]) -> np.ndarray:
+        """
+        X-ray atomic form factor f0 in electrons. Ions use the form factor of the ion.
+
+        :param q: Magnitude of the scattering vector in 1/Å, 4π sinθ/λ
+        :return: Form factor at each `q`
+        """
+        return np.asarray(self._raw_data['observed'].xray.f0(np.asarray(q, dtype=float)), dtype=float)
+
+
+def _public_attributes(obj) -> Dict[str, Any]:
+    return {s: getattr(obj, s) for s in obj.__dir__() if not s.startswith('_') and hasattr(obj, s)}
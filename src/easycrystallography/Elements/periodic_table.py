@@ -22,15 +22,169 @@ from easyscience.Objects.Variable import Descriptor
 
 """Module contains classes presenting Element and Species (Element + oxidation state) and PeriodicTable."""
 
-# Loads element data from json file
-with open(
-    os.path.join(str(Path(__file__).absolute().parent.parent), 'Databases', 'periodic_table.json'),
-    'rt',
-) as f:
-    _pt_data = json.load(f)
-
 _pt_row_sizes = (2, 8, 8, 18, 18, 32, 32)
 
+# Element properties which are parsed from strings like "1.5 ang" on access
+_pt_parsed_properties = frozenset(
+    [
+        'mendeleev_no',
+        'electrical_resistivity',
+        'velocity_of_sound',
+        'reflectivity',
+        'refractive_index',
+        'poissons_ratio',
+        'molar_volume',
+        'thermal_conductivity',
+        'boiling_point',
+        'melting_point',
+        'critical_temperature',
+        'superconduction_temperature',
+        'liquid_range',
+        'bulk_modulus',
+        'youngs_modulus',
+        'brinell_hardness',
+        'rigidity_modulus',
+        'mineral_hardness',
+        'vickers_hardness',
+        'density_of_solid',
+        'atomic_radius_calculated',
+        'van_der_waals_radius',
+        'atomic_orbitals',
+        'coefficient_of_linear_thermal_expansion',
+        'ground_state_term_symbol',
+        'valence',
+    ]
+)
+
+
+def _row_from_Z(z: int) -> int:
+    total = 0
+    if 57 <= z <= 71:
+        return 8
+    if 89 <= z <= 103:
+        return 9
+    for i, size in enumerate(_pt_row_sizes):
+        total += size
+        if total >= z:
+            return i + 1
+    return 8
+
+
+def _group_from_Z(z: int) -> int:
+    if z == 1:
+        return 1
+    if z == 2:
+        return 18
+    if 3 <= z <= 18:
+        if (z - 2) % 8 == 0:
+            return 18
+        if (z - 2) % 8 <= 2:
+            return (z - 2) % 8
+        return 10 + (z - 2) % 8
+
+    if 19 <= z <= 54:
+        if (z - 18) % 18 == 0:
+            return 18
+        return (z - 18) % 18
+
+    if (z - 54) % 32 == 0:
+        return 18
+    if (z - 54) % 32 >= 18:
+        return (z - 54) % 32 - 14
+    return (z - 54) % 32
+
+
+def _parse_property(item: str, val):
+    """
+    Normalize a raw periodic table value. Numbers are converted to float and values with units
+    are returned as a `(value, unit)` tuple, from which a Descriptor is made on access.
+    """
+    if str(val).startswith('no data'):
+        return None
+    if isinstance(val, dict):
+        return val
+    try:
+        return float(val)
+    except ValueError:
+        nobracket = re.sub(r'\(.*\)', '', val)
+        toks = nobracket.replace('about', '').strip().split(' ', 1)
+        if len(toks) == 2:
+            try:
+                if '10<sup>' in toks[1]:
+                    base_power = re.findall(r'([+-]?\d+)', toks[1])
+                    factor = 'e' + base_power[1]
+                    if toks[0] in ['&gt;', 'high']:
+                        toks[0] = '1'  # return the border value
+                    toks[0] += factor
+                    if item == 'electrical_resistivity':
+                        unit = 'ohm m'
+                    elif item == 'coefficient_of_linear_thermal_expansion':
+                        unit = 'K^-1'
+                    else:
+                        unit = toks[1]
+                else:
+                    unit = toks[1].replace('<sup>', '^').replace('</sup>', '').replace('&Omega;', 'ohm')
+                # Validate once, so that only valid values are returned as Descriptors
+                Descriptor(item, toks[0], unit)
+                return toks[0], unit
+            except ValueError:
+                # Ignore error. val will just remain a string.
+                pass
+    return val
+
+
+class _PeriodicTableStore:
+    """
+    Periodic table data, loaded from `periodic_table.json` on first use and indexed by symbol,
+    atomic number and (row, group). Parsed properties are normalized once per element.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._data = None
+        self._by_Z = None
+        self._by_row_and_group = None
+        self._properties = {}
+
+    @property
+    def data(self) -> dict:
+        return self._load()
+
+    def _load(self) -> dict:
+        if self._data is None:
+            with open(self._path, 'rt') as f:
+                data = json.load(f)
+            self._by_Z = {}
+            self._by_row_and_group = {}
+            for sym, d in data.items():
+                z = d['Atomic no']
+                self._by_Z.setdefault(z, sym)
+                self._by_row_and_group.setdefault((_row_from_Z(z), _group_from_Z(z)), sym)
+            self._data = data
+        return self._data
+
+    def entry(self, symbol: str) -> dict:
+        return self.data[symbol]
+
+    def symbol_from_Z(self, z: int) -> Optional[str]:
+        self._load()
+        return self._by_Z.get(z)
+
+    def symbol_from_row_and_group(self, row: int, group: int) -> Optional[str]:
+        self._load()
+        return self._by_row_and_group.get((row, group))
+
+    def property(self, symbol: str, item: str):
+        key = (symbol, item)
+        if key not in self._properties:
+            kstr = item.capitalize().replace('_', ' ')
+            self._properties[key] = _parse_property(item, self.entry(symbol).get(kstr, None))
+        return self._properties[key]
+
+
+# Element data is loaded from the json file on first use
+_pt_store = _PeriodicTableStore(os.path.join(str(Path(__file__).absolute().parent.parent), 'Databases', 'periodic_table.json'))
+
 
 class Element(Enum):
     """Enum representing an element in the periodic table."""
@@ -416,19 +570,24 @@ class Element(Enum):
             {oxidation state: ionic radii}. Radii are given in ang.
         """
         self.symbol = '%s' % symbol
-        d = _pt_data[symbol]
 
-        # Store key variables for quick access
-        self.Z = d['Atomic no']
+    @property
+    def Z(self) -> int:
+        """
+        Atomic number of the element.
+        """
+        return _pt_store.entry(self.symbol)['Atomic no']
 
-        at_r = d.get('Atomic radius', 'no data')
-        if str(at_r).startswith('no data'):
-            self._atomic_radius = None
-        else:
-            self._atomic_radius = Descriptor('atomic_radius', at_r, 'angstrom')
-        self._atomic_mass = Descriptor('atomic_mass', d['Atomic mass'], 'amu')
-        self.long_name = d['Name']
-        self._data = d
+    @property
+    def long_name(self) -> str:
+        """
+        Name of the element.
+        """
+        return _pt_store.entry(self.symbol)['Name']
+
+    @property
+    def _data(self) -> dict:
+        return _pt_store.entry(self.symbol)
 
     @property
     def X(self):
@@ -450,6 +609,12 @@ class Element(Enum):
         """
         Returns: The atomic radius of the element in Ångstroms.
         """
+        if '_atomic_radius' not in self.__dict__:
+            at_r = self._data.get('Atomic radius', 'no data')
+            if str(at_r).startswith('no data'):
+                self._atomic_radius = None
+            else:
+                self._atomic_radius = Descriptor('atomic_radius', at_r, 'angstrom')
         return self._atomic_radius
 
     @property
@@ -457,70 +622,15 @@ class Element(Enum):
         """
         Returns: The atomic mass of the element in amu.
         """
+        if '_atomic_mass' not in self.__dict__:
+            self._atomic_mass = Descriptor('atomic_mass', self._data['Atomic mass'], 'amu')
         return self._atomic_mass
 
     def __getattr__(self, item):
-        if item in [
-            'mendeleev_no',
-            'electrical_resistivity',
-            'velocity_of_sound',
-            'reflectivity',
-            'refractive_index',
-            'poissons_ratio',
-            'molar_volume',
-            'thermal_conductivity',
-            'boiling_point',
-            'melting_point',
-            'critical_temperature',
-            'superconduction_temperature',
-            'liquid_range',
-            'bulk_modulus',
-            'youngs_modulus',
-            'brinell_hardness',
-            'rigidity_modulus',
-            'mineral_hardness',
-            'vickers_hardness',
-            'density_of_solid',
-            'atomic_radius_calculated',
-            'van_der_waals_radius',
-            'atomic_orbitals',
-            'coefficient_of_linear_thermal_expansion',
-            'ground_state_term_symbol',
-            'valence',
-        ]:
-            kstr = item.capitalize().replace('_', ' ')
-            val = self._data.get(kstr, None)
-            if str(val).startswith('no data'):
-                val = None
-            elif isinstance(val, dict):
-                pass
-            else:
-                try:
-                    val = float(val)
-                except ValueError:
-                    nobracket = re.sub(r'\(.*\)', '', val)
-                    toks = nobracket.replace('about', '').strip().split(' ', 1)
-                    if len(toks) == 2:
-                        try:
-                            if '10<sup>' in toks[1]:
-                                base_power = re.findall(r'([+-]?\d+)', toks[1])
-                                factor = 'e' + base_power[1]
-                                if toks[0] in ['&gt;', 'high']:
-                                    toks[0] = '1'  # return the border value
-                                toks[0] += factor
-                                if item == 'electrical_resistivity':
-                                    unit = 'ohm m'
-                                elif item == 'coefficient_of_linear_thermal_expansion':
-                                    unit = 'K^-1'
-                                else:
-                                    unit = toks[1]
-                                val = Descriptor(item, toks[0], unit)
-                            else:
-                                unit = toks[1].replace('<sup>', '^').replace('</sup>', '').replace('&Omega;', 'ohm')
-                                val = Descriptor(item, toks[0], unit)
-                        except ValueError:
-                            # Ignore error. val will just remain a string.
-                            pass
+        if item in _pt_parsed_properties:
+            val = _pt_store.property(self.symbol, item)
+            if isinstance(val, tuple):
+                val = Descriptor(item, *val)
             return val
         raise AttributeError('Element has no attribute %s!' % item)
 
@@ -804,9 +914,9 @@ class Element(Enum):
         Returns:
             Element with atomic number z.
         """
-        for sym, data in _pt_data.items():
-            if data['Atomic no'] == z:
-                return Element(sym)
+        sym = _pt_store.symbol_from_Z(z)
+        if sym is not None:
+            return Element(sym)
         raise ValueError('No element with this atomic number %s' % z)
 
     @staticmethod
@@ -821,10 +931,9 @@ class Element(Enum):
         .. note::
             The 18 group number system is used, i.e., Noble gases are group 18.
         """
-        for sym in _pt_data.keys():
-            el = Element(sym)
-            if el.row == row and el.group == group:
-                return el
+        sym = _pt_store.symbol_from_row_and_group(row, group)
+        if sym is not None:
+            return Element(sym)
         raise ValueError('No element with this row and group!')
 
     @staticmethod
@@ -846,45 +955,14 @@ class Element(Enum):
         """
         Returns the periodic table row of the element.
         """
-        z = self.Z
-        total = 0
-        if 57 <= z <= 71:
-            return 8
-        if 89 <= z <= 103:
-            return 9
-        for i, size in enumerate(_pt_row_sizes):
-            total += size
-            if total >= z:
-                return i + 1
-        return 8
+        return _row_from_Z(self.Z)
 
     @property
     def group(self):
         """
         Returns the periodic table group of the element.
         """
-        z = self.Z
-        if z == 1:
-            return 1
-        if z == 2:
-            return 18
-        if 3 <= z <= 18:
-            if (z - 2) % 8 == 0:
-                return 18
-            if (z - 2) % 8 <= 2:
-                return (z - 2) % 8
-            return 10 + (z - 2) % 8
-
-        if 19 <= z <= 54:
-            if (z - 18) % 18 == 0:
-                return 18
-            return (z - 18) % 18
-
-        if (z - 54) % 32 == 0:
-            return 18
-        if (z - 54) % 32 >= 18:
-            return (z - 54) % 32 - 14
-        return (z - 54) % 32
+        return _group_from_Z(self.Z)
 
     @property
     def block(self):
@@ -4,11 +4,17 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING
 from typing import ClassVar
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import NamedTuple
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
 import numpy as np
@@ -16,19 +22,77 @@ from easyscience.Objects.Groups import BaseCollection
 from easyscience.Objects.ObjectClasses import BaseObj
 from easyscience.Objects.variable import DescriptorStr
 from easyscience.Objects.variable import Parameter
+from gemmi import cif
 
+from easycrystallography.Components.AtomsTable import AtomsTable
 from easycrystallography.Components.Lattice import Lattice
 from easycrystallography.Components.Lattice import PeriodicLattice
 from easycrystallography.Components.Site import Atoms
 from easycrystallography.Components.Site import PeriodicAtoms
 from easycrystallography.Components.Site import Site
 from easycrystallography.Components.SpaceGroup import SpaceGroup
+from easycrystallography.io.cif_parser import PhaseValues
+from easycrystallography.io.cif_parser import iter_structures
+from easycrystallography.io.cif_parser import phase_from_values
+from easycrystallography.io.cif_parser import read_phase_values
 from easycrystallography.io.parser import Parsers
+from easycrystallography.Structures.StructureFactor import RADIATIONS
+from easycrystallography.Structures.StructureFactor import SiteContributions
+from easycrystallography.Structures.StructureFactor import debye_waller_tensor
+from easycrystallography.Structures.StructureFactor import scattering_factors
+from easycrystallography.Structures.StructureFactor import site_key
+from easycrystallography.Structures.StructureFactor import site_structure_factors
+from easycrystallography.Utils.cache import CacheInfo
 
 if TYPE_CHECKING:
     from easyscience.Utils.typing import iF
 
 
+class SupercellSites(NamedTuple):
+    """
+    Atomic positions in a supercell as one array, with the site and the orbit position of each atom.
+    """
+
+    labels: List[str]  #: labels of the sites, indexed by `site_index`
+    positions: np.ndarray  #: (N, 3) fractional coordinates
+    site_index: np.ndarray  #: (N,) index of the site of each position
+    orbit_index: np.ndarray  #: (N,) index of each position in the orbit of its site
+
+    def by_label(self) -> Dict[str, np.ndarray]:
+        """
+        The positions of each site.
+
+        :return: dictionary with keys of atom labels, containing numpy arrays of the positions
+        :rtype: Dict[str, np.ndarray]
+        """
+        return {label: self.positions[self.site_index == idx] for idx, label in enumerate(self.labels)}
+
+
+class PhaseRecord(NamedTuple):
+    """
+    Read-only phase, with the sites as a table of values instead of `Site` objects, for work which does not refine
+    anything. The sites are read through `atoms.records()`, each record creates its `Site` when one is needed.
+    """
+
+    name: str
+    cell: Lattice  #: lattice of the phase
+    space_group: SpaceGroup  #: space group of the phase
+    atoms: AtomsTable  #: sites of the phase
+
+    def to_phase(self, phase_class: Optional[type] = None) -> Phase:
+        """
+        Create the refinable phase of the record.
+
+        :param phase_class: Class of the phase. Default `Phase`
+        :return: Phase with the values of the record
+        :rtype: Phase
+        """
+        if phase_class is None:
+            phase_class = Phase
+        atoms = phase_class._ATOMS_CLASS('atoms', *[self.atoms.to_site(idx) for idx in range(len(self.atoms))])
+        return phase_class(self.name, space_group=self.space_group, cell=self.cell, atoms=atoms)
+
+
 class Phase(BaseObj):
     _SITE_CLASS = Site
     _ATOMS_CLASS = Atoms
@@ -73,6 +137,7 @@ class Phase(BaseObj):
         self._extent = np.array([1, 1, 1])
         self._centre = np.array([0, 0, 0])
         self.atom_tolerance = 1e-4
+        self._structure_factor_cache = SiteContributions()
 
     def add_atom(self, *args, **kwargs):
         """
@@ -99,30 +164,9 @@ class Phase(BaseObj):
         :rtype: Dict[str, np.ndarray]
         """
 
-        if extent is None:
-            extent = self._extent
-
-        offsets = np.array(
-            np.meshgrid(
-                range(0, extent[0] + 1),
-                range(0, extent[1] + 1),
-                range(0, extent[2] + 1),
-            )
-        ).T.reshape(-1, 3)
-
         orbits = self.get_orbits(magnetic_only=magnetic_only)
-        for orbit_key in orbits.keys():
-            orbit = orbits[orbit_key]
-            site_positions = np.apply_along_axis(np.add, 1, offsets, orbit).reshape((-1, 3)) - self.center
-            orbits[orbit_key] = (
-                site_positions[
-                    np.all(site_positions >= -self.atom_tolerance, axis=1)
-                    & np.all(site_positions <= extent + self.atom_tolerance, axis=1),
-                    :,
-                ]
-                + self.center
-            )
-        return orbits
+        labels = list(orbits.keys())
+        return next(self._expand_orbits(labels, list(orbits.values()), extent), _no_sites(labels)).by_label()
 
     def get_orbits(self, magnetic_only: bool = False) -> Dict[str, np.ndarray]:
         """
@@ -214,20 +258,6 @@ class Phase(BaseObj):
         new_center = new_center.reshape((3,))
         self._centre = new_center
 
-    def _generate_positions(self, site, extent) -> np.ndarray:
-        """
-        Generate all orbits for a given fractional position.
-        """
-        sym_op = self.space_group._sg_data.get_orbit
-        offsets = np.array(
-            np.meshgrid(
-                range(0, extent[0] + 1),
-                range(0, extent[1] + 1),
-                range(0, extent[2] + 1),
-            )
-        ).T.reshape(-1, 3)
-        return np.apply_along_axis(np.add, 1, offsets, np.array(sym_op(site.fract_coords))).reshape((-1, 3))
-
     def all_sites(self, extent=None) -> Dict[str, np.ndarray]:
         """
         Generate all atomic positions from the atom array and symmetry operations over an extent.
@@ -238,22 +268,212 @@ class Phase(BaseObj):
         if self.space_group is None:
             return {atom.label: atom.fract_coords for atom in self.atoms}
 
+        return self.supercell_sites(extent).by_label()
+
+    def supercell_sites(self, extent=None) -> SupercellSites:
+        """
+        Generate all atomic positions from the atom array and symmetry operations over an extent, as one array.
+        The positions are ordered by unit cell, then by site and then by position in the orbit of the site. Without a
+        space group the positions of the sites are given, as by `all_sites`.
+
+        :param extent: Extent in unit cells, (0, 0, 0) -> extent. Default `obj.extent`
+        :return: Positions with the index of the site and the index in the orbit of the site of each position
+        :rtype: SupercellSites
+        """
+        if self.space_group is None:
+            return self._asymmetric_sites()
+
+        labels, orbits = self._site_orbits()
+        return next(self._expand_orbits(labels, orbits, extent), _no_sites(labels))
+
+    def iter_supercell_sites(self, extent=None, chunk_size: Optional[int] = 2**20) -> Iterator[SupercellSites]:
+        """
+        Generate the positions of `supercell_sites` in chunks of about `chunk_size` positions, so that large extents
+        do not have to be held in memory at once. Chunks hold whole unit cells, in the order of `supercell_sites`.
+
+        :param extent: Extent in unit cells, (0, 0, 0) -> extent. Default `obj.extent`
+        :param chunk_size: Approximate number of positions per chunk. None gives all positions in one chunk
+        :return: Iterator over the chunks of positions
+        :rtype: Iterator[SupercellSites]
+        """
+        if self.space_group is None:
+            return iter([self._asymmetric_sites()])
+
+        labels, orbits = self._site_orbits()
+        return self._expand_orbits(labels, orbits, extent, chunk_size)
+
+    def fractional_positions(
+        self,
+        extent=None,
+        dtype: np.dtype = np.float64,
+        out: Optional[np.ndarray] = None,
+        chunk_size: Optional[int] = 2**20,
+    ) -> SupercellSites:
+        """
+        The positions of `supercell_sites` as fractional coordinates, written to one contiguous array of `dtype`. The
+        positions are generated and written in chunks, so that only one chunk is held in double precision.
+
+        :param extent: Extent in unit cells, (0, 0, 0) -> extent. Default `obj.extent`
+        :param dtype: Floating point type of the positions, e.g. `np.float32`. Ignored if `out` is given
+        :param out: (M, 3) array to write the positions to, with M at least the number of positions. The positions
+            are written to its first rows
+        :param chunk_size: Approximate number of positions per chunk, see `iter_supercell_sites`
+        :return: Positions with the index of the site and the index in the orbit of the site of each position
+        :rtype: SupercellSites
+        """
+        return self._write_positions(extent, dtype, out, chunk_size)
+
+    def cartesian_positions(
+        self,
+        extent=None,
+        dtype: np.dtype = np.float64,
+        out: Optional[np.ndarray] = None,
+        chunk_size: Optional[int] = 2**20,
+    ) -> SupercellSites:
+        """
+        The positions of `supercell_sites` as Cartesian coordinates in Å, written to one contiguous array of `dtype`.
+        The positions are generated and transformed in chunks in double precision, so that only one chunk is held in
+        double precision.
+
+        :param extent: Extent in unit cells, (0, 0, 0) -> extent. Default `obj.extent`
+        :param dtype: Floating point type of the positions, e.g. `np.float32`. Ignored if `out` is given
+        :param out: (M, 3) array to write the positions to, with M at least the number of positions. The positions
+            are written to its first rows
+        :param chunk_size: Approximate number of positions per chunk, see `iter_supercell_sites`
+        :return: Positions with the index of the site and the index in the orbit of the site of each position
+        :rtype: SupercellSites
+        """
+        return self._write_positions(extent, dtype, out, chunk_size, self.cell.matrix)
+
+    def _write_positions(
+        self,
+        extent,
+        dtype: np.dtype,
+        out: Optional[np.ndarray],
+        chunk_size: Optional[int],
+        matrix: Optional[np.ndarray] = None,
+    ) -> SupercellSites:
+        """
+        Write the positions of `supercell_sites` chunk by chunk to one array, transformed by `matrix` if given. The
+        number of positions is counted beforehand, so the array is allocated once.
+        """
+        if self.space_group is None:
+            sites = self._asymmetric_sites()
+            labels, n, chunks = sites.labels, len(sites.positions), [sites]
+        else:
+            labels, orbits = self._site_orbits()
+            n = _count_positions(
+                orbits, np.asarray(self._extent if extent is None else extent), self.center, self.atom_tolerance
+            )
+            chunks = self._expand_orbits(labels, orbits, extent, chunk_size)
+        positions = _positions_buffer(n, dtype, out)
+        site_index = np.empty(n, dtype=int)
+        orbit_index = np.empty(n, dtype=int)
+        start = 0
+        for chunk in chunks:
+            stop = start + len(chunk.positions)
+            if matrix is None:
+                np.copyto(positions[start:stop], chunk.positions, casting='same_kind')
+            else:
+                np.matmul(chunk.positions, matrix, out=positions[start:stop], casting='same_kind')
+            site_index[start:stop] = chunk.site_index
+            orbit_index[start:stop] = chunk.orbit_index
+            start = stop
+        return SupercellSites(labels, positions, site_index, orbit_index)
+
+    def _asymmetric_sites(self) -> SupercellSites:
+        """
+        The positions of the sites themselves, as `all_sites` gives them without a space group.
+        """
+        labels = [site.label.value for site in self.atoms]
+        if not labels:
+            return _no_sites(labels)
+        positions = np.array([site.fract_coords for site in self.atoms], dtype=float)
+        return SupercellSites(labels, positions, np.arange(len(labels)), np.zeros(len(labels), dtype=int))
+
+    def _site_orbits(self) -> Tuple[List[str], List[np.ndarray]]:
+        """
+        Labels of the sites and the orbits of the sites under the space group.
+        """
+        labels = [site.label.value for site in self.atoms]
+        orbits = [self.space_group.get_orbit(site) for site in self.atoms]
+        return labels, orbits
+
+    def _expand_orbits(
+        self, labels: List[str], orbits: List[np.ndarray], extent=None, chunk_size: Optional[int] = None
+    ) -> Iterator[SupercellSites]:
+        """
+        Translate the orbits to all unit cells of the extent and keep the positions within the extent about the
+        center, in chunks of about `chunk_size` positions.
+        """
         if extent is None:
             extent = self._extent
+        return _expand_orbits(labels, orbits, np.asarray(extent), self.center, self.atom_tolerance, chunk_size)
 
-        sites = {}
-        for site in self.atoms:
-            unique_sites = self._generate_positions(site, extent)
-            site_positions = unique_sites - self.center
-            sites[site.label.value] = (
-                site_positions[
-                    np.all(site_positions >= -self.atom_tolerance, axis=1)
-                    & np.all(site_positions <= extent + self.atom_tolerance, axis=1),
-                    :,
-                ]
-                + self.center
+    def structure_factors(self, hkl: np.ndarray, radiation: str = 'neutron', chunk_size: Optional[int] = 2**22) -> np.ndarray:
+        """
+        Kinematic structure factors of reflections, with the occupancies and the isotropic or anisotropic
+        Debye-Waller factors of the sites. All sites, symmetry operations and reflections are evaluated together,
+        in chunks of reflections. The contribution of each site is cached, so that only the sites whose position,
+        occupancy, specie or displacement changed since the last call with the same reflections are recomputed.
+
+        :param hkl: (N, 3) Miller indices, or the indices of one reflection
+        :param radiation: `neutron` for structure factors in fm or `xray` for structure factors in electrons
+        :param chunk_size: Approximate number of elements of the work arrays. None evaluates all reflections at once
+        :return: (N,) complex structure factors
+        :rtype: np.ndarray
+        """
+        if radiation not in RADIATIONS:
+            raise ValueError(f'Unknown radiation {radiation}, use one of {RADIATIONS}.')
+        hkl = np.asarray(hkl, dtype=float).reshape(-1, 3)
+        g_star = self.cell.reciprocal_metric_tensor
+        q = 2 * np.pi * np.sqrt(np.einsum('ni,ij,nj->n', hkl, g_star, hkl))
+        sym_ops = self.space_group.symmetry_op_set
+
+        cache = self._structure_factor_cache
+        cache.validate((radiation, hkl.tobytes(), g_star.tobytes(), sym_ops.affine_matrices.tobytes()))
+
+        sites = list(self.atoms)
+        names = [site.unique_name for site in sites]
+        keys = [site_key(site) for site in sites]
+        stale = cache.stale(names, keys)
+        if stale:
+            positions = np.array([sites[idx].fract_coords for idx in stale])
+            betas = np.array([debye_waller_tensor(sites[idx].adp, g_star) for idx in stale])
+            geometric = site_structure_factors(
+                hkl, positions, betas, sym_ops.rotation_matrices, sym_ops.translation_vectors, chunk_size
             )
-        return sites
+            for idx, position, site_factors in zip(stale, positions, geometric):
+                site = sites[idx]
+                weight = site.occupancy.value * len(self.space_group.get_orbit(position))
+                contribution = weight * scattering_factors(site.specie, q, radiation) * site_factors
+                cache.store(names[idx], keys[idx], contribution)
+        return cache.total(names, len(hkl))
+
+    def structure_factor_cache_info(self) -> CacheInfo:
+        """
+        Statistics of the cache of site contributions to the structure factors. A hit is a site whose contribution
+        was reused by `structure_factors`, a miss a site which was recomputed.
+
+        :return: hits, misses, evictions, maximum size and current size of the cache
+        :rtype: CacheInfo
+        """
+        return self._structure_factor_cache.info()
+
+    def clear_structure_factor_cache(self):
+        """
+        Drop the cached site contributions to the structure factors.
+        """
+        self._structure_factor_cache.clear()
+
+    def to_record(self) -> PhaseRecord:
+        """
+        Read-only record of the current values of the phase.
+
+        :return: Record of the phase
+        :rtype: PhaseRecord
+        """
+        return PhaseRecord(self.name, self.cell, self.space_group, AtomsTable.from_atoms(self.atoms))
 
     @property
     def cif(self) -> str:
@@ -279,6 +499,76 @@ class Phase(BaseObj):
         return s
 
 
+def _expand_orbits(
+    labels: List[str],
+    orbits: List[np.ndarray],
+    extent: np.ndarray,
+    center: np.ndarray,
+    tol: float,
+    chunk_size: Optional[int] = None,
+) -> Iterator[SupercellSites]:
+    """
+    Translate the orbits to the unit cells (0, 0, 0) -> extent with broadcasting and keep the positions within the
+    extent about the center. Unit cells are taken in the order of the previous meshgrid, c slowest and b fastest.
+    """
+    if not orbits:
+        return
+    orbit = np.vstack([np.reshape(o, (-1, 3)) for o in orbits])
+    sizes = [len(o) for o in orbits]
+    site_index = np.repeat(np.arange(len(orbits)), sizes)
+    orbit_index = np.concatenate([np.arange(n) for n in sizes])
+    n_a, n_b, n_c = [int(n) + 1 for n in extent]
+    n_cells = n_a * n_b * n_c
+    cells = n_cells if chunk_size is None else max(1, chunk_size // max(1, len(orbit)))
+    for start in range(0, n_cells, cells):
+        cell = np.arange(start, min(start + cells, n_cells))
+        offsets = np.stack(((cell // n_b) % n_a, cell % n_b, cell // (n_a * n_b)), axis=1)
+        site_positions = (offsets[:, None, :] + orbit[None, :, :]).reshape((-1, 3)) - center
+        in_extent = np.all(site_positions >= -tol, axis=1) & np.all(site_positions <= extent + tol, axis=1)
+        yield SupercellSites(
+            labels,
+            site_positions[in_extent] + center,
+            np.tile(site_index, len(cell))[in_extent],
+            np.tile(orbit_index, len(cell))[in_extent],
+        )
+
+
+def _count_positions(orbits: List[np.ndarray], extent: np.ndarray, center: np.ndarray, tol: float) -> int:
+    """
+    Number of positions `_expand_orbits` keeps, without generating them. A position is kept if each of its coordinates
+    is within the extent, so the unit cells are counted for each axis and each orbit position separately.
+    """
+    if not orbits:
+        return 0
+    orbit = np.vstack([np.reshape(o, (-1, 3)) for o in orbits])
+    counts = np.ones(len(orbit), dtype=np.int64)
+    for axis in range(3):
+        offsets = np.arange(int(extent[axis]) + 1)
+        coords = (offsets[:, None] + orbit[None, :, axis]) - center[axis]
+        counts *= np.count_nonzero((coords >= -tol) & (coords <= extent[axis] + tol), axis=0)
+    return int(counts.sum())
+
+
+def _positions_buffer(n: int, dtype: np.dtype, out: Optional[np.ndarray]) -> np.ndarray:
+    """
+    The (n, 3) array to write positions to, a new array of `dtype` or the first rows of `out`.
+    """
+    if out is None:
+        dtype = np.dtype(dtype)
+        if dtype.kind != 'f':
+            raise ValueError(f'Positions must be stored as floating point numbers, not {dtype}.')
+        return np.empty((n, 3), dtype=dtype)
+    if out.dtype.kind != 'f':
+        raise ValueError(f'Positions must be stored as floating point numbers, not {out.dtype}.')
+    if out.ndim != 2 or out.shape[1] != 3 or len(out) < n:
+        raise ValueError(f'An array of shape {out.shape} can not hold {n} positions, it needs a shape of ({n}, 3).')
+    return out[:n]
+
+
+def _no_sites(labels: List[str]) -> SupercellSites:
+    return SupercellSites(labels, np.zeros((0, 3)), np.zeros(0, dtype=int), np.zeros(0, dtype=int))
+
+
 class Phases(BaseCollection):
     _SITE_CLASS = Site
     _ATOM_CLASS = Atoms
@@ -298,6 +588,7 @@ class Phases(BaseCollection):
 
         super(Phases, self).__init__(name, *args, **kwargs)
         self.interface = interface
+        self._load_errors = {}
 
     def __repr__(self) -> str:
         return f'Collection of {len(self)} phases: {self.phase_names}'
@@ -323,6 +614,13 @@ class Phases(BaseCollection):
     def phase_names(self) -> List[str]:
         return [phase.name for phase in self]
 
+    @property
+    def load_errors(self) -> Dict[str, Exception]:
+        """
+        Errors of the files which could not be loaded by `from_cif_files`, by file name.
+        """
+        return self._load_errors
+
     @property
     def cif(self) -> str:
         s = ''
@@ -344,3 +642,90 @@ class Phases(BaseCollection):
         with Parsers('cif_str').reader() as r:
             s = r.structures(cif_string, phase_class=cls._PHASE_CLASS)
         return s
+
+    @classmethod
+    def iter_cif_file(
+        cls, filename: str, block_names: Optional[Iterable[str]] = None, read_only: bool = False
+    ) -> Iterator[Union[Phase, PhaseRecord]]:
+        """
+        Read the phases of a CIF file one data block at a time. Each phase is created when it is requested, so only
+        one block is held in memory at a time.
+
+        :param filename: CIF file to read
+        :param block_names: Names of the data blocks to read. None reads all blocks
+        :param read_only: Give read-only `PhaseRecord`s, which do not create the sites of the phases
+        :return: Iterator over the phases, in the order of the blocks in the file
+        :rtype: Iterator[Union[Phase, PhaseRecord]]
+        """
+        with open(filename, 'r') as fid:
+            yield from iter_structures(fid, block_names, phase_class=cls._PHASE_CLASS, read_only=read_only)
+
+    @classmethod
+    def iter_cif_string(
+        cls, cif_string: str, block_names: Optional[Iterable[str]] = None, read_only: bool = False
+    ) -> Iterator[Union[Phase, PhaseRecord]]:
+        """
+        Read the phases of a CIF string one data block at a time.
+
+        :param cif_string: CIF text to read
+        :param block_names: Names of the data blocks to read. None reads all blocks
+        :param read_only: Give read-only `PhaseRecord`s, which do not create the sites of the phases
+        :return: Iterator over the phases, in the order of the blocks in the text
+        :rtype: Iterator[Union[Phase, PhaseRecord]]
+        """
+        return iter_structures(
+            cif_string.splitlines(keepends=True), block_names, phase_class=cls._PHASE_CLASS, read_only=read_only
+        )
+
+    @classmethod
+    def from_cif_files(cls, filenames: Iterable[str], workers: Optional[int] = None, executor: str = 'process') -> Phases:
+        """
+        Load the phases of many CIF files. The files are read, parsed and their values extracted concurrently, only
+        the phases are created in this process, as the created objects belong to its object graph. A file which can
+        not be loaded does not stop the others, its error is kept in `load_errors` of the returned collection and none
+        of its phases are added.
+
+        :param filenames: CIF files to load
+        :param workers: Number of workers. None uses the default of the executor, 1 loads the files without workers
+        :param executor: `process` or `thread` workers
+        :return: Phases of all files, in the order of the files and of the data blocks in each file
+        :rtype: Phases
+        """
+        if executor not in _EXECUTORS:
+            raise ValueError(f'Unknown executor {executor}, use one of {list(_EXECUTORS)}.')
+        filenames = [str(filename) for filename in filenames]
+        if workers == 1 or len(filenames) < 2:
+            results = list(map(_read_cif_file, filenames))
+        else:
+            with _EXECUTORS[executor](max_workers=workers) as pool:
+                results = list(pool.map(_read_cif_file, filenames))
+
+        phases = cls('from_cif')
+        for filename, (values, error) in zip(filenames, results):
+            if error is None:
+                try:
+                    duplicates = set(v.name for v in values).intersection(phases.phase_names)
+                    if duplicates:
+                        raise AttributeError(f'Phases of names {sorted(duplicates)} already exist.')
+                    loaded = [phase_from_values(v, cls._PHASE_CLASS) for v in values]
+                except Exception as e:
+                    error = e
+                else:
+                    for phase in loaded:
+                        phases.append(phase)
+            if error is not None:
+                phases._load_errors[filename] = error
+        return phases
+
+
+_EXECUTORS = {'process': ProcessPoolExecutor, 'thread': ThreadPoolExecutor}
+
+
+def _read_cif_file(filename: str) -> Tuple[Optional[List[PhaseValues]], Optional[Exception]]:
+    """
+    Read and parse a CIF file, giving the values of the phases of its blocks or the error of the file.
+    """
+    try:
+        return [read_phase_values(block) for block in cif.read(filename)], None
+    except Exception as e:
+        return None, e
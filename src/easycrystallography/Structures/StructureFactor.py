@@ -0,0 +1,193 @@
+# SPDX-FileCopyrightText: 2024 EasyCrystallography contributors
+# SPDX-License-Identifier: BSD-3-Clause
+# © 2022-2024 Contributors to the EasyCrystallography project <https://github.com/EasyScience/EasyCrystallography>
+
+"""
+Kinematic structure factors. The contribution of every site is evaluated for all symmetry operations and all
+reflections at once, in chunks of reflections so that the (operations, reflections, sites) work arrays stay bounded.
+
+For a site at `x` with the Debye-Waller tensor `β`, an operation `(R, t)` puts the atom at `R x + t` with the tensor
+`R β Rᵀ`, so with `h' = h R`
+
+    F(h) = Σ_sites occupancy · f(|Q|) · m / n_ops · Σ_ops exp(2πi (h'·x + h·t)) exp(-h'ᵀ β h')
+
+where `m` is the multiplicity of the site. Summing over all operations and scaling by `m / n_ops` counts a special
+position once per atom of its orbit.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+
+from easycrystallography.Utils.cache import CacheInfo
+
+if TYPE_CHECKING:
+    from easycrystallography.Components.AtomicDisplacement import AtomicDisplacement
+    from easycrystallography.Components.Site import Site
+    from easycrystallography.Components.Specie import Specie
+
+RADIATIONS = ('neutron', 'xray')
+
+
+def site_structure_factors(
+    hkl: np.ndarray,
+    positions: np.ndarray,
+    betas: np.ndarray,
+    rotations: np.ndarray,
+    translations: np.ndarray,
+    chunk_size: Optional[int] = 2**22,
+) -> np.ndarray:
+    """
+    Geometric part of the structure factor of each site, averaged over the symmetry operations.
+
+    :param hkl: (N, 3) Miller indices
+    :param positions: (S, 3) fractional coordinates of the sites
+    :param betas: (S, 3, 3) Debye-Waller tensors, the exponent of the factor is `-hᵀ β h`
+    :param rotations: (O, 3, 3) rotation parts of the symmetry operations
+    :param translations: (O, 3) translation parts of the symmetry operations
+    :param chunk_size: Approximate number of elements of the work arrays. None evaluates all reflections at once
+    :return: (S, N) complex array, `1 / n_ops · Σ_ops exp(2πi (h'·x + h·t)) exp(-h'ᵀ β h')`
+    """
+    hkl = np.asarray(hkl, dtype=float).reshape(-1, 3)
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    betas = np.asarray(betas, dtype=float).reshape(-1, 3, 3)
+    rotations = np.asarray(rotations, dtype=float).reshape(-1, 3, 3)
+    translations = np.asarray(translations, dtype=float).reshape(-1, 3)
+    n_ops = len(rotations)
+    n_sites = len(positions)
+
+    out = np.zeros((n_sites, len(hkl)), dtype=complex)
+    if n_sites == 0 or len(hkl) == 0:
+        return out
+    step = len(hkl) if chunk_size is None else max(1, chunk_size // (n_ops * n_sites))
+    for start in range(0, len(hkl), step):
+        h = hkl[start : start + step]
+        # (O, n, 3) reflections in the frame of each operation
+        h_rot = np.einsum('nj,ojk->onk', h, rotations)
+        phase = np.einsum('onk,sk->ons', h_rot, positions)
+        phase += (h @ translations.T).T[:, :, np.newaxis]
+        exponent = 2j * np.pi * phase
+        exponent -= np.einsum('onj,sjk,onk->ons', h_rot, betas, h_rot, optimize=True)
+        out[:, start : start + step] = np.exp(exponent).sum(axis=0).T / n_ops
+    return out
+
+
+def debye_waller_tensor(adp: AtomicDisplacement, reciprocal_metric: np.ndarray) -> np.ndarray:
+    """
+    Debye-Waller tensor `β` of an atomic displacement, so that the factor is `exp(-hᵀ β h)`.
+
+    Isotropic displacements give `β = 2π² U G*`. Anisotropic displacements are in the CIF convention, which gives
+    `β = 2π² N U N` with `N` the diagonal of the reciprocal lengths.
+
+    :param adp: Atomic displacement of the site
+    :param reciprocal_metric: Reciprocal metric tensor `G*` of the lattice
+    :return: (3, 3) Debye-Waller tensor
+    """
+    adp_type = adp.adp_type.value
+    values = [p.value for p in adp.adp_class.get_parameters()]
+    scale = 2 * np.pi**2
+    if adp_type.startswith('B'):
+        scale /= 8 * np.pi**2
+    if adp_type.endswith('iso'):
+        return scale * values[0] * reciprocal_metric
+    u_11, u_12, u_13, u_22, u_23, u_33 = values
+    u = np.array([[u_11, u_12, u_13], [u_12, u_22, u_23], [u_13, u_23, u_33]])
+    n = np.sqrt(np.diag(reciprocal_metric))
+    return scale * u * np.outer(n, n)
+
+
+def scattering_factors(specie: Specie, q: np.ndarray, radiation: str = 'neutron') -> np.ndarray:
+    """
+    Scattering factor of a specie at each reflection.
+
+    :param specie: Specie of the site
+    :param q: (N,) magnitudes of the scattering vectors in 1/Å
+    :param radiation: `neutron` for the scattering length in fm or `xray` for the form factor in electrons
+    :return: (N,) scattering factors
+    """
+    if radiation == 'neutron':
+        return np.full(np.shape(q), specie.scattering_length, dtype=complex)
+    if radiation == 'xray':
+        return specie.form_factor(q).astype(complex)
+    raise ValueError(f'Unknown radiation {radiation}, use one of {RADIATIONS}.')
+
+
+def site_key(site: Site) -> tuple:
+    """
+    The parameters of a site which enter its structure factor contribution.
+    """
+    adp = site.adp
+    return (
+        str(site.specie),
+        site.occupancy.value,
+        tuple(site.fract_coords),
+        adp.adp_type.value,
+        tuple(p.value for p in adp.adp_class.get_parameters()),
+    )
+
+
+class SiteContributions:
+    """
+    Structure factor contributions of sites, for one set of reflections, radiation, cell and symmetry operations.
+    A contribution is valid for the parameters of its site given by `site_key`, so a refinement step which changes a
+    few sites only recomputes those. The whole cache is cleared, and an eviction counted per entry, when the
+    reflections, the radiation, the cell or the symmetry operations change.
+    """
+
+    def __init__(self):
+        self._key: Optional[Hashable] = None
+        self._sites: Dict[str, Tuple[tuple, np.ndarray]] = {}
+        self._stats = [0, 0, 0]
+
+    def validate(self, key: Hashable):
+        """
+        Clear the contributions if they were calculated for a different `key`.
+        """
+        if key != self._key:
+            self.clear()
+            self._key = key
+
+    def stale(self, names: List[str], keys: List[tuple]) -> List[int]:
+        """
+        Indices of the sites without a valid contribution.
+        """
+        stale = []
+        for idx, (name, key) in enumerate(zip(names, keys)):
+            entry = self._sites.get(name)
+            if entry is None or entry[0] != key:
+                stale.append(idx)
+        self._stats[0] += len(names) - len(stale)
+        self._stats[1] += len(stale)
+        return stale
+
+    def store(self, name: str, key: tuple, contribution: np.ndarray):
+        contribution.flags.writeable = False
+        self._sites[name] = (key, contribution)
+
+    def total(self, names: List[str], size: int) -> np.ndarray:
+        """
+        Sum of the contributions of the sites `names`. Contributions of other sites are dropped.
+        """
+        for name in set(self._sites).difference(names):
+            del self._sites[name]
+            self._stats[2] += 1
+        total = np.zeros(size, dtype=complex)
+        for name in names:
+            total += self._sites[name][1]
+        return total
+
+    def clear(self):
+        self._stats[2] += len(self._sites)
+        self._sites.clear()
+        self._key = None
+
+    def info(self) -> CacheInfo:
+        hits, misses, evictions = self._stats
+        return CacheInfo(hits, misses, evictions, None, len(self._sites))
@@ -2,13 +2,16 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # © 2022-2024 Contributors to the EasyCrystallography project <https://github.com/EasyScience/EasyCrystallography>
 
+from typing import Iterator
 from typing import List
+from typing import Optional
 from typing import Tuple
 from typing import Union
 
 import numpy as np
 
 from easycrystallography.Symmetry.SymOp import SymmOp
+from easycrystallography.Symmetry.SymOp import SymmOpSet
 
 
 class Bonding:
@@ -36,6 +39,8 @@ def generate_bonds(
     d_min: float = 0.5,
     max_sym: int = None,
     magnetic_only: bool = False,
+    engine: str = 'auto',
+    max_memory: int = 2**30,
 ) -> Bonding:
     """
     `generate_bonds` generates all bonds up to a certain length between magnetic atoms. It also groups bonds based
@@ -58,6 +63,11 @@ def generate_bonds(
     :type max_sym: int
     :param magnetic_only: Search for bonds which are between magnetic atoms only.
     :type magnetic_only: bool
+    :param engine: Search for bonds with dense arrays over all atom pairs (`dense`), or with a cell list in chunks
+    (`cell_list`). `auto` uses the dense search if it fits in `max_memory`. Both give the same bonds.
+    :type engine: str
+    :param max_memory: Approximate memory budget of the bond search in bytes
+    :type max_memory: int
     :return: Structure containing bond information
     :rtype: Bonding
     """
@@ -73,26 +83,121 @@ def generate_bonds(
     h_max = np.min(np.array([h_max1, h_max2]), axis=0)
 
     # gives the number of extra unit cells along all 3 axes that are necessary to cover the minimum bond distance
-    n_c = np.ceil(max_distance / h_max)
+    n_c = np.ceil(max_distance / h_max).astype(int)
 
     all_atoms = phase_obj.get_orbits(magnetic_only=magnetic_only)
     all_atoms_r = np.vstack([np.array(all_atoms[key]) for key in all_atoms.keys()])
     n_atoms = all_atoms_r.shape[0]
 
+    if engine == 'auto':
+        n_pairs = (n_c[0] + 1) * (2 * n_c[1] + 1) * (2 * n_c[2] + 1) * n_atoms**2
+        engine = 'dense' if n_pairs * _DENSE_PAIR_BYTES <= max_memory else 'cell_list'
+    if engine == 'dense':
+        chunks = [_dense_bonds(all_atoms_r, phase_obj.cell.matrix, n_c, max_distance)]
+    elif engine == 'cell_list':
+        chunks = _cell_list_bonds(all_atoms_r, phase_obj.cell.matrix, n_c, max_distance, max_memory)
+    else:
+        raise ValueError(f'Unknown bond engine {engine}, use one of auto, dense or cell_list.')
+    c_mat, c_key = zip(*chunks)
+    c_mat = np.hstack(c_mat)
+    # sort according to distance, bonds of equal length keep the order of the dense search
+    s_index = np.lexsort((np.concatenate(c_key), c_mat[5, :]))
+    c_mat = c_mat[:, s_index]
+    c_idx = np.cumsum(np.array(np.insert(np.diff(c_mat[5, :]) > tol_dist, 0, True), dtype=int)) - 1
+    c_mat = np.vstack((c_mat, c_idx))
+
+    if c_mat[5, 0] < d_min:
+        raise ArithmeticError(f'Some atoms are too close (d_min={c_mat[5, 0]} < {d_min}), check your crystal structure!')
+
+    c_mat = c_mat[[0, 1, 2, 3, 4, 6], :]
+    basis_vector = phase_obj.cell.matrix
+    sym_ops = phase_obj.space_group.symmetry_op_set
+    if not force_no_sym:
+        n_mat = []
+        if max_sym is None:
+            max_sym = np.inf
+        max_idx_sym = max(c_idx[c_idx <= max_sym])
+        # image of every atom under every symmetry operation, shared by all bonds
+        atom_map = orbit_map(all_atoms_r, sym_ops, tol)
+        ii = 0
+        idx = 0
+        while ii <= max_idx_sym:
+            sort_ms = c_mat[:, c_idx == ii]
+            keys = bond_keys(sort_ms)
+            index = {key: i for i, key in enumerate(keys)}
+            done = np.zeros(len(keys), dtype=bool)
+            first = 0
+            while first < len(keys):
+                gen_c, un_c = bond(all_atoms_r, basis_vector, sort_ms[:, first], sym_ops, tol, atom_map)
+                # remove from sort_ms the identical couplings
+                found = {index.get(key) for key in bond_keys(gen_c)}
+                found = [i for i in found if i is not None and not done[i]]
+                done[found] = True
+                # Remove identical couplings from the symmetry generated list
+                gen_c = gen_c[:, un_c]
+                if len(found) != np.sum(un_c):
+                    raise ArithmeticError(f'Symmetry error! ii={ii}, idx={idx}. Try to change tol parameter.')
+                n_mat.append(np.vstack((gen_c, np.ones((1, gen_c.shape[1])) * idx)))
+                idx += 1
+                while first < len(keys) and done[first]:
+                    first += 1
+            ii += 1
+        n_mat = np.hstack(n_mat)
+        # include the increase of bond index in case bonds are split due to symmetry inequivalency
+        c_mat = c_mat[:, c_mat[5, :] > max_idx_sym]
+        c_mat[5, :] = c_mat[5, :] + n_mat[5, -1] - max_idx_sym
+        c_mat = np.hstack((n_mat, c_mat))
+
+        # Save the value of maximum bond index that is generated by symmetry
+        n_sym = n_mat[5, -1] + 1
+    else:
+        n_sym = 0
+
+    return Bonding(
+        c_mat[0:3, :].astype(int),
+        c_mat[3, :].astype(int),
+        c_mat[4, :].astype(int),
+        c_mat[5, :].astype(int),
+        n_sym,
+    )
+
+
+# Approximate number of bytes used per candidate bond by the dense and the cell list searches
+_DENSE_PAIR_BYTES = 192
+_CELL_LIST_PAIR_BYTES = 256
+
+
+def _dense_bonds(r: np.ndarray, bv: np.ndarray, n_c: np.ndarray, max_distance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find all bonds up to `max_distance` from the atoms in the (0,0,0) cell, using arrays over all atom pairs and
+    cell translations.
+
+    :param r: Positions of the atoms in lattice units, n_atoms x 3
+    :type r: np.ndarray
+    :param bv: Basis vectors that define the lattice
+    :type bv: np.ndarray
+    :param n_c: Number of extra unit cells along the 3 axes
+    :type n_c: np.ndarray
+    :param max_distance: Maximum bond length
+    :type max_distance: float
+    :return: Bonds as columns of `[dl_a dl_b dl_c atom_1 atom_2 d]` and the position of each bond in the search
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    n_atoms = r.shape[0]
     c_dim = np.array([n_c[0] + 1, 2 * n_c[1] + 1, 2 * n_c[2] + 1])
 
     # generate all cell translations
     c_tr1, c_tr2, c_tr3 = np.mgrid[0 : n_c[0] + 1, -n_c[1] : n_c[1] + 1, -n_c[2] : n_c[2] + 1]
     # cell origin translations: Na x Nb x Nc x 1 x 1 x3
-    c_tr = np.stack([c_tr1, c_tr2, c_tr3], axis=3).reshape((*c_tr1.shape, 1, 1, 3))
+    c_tr = np.stack([c_tr1, c_tr2, c_tr3], axis=3).reshape((*c_tr1.shape, 1, 1, 3)).astype(float)
     # remove unit cells that would produce duplicate bonds mark them with NaN (enough to do along a-axis values)
     c_tr[0, :, np.array(range(int(c_dim[2]))) < int(n_c[2]), 0, 0, 0] = np.nan
     c_tr[0, np.array(range(int(c_dim[1]))) < int(n_c[1]), int(n_c[2]), 0, 0, 0] = np.nan
     # % positions of atoms in the half 'cube' in l.u.
     # % Na x Nb x Nc x 1 x nMagAtom x 3
     # % atom2
-    r1 = all_atoms_r.reshape((1, 1, 1, 1, -1, 3))
-    r2 = all_atoms_r.reshape((1, 1, 1, -1, 1, 3))
+    r1 = r.reshape((1, 1, 1, 1, -1, 3))
+    r2 = r.reshape((1, 1, 1, -1, 1, 3))
     a_pos = r1 + c_tr
     # generate all distances from the atoms in the (0,0,0) cell in l.u.
     # r(atom2) - r(atom1)
@@ -104,7 +209,7 @@ def generate_bonds(
         1 + np.tril(np.nan * np.ones((n_atoms, n_atoms))).reshape((n_atoms, n_atoms, 1))
     )
     # calculate the absolute value of the distances in Angstrom
-    d_ra = np.sqrt(np.sum(np.einsum('abcdei,ij->abcdej', d_r, phase_obj.cell.matrix) ** 2, axis=5))
+    d_ra = np.sqrt(np.sum(np.einsum('abcdei,ij->abcdej', d_r, bv) ** 2, axis=5))
     # reshape the numbers into a column list of bonds
     # 3 x Na x Nb x Nc x nMagAtom x nMagAtom
     dl = np.transpose(np.tile(c_tr, [1, 1, 1, n_atoms, n_atoms, 1]), axes=[5, 0, 1, 2, 3, 4])
@@ -125,72 +230,105 @@ def generate_bonds(
     d_ra_ = d_ra.reshape((1, -1), order='F')
 
     c_mat = np.vstack((dl_, atom1_, atom2_, d_ra_))
-    # remove nan bonds
-    c_mat = c_mat[:, ~np.isnan(c_mat[0, :])]
-    # sort according to distance
-    s_index = np.argsort(c_mat[5, :])
-    c_mat = c_mat[:, s_index]
-    # Apply cutoff
-    c_index = c_mat[5, :] <= max_distance
-    c_mat = c_mat[:, c_index]
-    c_idx = np.cumsum(np.array(np.insert(np.diff(c_mat[5, :]) > tol_dist, 0, True), dtype=int)) - 1
-    c_mat = np.vstack((c_mat, c_idx))
+    # remove nan bonds and apply cutoff
+    c_key = np.flatnonzero(~np.isnan(c_mat[0, :]) & (c_mat[5, :] <= max_distance))
+    return c_mat[:, c_key], c_key
 
-    if c_mat[5, 0] < d_min:
-        raise ArithmeticError(f'Some atoms are too close (d_min={c_mat[5, 0]} < {d_min}), check your crystal structure!')
 
-    d_ra = c_mat[5, :]
-    c_mat = c_mat[[0, 1, 2, 3, 4, 6], :]
-    basis_vector = phase_obj.cell.matrix
-    sym_ops = phase_obj.spacegroup.symmetry_ops
-    if not force_no_sym:
-        n_mat = []
-        if max_sym is None:
-            max_sym = np.inf
-        max_idx_sym = max(c_idx[c_idx <= max_sym])
-        ii = 0
-        idx = 0
-        while ii <= max_idx_sym:
-            sort_ms = c_mat[:, c_idx == ii]
-            while sort_ms.shape[1] > 0:
-                gen_c, un_c = bond(all_atoms_r, basis_vector, sort_ms[:, 0], sym_ops, tol)
-                gen_c_all = np.hstack((gen_c, np.vstack((-gen_c[0:3, :], gen_c[[4, 3], :]))))
-                # remove from sort_ms the identical couplings
-                i_new, _ = isnew(gen_c_all, sort_ms[0:5, :], tol)
-                sort_ms = sort_ms[:, i_new]
-                # Remove identical couplings from the symmetry generated list
-                gen_c = gen_c[:, un_c]
-                if np.sum(~i_new) != np.sum(un_c):
-                    raise ArithmeticError(f'Symmetry error! ii={ii}, idx={idx}. Try to change tol parameter.')
-                n_mat.append(np.vstack((gen_c, np.ones((1, gen_c.shape[1])) * idx)))
-                idx += 1
-            ii += 1
-        n_mat = np.hstack(n_mat)
-        # include the increase of bond index in case bonds are split due to symmetry inequivalency
-        c_mat = c_mat[:, c_mat[5, :] > max_idx_sym]
-        c_mat[5, :] = c_mat[5, :] + n_mat[5, -1] - max_idx_sym
-        c_mat = np.hstack((n_mat, c_mat))
+def _cell_list_bonds(
+    r: np.ndarray, bv: np.ndarray, n_c: np.ndarray, max_distance: float, max_memory: int
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Find all bonds up to `max_distance` from the atoms in the (0,0,0) cell, using a cell list of the atoms in the
+    translated unit cells. Only atoms in neighbouring bins are compared and the bonds are returned in chunks, so that
+    the candidate bonds of a chunk fit in `max_memory`. The bonds and their lengths are the same as in `_dense_bonds`.
 
-        # Save the value of maximum bond index that is generated by symmetry
-        n_sym = n_mat[5, -1] + 1
-    else:
-        n_sym = 0
+    :param r: Positions of the atoms in lattice units, n_atoms x 3
+    :type r: np.ndarray
+    :param bv: Basis vectors that define the lattice
+    :type bv: np.ndarray
+    :param n_c: Number of extra unit cells along the 3 axes
+    :type n_c: np.ndarray
+    :param max_distance: Maximum bond length
+    :type max_distance: float
+    :param max_memory: Approximate memory budget of a chunk in bytes
+    :type max_memory: int
+    :return: Bonds as columns of `[dl_a dl_b dl_c atom_1 atom_2 d]` and the position of each bond in the dense search
+    :rtype: Iterator[Tuple[np.ndarray, np.ndarray]]
+    """
+    n_atoms = r.shape[0]
+    c_dim = np.array([n_c[0] + 1, 2 * n_c[1] + 1, 2 * n_c[2] + 1])
 
-    return Bonding(
-        c_mat[0:3, :].astype(int),
-        c_mat[3, :].astype(int),
-        c_mat[4, :].astype(int),
-        c_mat[5, :].astype(int),
-        n_sym,
+    # cell translations in the order of the dense search (a-axis fastest), without the ones producing duplicates
+    c_tr = np.stack(
+        [
+            g.ravel(order='F')
+            for g in np.meshgrid(
+                np.arange(0, n_c[0] + 1),
+                np.arange(-n_c[1], n_c[1] + 1),
+                np.arange(-n_c[2], n_c[2] + 1),
+                indexing='ij',
+            )
+        ],
+        axis=1,
     )
+    c_tr_idx = np.flatnonzero((c_tr[:, 0] > 0) | (c_tr[:, 2] > 0) | ((c_tr[:, 2] == 0) & (c_tr[:, 1] >= 0)))
+    c_tr = c_tr[c_tr_idx].astype(float)
+    t_zero = np.flatnonzero(~np.any(c_tr, axis=1))[0]
+
+    # bin the atoms of all translated cells in cubes with the edge of the maximum bond length
+    bin_size = max_distance * (1 + 1e-6)
+    a_pos = np.einsum('ij,jk->ik', (c_tr[:, None, :] + r[None, :, :]).reshape((-1, 3)), bv)
+    r_pos = np.einsum('ij,jk->ik', r, bv)
+    origin = np.minimum(a_pos.min(axis=0), r_pos.min(axis=0))
+    a_bin = np.floor((a_pos - origin) / bin_size).astype(np.int64) + 1
+    r_bin = np.floor((r_pos - origin) / bin_size).astype(np.int64) + 1
+    n_bin = np.maximum(a_bin.max(axis=0), r_bin.max(axis=0)) + 2
+
+    def bin_index(b):
+        return b[..., 0] + n_bin[0] * (b[..., 1] + n_bin[1] * b[..., 2])
+
+    a_order = np.argsort(bin_index(a_bin), kind='stable')
+    a_sorted = bin_index(a_bin)[a_order]
+    # the 27 bins around each atom of the (0,0,0) cell
+    offsets = np.stack(np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1], indexing='ij'), axis=3).reshape((-1, 3))
+    neighbours = bin_index(r_bin[:, None, :] + offsets[None, :, :])
+    first = np.searchsorted(a_sorted, neighbours, side='left')
+    counts = np.searchsorted(a_sorted, neighbours, side='right') - first
+    n_pairs = np.cumsum(counts.sum(axis=1))
+
+    max_pairs = max(1, max_memory // _CELL_LIST_PAIR_BYTES)
+    start = 0
+    while start < n_atoms:
+        done = n_pairs[start - 1] if start > 0 else 0
+        stop = max(start + 1, int(np.searchsorted(n_pairs, done + max_pairs, side='right')))
+        reps = counts[start:stop].ravel()
+        total = int(n_pairs[stop - 1] - done)
+        pos = np.arange(total) - np.repeat(np.cumsum(reps) - reps, reps) + np.repeat(first[start:stop].ravel(), reps)
+        atom1 = np.repeat(np.arange(start, stop), counts[start:stop].sum(axis=1))
+        t, atom2 = np.divmod(a_order[pos], n_atoms)
+        keep = (t != t_zero) | (atom2 > atom1)
+        atom1, atom2, t = atom1[keep], atom2[keep], t[keep]
+        dl = c_tr[t]
+        # r(atom2) - r(atom1), evaluated as in the dense search
+        d_r = (r[atom2] + dl) - r[atom1]
+        d_ra = np.sqrt(np.sum(np.einsum('ni,ij->nj', d_r, bv) ** 2, axis=1))
+        keep = d_ra <= max_distance
+        c_key = c_tr_idx[t] + np.prod(c_dim) * (atom1 + n_atoms * atom2)
+        yield (
+            np.vstack((dl[keep].T, atom1[keep], atom2[keep], d_ra[keep])),
+            c_key[keep],
+        )
+        start = stop
 
 
 def bond(
     r: np.ndarray,
     bv: np.ndarray,
     single_bond: np.ndarray,
-    sym_op: List[SymmOp],
+    sym_op: Union[List[SymmOp], SymmOpSet],
     tol: float = 1e-5,
+    atom_map: Optional[Tuple[np.ndarray, np.ndarray]] = None,
 ) -> Tuple[np.ndarray, Union[np.ndarray, np.ndarray]]:
     """
     generates all bonds that are symmetry equivalent to the given `bond`. The function uses the given space group
@@ -207,35 +345,36 @@ def bond(
     is vector of lattice translation between the two atoms if they are not in the same unit cell in lattice units,
     `atom_1` and `atom_2` are indices of atoms in the list of positions stored in `r`.
     :type single_bond: np.ndarray
-    :param sym_op: List of symmetry operations for the given spacegroup
-    :type sym_op: list
+    :param sym_op: Symmetry operations for the given spacegroup
+    :type sym_op: Union[list, SymmOpSet]
     :param tol: Tolerance
     :type tol: float
+    :param atom_map: Images of the atoms under the symmetry operations as given by `orbit_map`. It is calculated if
+    not given.
+    :type atom_map: Tuple[np.ndarray, np.ndarray]
     :return:
     :rtype:
     """
-    tol_dist = 1e-5
-
-    r1 = r[int(single_bond[3]), :].T
-    r2 = r[int(single_bond[4]), :].T
     dl = single_bond[[0, 1, 2]]
+    atom1 = int(single_bond[3])
+    atom2 = int(single_bond[4])
 
-    # Generate new atomic positions and translation vectors
-    r1new = np.array([s.operate(r1) for s in sym_op]).T
-    r2new = np.array([s.operate(r2) for s in sym_op]).T
-    dlnew = np.array([s.apply_rotation_only(dl) for s in sym_op]).T - cfloor(r1new, tol) + cfloor(r2new, tol)
-
-    # Modulo to get atoms in the first unit cell
-    r1new = np.mod(r1new, 1)
-    r2new = np.mod(r2new, 1)
+    if not isinstance(sym_op, SymmOpSet):
+        sym_op = SymmOpSet.from_symm_ops(sym_op)
+    if atom_map is None:
+        atom_map = orbit_map(r, sym_op, tol)
+    atom_idx, cell_shift = atom_map
 
-    # Throw away generated couplings with wrong distance
-    i_new, atom1 = isnewUC(r.T, r1new, tol_dist)
-    if np.any(i_new):
+    # Generate new atoms and translation vectors
+    if np.any(atom_idx[:, atom1] < 0):
         raise ArithmeticError('The generated positions for atom1 are wrong!')
-    i_new, atom2 = isnewUC(r.T, r2new, tol_dist)
-    if np.any(i_new):
+    if np.any(atom_idx[:, atom2] < 0):
         raise ArithmeticError('The generated positions for atom2 are wrong!')
+    dlnew = sym_op.apply_rotation_only(dl).T - cell_shift[:, atom1].T + cell_shift[:, atom2].T
+    atom1 = atom_idx[:, atom1]
+    atom2 = atom_idx[:, atom2]
+
+    # Throw away generated couplings with wrong distance
     dist = np.sqrt(np.sum(np.dot(bv.T, (r.T[:, atom2] - r.T[:, atom1] + dlnew)) ** 2, axis=0))
     right_dist = np.abs(dist - dist[0]) < tol
     if not np.all(right_dist):
@@ -243,11 +382,58 @@ def bond(
         print('Symmetry generated couplings are dropped!')
     gen_cp = np.vstack((dlnew, atom1.reshape((1, -1)), atom2.reshape((1, -1))))
     gen_cp = gen_cp[:, right_dist]
-    ugen_cp = uniqueB(gen_cp)
+    # first occurrence of each bond, a bond and its reverse are the same
+    first = {}
+    for i, key in enumerate(bond_keys(gen_cp)):
+        first.setdefault(key, i)
+    ugen_cp = np.zeros(gen_cp.shape[1], dtype=bool)
+    ugen_cp[list(first.values())] = True
 
     return gen_cp, ugen_cp
 
 
+def orbit_map(r: np.ndarray, sym_op: Union[List[SymmOp], SymmOpSet], tol: float = 1e-5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Images of the atoms under the symmetry operations. The image of atom `i` under operation `j` is the atom
+    `atom_idx[j, i]` translated by `cell_shift[j, i]` unit cells, `atom_idx` is -1 if the image is not in `r`.
+
+    :param r: Positions of the magnetic atoms in lattice units stored in a matrix
+    :type r: np.ndarray
+    :param sym_op: Symmetry operations for the given spacegroup
+    :type sym_op: Union[list, SymmOpSet]
+    :param tol: Tolerance
+    :type tol: float
+    :return: Index of the image atoms (n_ops x n_atoms) and the cell translations (n_ops x n_atoms x 3)
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    tol_dist = 1e-5
+
+    if not isinstance(sym_op, SymmOpSet):
+        sym_op = SymmOpSet.from_symm_ops(sym_op)
+    r_new = sym_op.operate(r)
+    cell_shift = cfloor(r_new, tol)
+    atom_idx = np.full(r_new.shape[:2], -1, dtype=int)
+    # Modulo to get atoms in the first unit cell
+    for op_idx, r_op in enumerate(np.mod(r_new, 1)):
+        i_new, sym_idx = isnewUC(r.T, r_op.T, tol_dist)
+        atom_idx[op_idx, ~i_new] = sym_idx
+    return atom_idx, cell_shift
+
+
+def bond_keys(bond_matrix: np.ndarray) -> List[Tuple[int, int, int, int, int]]:
+    """
+    Hashable keys of bonds with the shape [dl, atom1, atom2], a bond and its reverse have the same key.
+
+    :param bond_matrix: Array of bonds
+    :type bond_matrix: np.ndarray
+    :return: List with the key of each bond
+    :rtype: List[Tuple[int, int, int, int, int]]
+    """
+    bonds = np.rint(bond_matrix[0:5, :]).astype(int)
+    reverse = np.vstack((-bonds[0:3, :], bonds[[4, 3], :]))
+    return [min(b, rb) for b, rb in zip(map(tuple, bonds.T.tolist()), map(tuple, reverse.T.tolist()))]
+
+
 def cfloor(r0: np.ndarray, tol: float) -> np.ndarray:
     """
     Floor for atomic positions
@@ -8,6 +8,7 @@ __status__ = 'Production'
 __date__ = 'Sep 23, 2011'
 
 from typing import List
+from typing import Optional
 from typing import Tuple
 from typing import Union
 
@@ -28,6 +29,46 @@ from easyscience.Objects.core import ComponentSerializer
 from easyscience.Utils.string import transformation_to_string
 
 
+# Translations are snapped to this grid (in fractions of a lattice vector) to build canonical keys
+KEY_GRID = 24
+# Absolute tolerance for a rotation or translation to be considered on the integer grid
+KEY_TOL = 1e-4
+# Distance from the nearest integer matrix for a rotation to get a `SymmOp.rotation_key`. It is much larger than
+# the tolerance of `SymmOp.__eq__`, so that equal operations only differ in their keys for pathological matrices.
+ROTATION_KEY_TOL = 0.25
+
+
+def canonical_keys(affine_matrices) -> np.ndarray:
+    """
+    Canonical integer keys for affine transformation matrices. The key combines the integer
+    rotation matrix (elements in [-2, 2], base 5) with the translation snapped to a 1/24 grid
+    modulo 1. Operations which only differ by a lattice translation share a key. Matrices
+    with a non-integer rotation or a translation off the grid get the key -1.
+    Args:
+        affine_matrices (nx4x4 array): Affine transformation matrices.
+    Returns:
+        int64 numpy array of n keys.
+    """
+    matrices = np.asarray(affine_matrices, dtype=np.float64).reshape((-1, 4, 4))
+    rotations = matrices[:, 0:3, 0:3].reshape((-1, 9))
+    translations = matrices[:, 0:3, 3] * KEY_GRID
+    int_rotations = np.rint(rotations)
+    int_translations = np.rint(translations)
+    valid = (
+        np.all(np.abs(rotations - int_rotations) < KEY_TOL, axis=1)
+        & np.all(np.abs(int_rotations) <= 2, axis=1)
+        & np.all(np.abs(translations - int_translations) < KEY_TOL * KEY_GRID, axis=1)
+        & np.all(np.abs(matrices[:, 3, :] - [0, 0, 0, 1]) < KEY_TOL, axis=1)
+    )
+    rotation_codes = (int_rotations + 2).astype(np.int64) @ (5 ** np.arange(8, -1, -1, dtype=np.int64))
+    translation_codes = np.mod(int_translations.astype(np.int64), KEY_GRID) @ np.array(
+        [KEY_GRID**2, KEY_GRID, 1], dtype=np.int64
+    )
+    keys = rotation_codes * KEY_GRID**3 + translation_codes
+    keys[~valid] = -1
+    return keys
+
+
 class SymmOp(ComponentSerializer):
     """
     A symmetry operation in cartesian space. Consists of a rotation plus a
@@ -84,22 +125,60 @@ class SymmOp(ComponentSerializer):
         return SymmOp(affine_matrix, tol)
 
     def __eq__(self, other):
-        return np.allclose(self.affine_matrix, other.affine_matrix, atol=self.tol)
+        return self.rotation_key == other.rotation_key and np.allclose(self.affine_matrix, other.affine_matrix, atol=self.tol)
 
     def __hash__(self):
-        return 7
+        # Translations within the tolerance of `__eq__` may fall either side of a grid point, so only the rotation,
+        # which equal operations share by definition of `__eq__`, is hashed.
+        key = self.rotation_key
+        return 7 if key is None else key
+
+    @property
+    def rotation_key(self) -> Optional[int]:
+        """
+        Integer key of the nearest integer rotation matrix (elements in [-2, 2], base 5). None if the rotation is
+        not close to an integer matrix. Operations compare equal only if their rotation keys are equal.
+        """
+        rotation = self.affine_matrix[0:3, 0:3]
+        int_rotation = np.rint(rotation)
+        if np.any(np.abs(rotation - int_rotation) >= ROTATION_KEY_TOL) or np.any(np.abs(int_rotation) > 2):
+            return None
+        return int((int_rotation.reshape(9) + 2).astype(np.int64) @ (5 ** np.arange(8, -1, -1, dtype=np.int64)))
+
+    @property
+    def canonical_key(self) -> Optional[int]:
+        """
+        Canonical integer key of the operation, see `canonical_keys`. None if the rotation is not
+        an integer matrix or the translation is not on the 1/24 grid.
+        """
+        # A read-only matrix can not change, so its key only has to be calculated once
+        cached = getattr(self, '_key_cache', None)
+        if cached is not None and cached[0] is self.affine_matrix:
+            return cached[1]
+        key = int(canonical_keys(self.affine_matrix)[0])
+        key = None if key < 0 else key
+        if not self.affine_matrix.flags.writeable:
+            self._key_cache = (self.affine_matrix, key)
+        return key
 
     def __repr__(self):
         return self.__str__()
 
     def __str__(self):
+        # A read-only matrix can not change, so its string only has to be formatted once
+        cached = getattr(self, '_str_cache', None)
+        if cached is not None and cached[0] is self.affine_matrix:
+            return cached[1]
         output = [
             'Rot:',
             str(self.affine_matrix[0:3][:, 0:3]),
             'tau',
             str(self.affine_matrix[0:3][:, 3]),
         ]
-        return '\n'.join(output)
+        output = '\n'.join(output)
+        if not self.affine_matrix.flags.writeable:
+            self._str_cache = (self.affine_matrix, output)
+        return output
 
     def operate(self, point):
         """
@@ -429,3 +508,222 @@ class SymmOp(ComponentSerializer):
                 num = float(m.group(2)) / float(m.group(3)) if m.group(3) != '' else float(m.group(2))
                 trans[i] = num * factor
         return SymmOp.from_rotation_and_translation(rot_matrix, trans)
+
+
+class SymmOpSet(ComponentSerializer):
+    """
+    A set of symmetry operations stored as one contiguous stack of affine
+    transformation matrices of rank 4. All operations of the set are applied
+    at once, so operating with a whole group does not create a SymmOp per
+    operation.
+    .. attribute:: affine_matrices
+        A read-only nx4x4 numpy.array representing the symmetry operations.
+    """
+
+    _REDIRECT = {'affine_matrices': lambda obj: getattr(obj, 'affine_matrices').tolist()}
+
+    def __init__(self, affine_matrices, tol=0.01):
+        """
+        Initializes the SymmOpSet from a stack of 4x4 affine transformation
+        matrices.
+        Args:
+            affine_matrices (nx4x4 array): Representing the affine
+                transformations.
+            tol (float): Tolerance for determining if matrices are equal.
+        """
+        affine_matrices = np.array(affine_matrices, dtype=np.float64)
+        if affine_matrices.size == 0:
+            affine_matrices = affine_matrices.reshape((0, 4, 4))
+        if affine_matrices.ndim != 3 or affine_matrices.shape[1:] != (4, 4):
+            raise ValueError('Affine Matrices must be a nx4x4 numpy array!')
+        affine_matrices.setflags(write=False)
+        self.affine_matrices = affine_matrices
+        self.tol = tol
+
+    @staticmethod
+    def from_symm_ops(symm_ops: List[SymmOp], tol: float = 0.01) -> 'SymmOpSet':
+        """
+        Creates a SymmOpSet from a list of SymmOp.
+        Args:
+            symm_ops ([SymmOp]): The symmetry operations.
+            tol (float): Tolerance for determining if matrices are equal.
+        Returns:
+            SymmOpSet
+        """
+        return SymmOpSet([op.affine_matrix for op in symm_ops], tol=tol)
+
+    @staticmethod
+    def from_rotations_and_translations(rotations, translations, tol: float = 0.01) -> 'SymmOpSet':
+        """
+        Creates a SymmOpSet from stacked rotation matrices and translation
+        vectors.
+        Args:
+            rotations (nx3x3 array): Rotation matrices.
+            translations (nx3 array): Translation vectors.
+            tol (float): Tolerance for determining if matrices are equal.
+        Returns:
+            SymmOpSet
+        """
+        rotations = np.asarray(rotations, dtype=np.float64).reshape((-1, 3, 3))
+        translations = np.asarray(translations, dtype=np.float64).reshape((-1, 3))
+        if rotations.shape[0] != translations.shape[0]:
+            raise ValueError('The number of rotation matrices and translation vectors must be equal!')
+        affine_matrices = np.zeros((rotations.shape[0], 4, 4))
+        affine_matrices[:, 0:3, 0:3] = rotations
+        affine_matrices[:, 0:3, 3] = translations
+        affine_matrices[:, 3, 3] = 1
+        return SymmOpSet(affine_matrices, tol=tol)
+
+    @staticmethod
+    def from_xyz_strings(xyz_strings: Union[str, List[str]]) -> 'SymmOpSet':
+        """
+        Args:
+            xyz_strings: list of strings of the form 'x, y, z', '-x, -y, z',
+                etc. or a single string with the operations separated by ';'.
+        Returns:
+            SymmOpSet
+        """
+        if isinstance(xyz_strings, str):
+            xyz_strings = xyz_strings.split(';')
+        return SymmOpSet.from_symm_ops([SymmOp.from_xyz_string(s) for s in xyz_strings])
+
+    def __len__(self) -> int:
+        return self.affine_matrices.shape[0]
+
+    def __iter__(self):
+        for matrix in self.affine_matrices:
+            yield SymmOp(matrix, tol=self.tol)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return SymmOp(self.affine_matrices[item], tol=self.tol)
+        return SymmOpSet(self.affine_matrices[item], tol=self.tol)
+
+    def __eq__(self, other):
+        if not isinstance(other, SymmOpSet):
+            return NotImplemented
+        return self.affine_matrices.shape == other.affine_matrices.shape and np.allclose(
+            self.affine_matrices, other.affine_matrices, atol=self.tol
+        )
+
+    def __hash__(self):
+        return len(self)
+
+    def __repr__(self):
+        return 'SymmOpSet({} operations)'.format(len(self))
+
+    def canonical_keys(self) -> np.ndarray:
+        """
+        Canonical integer keys of all operations, see `canonical_keys`. Operations without a
+        canonical key get -1.
+        """
+        return canonical_keys(self.affine_matrices)
+
+    @property
+    def rotation_matrices(self) -> np.ndarray:
+        """
+        A read-only nx3x3 numpy.array view of the rotation matrices.
+        """
+        return self.affine_matrices[:, 0:3, 0:3]
+
+    @property
+    def translation_vectors(self) -> np.ndarray:
+        """
+        A read-only nx3 numpy.array view of the translation vectors.
+        """
+        return self.affine_matrices[:, 0:3, 3]
+
+    def operate(self, points):
+        """
+        Apply all operations on a point or on an array of points.
+        Args:
+            points: Coordinates of a point [3] or of points [...x3].
+        Returns:
+            Numpy array of coordinates after operation, with the operation as
+            the leading axis [n x ... x 3].
+        """
+        points = np.asarray(points, dtype=np.float64)
+        flat = points.reshape((-1, 3))
+        new_points = np.einsum('oij,pj->opi', self.rotation_matrices, flat)
+        new_points += self.translation_vectors[:, None, :]
+        return new_points.reshape((len(self),) + points.shape)
+
+    def apply_rotation_only(self, vectors):
+        """
+        Vectors should only be operated by the rotation matrices and not the
+        translation vectors.
+        Args:
+            vectors: A vector [3] or an array of vectors [...x3].
+        Returns:
+            Numpy array of vectors after operation, with the operation as
+            the leading axis [n x ... x 3].
+        """
+        vectors = np.asarray(vectors, dtype=np.float64)
+        flat = vectors.reshape((-1, 3))
+        new_vectors = np.einsum('oij,pj->opi', self.rotation_matrices, flat)
+        return new_vectors.reshape((len(self),) + vectors.shape)
+
+    def transform_tensor(self, tensor):
+        """
+        Applies the rotation portion of all operations to a tensor. Note that
+        tensor has to be in full form, not the Voigt form.
+        Args:
+            tensor (numpy array): a rank n tensor
+        Returns:
+            Transformed tensors, with the operation as the leading axis.
+        """
+        tensor = np.asarray(tensor)
+        dim = tensor.shape
+        rank = len(dim)
+        if not all([i == 3 for i in dim]):
+            raise ValueError('All dimensions must be equal to 3')
+
+        # Build einstein sum string, the operation index is the capital 'O'
+        lc = string.ascii_lowercase
+        indices = lc[:rank], lc[rank : 2 * rank]
+        einsum_string = ','.join(['O' + a + i for a, i in zip(*indices)])
+        einsum_string += ',{}->O{}'.format(*indices[::-1])
+        einsum_args = [self.rotation_matrices] * rank + [tensor]
+
+        return np.einsum(einsum_string, *einsum_args)
+
+    def __mul__(self, other):
+        """
+        Returns a new SymmOpSet which is equivalent to apply the "other"
+        operation(s) followed by the operations of this set. `other` can be a
+        single SymmOp, which is composed with every operation, or a SymmOpSet
+        of the same length, which is composed operation by operation.
+        """
+        if isinstance(other, SymmOp):
+            return SymmOpSet(np.matmul(self.affine_matrices, other.affine_matrix), tol=self.tol)
+        if isinstance(other, SymmOpSet):
+            if len(other) != len(self):
+                raise ValueError('SymmOpSets must have the same number of operations to be composed!')
+            return SymmOpSet(np.matmul(self.affine_matrices, other.affine_matrices), tol=self.tol)
+        return NotImplemented
+
+    @property
+    def inverse(self) -> 'SymmOpSet':
+        """
+        Returns the inverse of every transformation.
+        """
+        return SymmOpSet(np.linalg.inv(self.affine_matrices), tol=self.tol)
+
+    def as_symm_ops(self) -> List[SymmOp]:
+        """
+        Returns the operations as a list of SymmOp.
+        """
+        return list(self)
+
+    def as_xyz_string(self) -> List[str]:
+        """
+        Returns a list of strings of the form 'x, y, z', '-x, -y, z',
+        '-y+1/2, x+1/2, z+1/2', etc. Only works for integer rotation matrices
+        """
+        rotations = self.rotation_matrices
+        if not np.all(np.isclose(rotations, np.round(rotations))):
+            warnings.warn('Rotation matrix should be integer')
+        return [
+            transformation_to_string(rotation, translation_vec=translation, delim=', ')
+            for rotation, translation in zip(rotations, self.translation_vectors)
+        ]
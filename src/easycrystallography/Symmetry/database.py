@@ -0,0 +1,420 @@
+# SPDX-FileCopyrightText: 2024 EasyCrystallography contributors
+# SPDX-License-Identifier: BSD-3-Clause
+# © 2022-2024 Contributors to the EasyCrystallography project <https://github.com/EasyScience/EasyCrystallography>
+
+"""
+Binary store of the symmetry databases. `symm_data.json` and `symm_ops.json` are converted
+by `build_symmetry_database` into one file of typed columns, where lists are stored flat with
+an offset table. The store is memory-mapped and read lazily, column by column, so a process
+only pays for the sections it uses. Single entries of a section and single records of the
+symmetry operations can be read by key or symbol without decoding the rest.
+
+The store is built on first use in a writable cache directory, see `cache_dir`, under a name
+holding a hash of the JSON sources, so an edited or reinstalled source gets a new store.
+The JSON files are used when no store can be read or written.
+
+The store can be (re)built with `python -m easycrystallography.Symmetry.database`.
+"""
+
+import copy
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Union
+
+import numpy as np
+
+DATABASE_DIR = Path(os.path.dirname(__file__)).parent / 'Databases'
+SYMM_DATA_JSON = DATABASE_DIR / 'symm_data.json'
+SYMM_OPS_JSON = DATABASE_DIR / 'symm_ops.json'
+# Environment variable to choose the directory of the store
+CACHE_DIR_VARIABLE = 'EASYCRYSTALLOGRAPHY_CACHE_DIR'
+
+_FORMAT_VERSION = 3
+_MAGIC = b'ECSYMDB\x00'
+_ALIGNMENT = 64
+_SYMM_OPS = 'symm_ops'
+
+
+def cache_dir() -> Path:
+    """
+    Directory of the binary store: `$EASYCRYSTALLOGRAPHY_CACHE_DIR` if set, else
+    `easycrystallography` in `$XDG_CACHE_HOME` or `~/.cache`.
+    """
+    path = os.environ.get(CACHE_DIR_VARIABLE)
+    if path:
+        return Path(path)
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'easycrystallography'
+
+
+def default_store_path() -> Path:
+    """
+    Path of the store of the installed JSON sources in `cache_dir`.
+    """
+    return cache_dir() / f'symm_db-v{_FORMAT_VERSION}-{_source_digest()[:16]}.bin'
+
+
+def build_symmetry_database(path: Optional[Union[str, Path]] = None) -> Path:
+    """
+    Convert the JSON symmetry databases into a binary store. The file is written under a
+    temporary name and moved into place, so concurrent builds and readers never see a partial
+    store.
+
+    Args:
+        path: File to write the store to. Default `default_store_path()`.
+
+    Returns:
+        Path of the store.
+    """
+    with open(SYMM_DATA_JSON, 'r') as fid:
+        symm_data = json.load(fid)
+    with open(SYMM_OPS_JSON, 'r') as fid:
+        symm_ops = json.load(fid)
+
+    arrays = {}
+    for name, section in symm_data.items():
+        keys = list(section.keys())
+        arrays[f'{name}/__keys__'] = _encode_strings(keys)
+        if all(key.isdigit() for key in keys):
+            # Row of each integer key, so that one entry is found without decoding the keys
+            rows = np.full(max(int(key) for key in keys) + 1, -1, dtype=np.int64)
+            rows[[int(key) for key in keys]] = np.arange(len(keys))
+            arrays[f'{name}/__rows__'] = rows
+        _encode_column(arrays, name, list(section.values()))
+    _encode_column(arrays, _SYMM_OPS, symm_ops)
+    rows = _symbol_rows(symm_ops)
+    arrays[f'{_SYMM_OPS}/__symbols__'] = _encode_strings(list(rows.keys()))
+    arrays[f'{_SYMM_OPS}/__symbol_rows__'] = np.array(list(rows.values()), dtype=np.int64)
+
+    path = Path(default_store_path() if path is None else path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fid:
+            _write_store(fid, arrays)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+    return path
+
+
+class SymmetryDatabase:
+    """
+    Lazy access to the symmetry databases. Sections are decoded on first use and kept, so
+    repeated lookups return the same objects, like the module level JSON cache did.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            path: File of the store. Default `default_store_path()`, which is built if it does
+                not exist. A given file is only read.
+        """
+        self._path = None if path is None else Path(path)
+        self._store = None
+        self._json = None
+        self._json_ops = None
+        self._sections = {}
+        self._rows = {}
+        self._symbol_rows = None
+
+    @property
+    def is_binary(self) -> bool:
+        """
+        True if the binary store is used, False if the JSON files are used.
+        """
+        self._open()
+        return self._store is not None
+
+    def symm_data(self, name: str) -> dict:
+        """
+        A section of `symm_data.json`, e.g. `space_group_encoding`.
+        """
+        if name not in self._sections:
+            self._open()
+            if self._store is None:
+                self._sections[name] = self._load_json()[name]
+            else:
+                keys = _decode_strings(self._store[f'{name}/__keys__'])
+                self._sections[name] = dict(zip(keys, _decode_column(self._store, name)))
+        return self._sections[name]
+
+    def symm_data_entry(self, name: str, key: str):
+        """
+        One entry of a section of `symm_data.json`, read without decoding the whole section.
+        """
+        if name in self._sections or not self.is_binary:
+            return self.symm_data(name)[key]
+        if name not in self._rows:
+            keys = _decode_strings(self._store[f'{name}/__keys__'])
+            self._rows[name] = {k: row for row, k in enumerate(keys)}
+        return _decode_row(self._store, name, self._rows[name][key])
+
+    def symm_data_field(self, name: str, field: str) -> dict:
+        """
+        One field of the entries of a section of `symm_data.json` by key, e.g. the `full_symbol`
+        of the `space_group_encoding`, read without decoding the other fields.
+        """
+        if name in self._sections or not self.is_binary:
+            return {key: value[field] for key, value in self.symm_data(name).items()}
+        keys = _decode_strings(self._store[f'{name}/__keys__'])
+        return dict(zip(keys, _decode_column(self._store, f'{name}/{field}')))
+
+    def space_group_symbols(self, int_number: int) -> List[str]:
+        """
+        Keys of the `space_group_encoding` of a space group number, in the order of the section.
+        """
+        if 'space_group_encoding' in self._sections or not self.is_binary:
+            return [key for key, value in self.symm_data('space_group_encoding').items() if value['int_number'] == int_number]
+        keys = _decode_strings(self._store['space_group_encoding/__keys__'])
+        numbers = self._store['space_group_encoding/int_number::int']
+        return [keys[row] for row in np.flatnonzero(numbers == int_number)]
+
+    def symm_ops_record(self, symbol: str) -> dict:
+        """
+        The first record of `symm_ops.json` with the Hermann-Mauguin or universal symbol `symbol`,
+        compared without spaces. Only this record is decoded and a new dict is returned.
+        """
+        self._open()
+        if self._symbol_rows is None:
+            if self._store is None:
+                with open(SYMM_OPS_JSON, 'r') as fid:
+                    self._json_ops = json.load(fid)
+                self._symbol_rows = _symbol_rows(self._json_ops)
+            else:
+                symbols = _decode_strings(self._store[f'{_SYMM_OPS}/__symbols__'])
+                self._symbol_rows = dict(zip(symbols, self._store[f'{_SYMM_OPS}/__symbol_rows__'].tolist()))
+        row = self._symbol_rows[symbol]
+        if self._store is None:
+            return copy.deepcopy(self._json_ops[row])
+        return _decode_row(self._store, _SYMM_OPS, row)
+
+    def symm_ops(self) -> List[dict]:
+        """
+        The records of `symm_ops.json`. A new list is returned on every call, as the records
+        are modified by the consumers.
+        """
+        self._open()
+        if self._store is None:
+            with open(SYMM_OPS_JSON, 'r') as fid:
+                return json.load(fid)
+        return _decode_column(self._store, _SYMM_OPS)
+
+    def maximal_subgroups(self, int_number: int) -> List[int]:
+        """
+        Maximal subgroups of a space group, read without decoding the whole section.
+        """
+        if 'maximal_subgroups' in self._sections or not self.is_binary:
+            return self.symm_data('maximal_subgroups')[str(int_number)]
+        rows = self._store['maximal_subgroups/__rows__']
+        row = rows[int_number] if 0 <= int_number < len(rows) else -1
+        if row < 0:
+            raise KeyError(int_number)
+        offsets = self._store['maximal_subgroups::offsets']
+        return self._store['maximal_subgroups::ragged'][offsets[row] : offsets[row + 1]].tolist()
+
+    def _open(self):
+        if self._store is not None or self._json is not None:
+            return
+        path = self._path
+        if path is None:
+            try:
+                path = default_store_path()
+                if not path.is_file():
+                    build_symmetry_database(path)
+            except (OSError, TypeError, ValueError):
+                # No writable cache directory or data that can not be stored, the JSON files are used
+                path = None
+        if path is not None and path.is_file():
+            try:
+                store = _Store(path)
+            except (OSError, ValueError):
+                store = None
+            if store is not None and store.version == _FORMAT_VERSION and store.source == _source_digest():
+                self._store = store
+                return
+        self._json = False
+
+    def _load_json(self) -> dict:
+        if not self._json:
+            with open(SYMM_DATA_JSON, 'r') as fid:
+                self._json = json.load(fid)
+        return self._json
+
+
+def get_symmetry_database() -> SymmetryDatabase:
+    """
+    The process-wide symmetry database.
+    """
+    global _DATABASE
+    if _DATABASE is None:
+        _DATABASE = SymmetryDatabase()
+    return _DATABASE
+
+
+_DATABASE: Optional[SymmetryDatabase] = None
+
+
+class _Store:
+    """
+    Memory-mapped store written by `_write_store`. Arrays are read-only views of the file.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, 'rb') as fid:
+            self._buffer = mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._buffer[: len(_MAGIC)] != _MAGIC:
+            raise ValueError(f'{path} is not a symmetry database.')
+        size = int.from_bytes(self._buffer[len(_MAGIC) : len(_MAGIC) + 8], 'little')
+        start = len(_MAGIC) + 8
+        header = json.loads(self._buffer[start : start + size].decode('utf-8'))
+        self.version = header['version']
+        self.source = header['source']
+        self._arrays = header['arrays']
+        self._data_start = _align(start + size)
+        self.files = set(self._arrays)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        dtype, shape, offset = self._arrays[name]
+        return np.frombuffer(self._buffer, dtype=dtype, count=int(np.prod(shape)), offset=self._data_start + offset).reshape(
+            shape
+        )
+
+
+def _write_store(fid, arrays: Dict[str, np.ndarray]):
+    # Magic, length of the JSON header, the header and the aligned arrays
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        layout[name] = [array.dtype.str, list(array.shape), offset]
+        offset += array.nbytes
+    header = json.dumps({'version': _FORMAT_VERSION, 'source': _source_digest(), 'arrays': layout}).encode('utf-8')
+    fid.write(_MAGIC + len(header).to_bytes(8, 'little') + header)
+    position = len(_MAGIC) + 8 + len(header)
+    data_start = _align(position)
+    for name, array in arrays.items():
+        start = data_start + layout[name][2]
+        fid.write(b'\x00' * (start - position))
+        fid.write(np.ascontiguousarray(array).tobytes())
+        position = start + array.nbytes
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _source_digest() -> str:
+    # Hash of the contents of the JSON sources, a changed source invalidates the store
+    global _SOURCE_DIGEST
+    if _SOURCE_DIGEST is None:
+        digest = hashlib.sha256()
+        for path in (SYMM_DATA_JSON, SYMM_OPS_JSON):
+            with open(path, 'rb') as fid:
+                digest.update(fid.read())
+        _SOURCE_DIGEST = digest.hexdigest()
+    return _SOURCE_DIGEST
+
+
+_SOURCE_DIGEST: Optional[str] = None
+
+
+def _symbol_rows(symm_ops: List[dict]) -> Dict[str, int]:
+    # Row of the first record of each symbol without spaces
+    rows = {}
+    for row, op in enumerate(symm_ops):
+        for field in ('hermann_mauguin', 'universal_h_m'):
+            rows.setdefault(op[field].replace(' ', ''), row)
+    return rows
+
+
+def _encode_strings(values: List[str]) -> np.ndarray:
+    # Strings are stored as one newline separated UTF-8 buffer, which is much smaller and
+    # faster to decode than a fixed width unicode array
+    if any('\n' in value for value in values):
+        raise ValueError('Strings with line breaks can not be stored.')
+    return np.frombuffer('\n'.join(values).encode('utf-8'), dtype=np.uint8)
+
+
+def _decode_strings(buffer: np.ndarray) -> List[str]:
+    return buffer.tobytes().decode('utf-8').split('\n')
+
+
+def _encode_column(arrays: Dict[str, np.ndarray], name: str, values: list):
+    if all(isinstance(v, str) for v in values):
+        arrays[f'{name}::str'] = _encode_strings(values)
+    elif all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        arrays[f'{name}::int'] = np.array(values, dtype=np.int64)
+    elif all(isinstance(v, dict) for v in values):
+        fields = list(values[0].keys())
+        if any(list(v.keys()) != fields for v in values):
+            raise ValueError(f'Records of {name} do not share the same fields.')
+        arrays[f'{name}/__fields__'] = _encode_strings(fields)
+        for field in fields:
+            _encode_column(arrays, f'{name}/{field}', [v[field] for v in values])
+    elif all(isinstance(v, list) and len(v) and all(isinstance(r, list) for r in v) for v in values):
+        arrays[f'{name}::matrix'] = np.array(values, dtype=np.int64)
+    elif all(isinstance(v, list) for v in values):
+        flat = [item for v in values for item in v]
+        arrays[f'{name}::offsets'] = np.cumsum([0] + [len(v) for v in values], dtype=np.int64)
+        if all(isinstance(item, str) for item in flat):
+            arrays[f'{name}::ragged'] = _encode_strings(flat)
+            # Byte range of the strings of each row, so that one row is decoded on its own
+            sizes = [len('\n'.join(v).encode('utf-8')) + 1 if v else 0 for v in values]
+            arrays[f'{name}::bytes'] = np.cumsum([0] + sizes, dtype=np.int64)
+        else:
+            arrays[f'{name}::ragged'] = np.array(flat, dtype=np.int64)
+    else:
+        raise TypeError(f'Column {name} can not be stored.')
+
+
+def _decode_column(store, name: str) -> list:
+    files = store.files
+    if f'{name}::str' in files:
+        return _decode_strings(store[f'{name}::str'])
+    if f'{name}::int' in files:
+        return store[f'{name}::int'].tolist()
+    if f'{name}::matrix' in files:
+        return store[f'{name}::matrix'].tolist()
+    if f'{name}/__fields__' in files:
+        fields = _decode_strings(store[f'{name}/__fields__'])
+        columns = [_decode_column(store, f'{name}/{field}') for field in fields]
+        return [dict(zip(fields, record)) for record in zip(*columns)]
+    offsets = store[f'{name}::offsets'].tolist()
+    flat = store[f'{name}::ragged']
+    flat = _decode_strings(flat) if flat.dtype == np.uint8 else flat.tolist()
+    return [flat[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def _decode_row(store, name: str, row: int):
+    files = store.files
+    if f'{name}::str' in files:
+        return _decode_strings(store[f'{name}::str'])[row]
+    if f'{name}::int' in files:
+        return int(store[f'{name}::int'][row])
+    if f'{name}::matrix' in files:
+        return store[f'{name}::matrix'][row].tolist()
+    if f'{name}/__fields__' in files:
+        fields = _decode_strings(store[f'{name}/__fields__'])
+        return {field: _decode_row(store, f'{name}/{field}', row) for field in fields}
+    offsets = store[f'{name}::offsets']
+    start, end = int(offsets[row]), int(offsets[row + 1])
+    flat = store[f'{name}::ragged']
+    if flat.dtype != np.uint8:
+        return flat[start:end].tolist()
+    if start == end:
+        return []
+    limits = store[f'{name}::bytes']
+    return _decode_strings(flat[int(limits[row]) : int(limits[row + 1]) - 1])
+
+
+if __name__ == '__main__':
+    print(build_symmetry_database())
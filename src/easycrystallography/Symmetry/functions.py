@@ -1,3 +1,9 @@
+import json
+from pathlib import Path
+from typing import List
+from typing import Optional
+from typing import Union
+
 import gemmi
 
 ACCESIBLE_IT_NUMBER_TRICLINIC_SYSTEM = tuple(range(1, 3))
@@ -84,13 +90,123 @@ def get_spacegroup_by_name_ext(number, setting):
     """
     Get the spacegroup by its number and setting.
     """
-    tables = gemmi.spacegroup_table()
-
-    for sg in tables:
-        if sg.number == number:
-            # default qualifier, not present in the table
-            # so we neeed to account for it
-            default_setting = get_default_it_coordinate_system_code_by_it_number(number)
-            if setting in {default_setting, *sg.qualifier, *sg.ext}:
-                return sg
-    return None
+    position = get_setting_index()['by_ext'].get(_ext_key(number, setting))
+    if position is None:
+        return None
+    return _spacegroup_table()[position]
+
+
+def get_settings_by_it_number(it_number: int) -> List[str]:
+    """
+    Get the IT_coordinate_system_codes of all settings of a space group number.
+    gemmi doesn't do it natively.
+    """
+    return list(get_setting_index()['settings'].get(str(it_number), []))
+
+
+def get_it_number_by_name(name: str) -> Optional[int]:
+    """
+    Get the space group number from a Hermann-Mauguin symbol (with or without spaces), extended
+    Hermann-Mauguin symbol, short name or Hall symbol.
+    """
+    names = get_setting_index()['names']
+    position = names.get(name.strip(), names.get(name.replace(' ', '')))
+    if position is None:
+        return None
+    return _spacegroup_table()[position].number
+
+
+def get_setting_index() -> dict:
+    """
+    The index of the gemmi space group table. It is built on first use and holds
+    `settings` (number -> setting codes), `by_ext` (number and setting -> table position) and
+    `names` (name -> table position). Keys are strings so that the index can be saved as JSON.
+    """
+    global _SETTING_INDEX
+    if _SETTING_INDEX is None:
+        _SETTING_INDEX = _build_setting_index()
+    return _SETTING_INDEX
+
+
+def save_setting_index(path: Union[str, Path]) -> None:
+    """
+    Save the setting index to a JSON file, so that it can be loaded in later runs.
+    """
+    with open(path, 'w') as f:
+        json.dump(get_setting_index(), f)
+
+
+def load_setting_index(path: Union[str, Path]) -> bool:
+    """
+    Load a setting index saved by `save_setting_index`. The index is only used if it was
+    built with the installed gemmi version.
+
+    :return: True if the index was loaded
+    """
+    global _SETTING_INDEX
+    try:
+        with open(path, 'r') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if not isinstance(index, dict) or index.get('gemmi_version') != gemmi.__version__:
+        return False
+    _SETTING_INDEX = index
+    return True
+
+
+_SETTING_INDEX = None
+
+
+def _spacegroup_table() -> List[gemmi.SpaceGroup]:
+    global _SPACEGROUP_TABLE
+    if _SPACEGROUP_TABLE is None:
+        _SPACEGROUP_TABLE = list(gemmi.spacegroup_table())
+    return _SPACEGROUP_TABLE
+
+
+_SPACEGROUP_TABLE = None
+
+
+def _ext_key(number: int, setting: Optional[str]) -> str:
+    return f'{number}:{setting}' if setting is not None else f'{number}'
+
+
+def _setting_code(item: gemmi.SpaceGroup) -> str:
+    st = ''
+    # Cases where ext and qualifier are not empty
+    if item.ext and item.ext != '\x00':
+        st += item.ext
+    if item.qualifier:
+        st += item.qualifier
+    # special cases of defaul settings, not explicitly defined in gemmi
+    system = item.crystal_system_str()
+    if system == 'orthorhombic' and not item.qualifier:
+        st += 'abc'
+    elif (system == 'trigonal' or system == 'hexagonal') and not item.qualifier:
+        st += 'h'
+    # failed, just assign "1" to triclinic/monoclinic/tetragonal
+    if not st:
+        st = '1'
+    return st
+
+
+def _build_setting_index() -> dict:
+    settings = {}
+    by_ext = {}
+    names = {}
+    max_number = 0
+    for position, item in enumerate(_spacegroup_table()):
+        # Settings are listed up to the first entry of a higher number, extra settings appended
+        # at the end of the gemmi table are not part of the list.
+        max_number = max(max_number, item.number)
+        if item.number == max_number:
+            settings.setdefault(str(item.number), []).append(_setting_code(item))
+        # default qualifier, not present in the table
+        # so we neeed to account for it. The first matching entry wins.
+        default_setting = get_default_it_coordinate_system_code_by_it_number(item.number)
+        for setting in {default_setting, *item.qualifier, *item.ext}:
+            by_ext.setdefault(_ext_key(item.number, setting), position)
+        for name in (item.hm, item.hm.replace(' ', ''), item.xhm(), item.short_name(), item.hall):
+            names.setdefault(name, position)
+    return {'gemmi_version': gemmi.__version__, 'settings': settings, 'by_ext': by_ext, 'names': names}
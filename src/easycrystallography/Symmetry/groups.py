@@ -8,8 +8,6 @@ Shyue Ping Ong thanks Marc De Graef for his generous sharing of his
 SpaceGroup data as published in his textbook "Structure of Materials".
 """
 
-import json
-import os
 import re
 import warnings
 from abc import ABCMeta
@@ -21,20 +19,48 @@ from itertools import product
 import numpy as np
 from easyscience.Utils.classUtils import cached_class
 
+from easycrystallography.Symmetry.database import get_symmetry_database
 from easycrystallography.Symmetry.SymOp import SymmOp
-
-SYMM_DATA = None
+from easycrystallography.Symmetry.SymOp import canonical_keys
 
 
 def _get_symm_data(name):
-    global SYMM_DATA
-    if SYMM_DATA is None:
-        with open(
-            os.path.join(os.path.dirname(__file__), '..', 'Databases', 'symm_data.json'),
-            'r',
-        ) as fid:
-            SYMM_DATA = json.load(fid)
-    return SYMM_DATA[name]
+    return get_symmetry_database().symm_data(name)
+
+
+def _get_symm_data_entry(name, key):
+    # One entry of a section, None if there is none
+    try:
+        return get_symmetry_database().symm_data_entry(name, key)
+    except KeyError:
+        return None
+
+
+def _format_symm_op(op):
+    op['hermann_mauguin_fmt'] = op['hermann_mauguin']
+    if ':' in op['universal_h_m']:
+        op['hermann_mauguin_fmt'] = op['hermann_mauguin_fmt'] + ':' + op['universal_h_m'].split(':')[1]
+
+    op['hermann_mauguin'] = re.sub(r' ', '', op['hermann_mauguin'])
+    op['universal_h_m'] = re.sub(r' ', '', op['universal_h_m'])
+    return op
+
+
+class _lazy_class_attribute:
+    """
+    Class attribute computed by `factory` on first access and kept afterwards.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+        self._computed = False
+
+    def __get__(self, instance, owner=None):
+        if not self._computed:
+            self._value = self._factory()
+            self._computed = True
+        return self._value
 
 
 class SymmetryGroup(Sequence, metaclass=ABCMeta):
@@ -51,14 +77,44 @@ class SymmetryGroup(Sequence, metaclass=ABCMeta):
         pass
 
     def __contains__(self, item):
-        for i in self.symmetry_ops:
+        index, unkeyed = self._symmetry_op_index()
+        key = item.canonical_key if isinstance(item, SymmOp) else None
+        candidates = index.get(key, []) + unkeyed if key is not None else self.symmetry_ops
+        for i in candidates:
             if np.allclose(i.affine_matrix, item.affine_matrix):
                 return True
         return False
 
+    def __eq__(self, other):
+        if not isinstance(other, SymmetryGroup):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+        return all(op in other for op in self.symmetry_ops) and all(op in self for op in other.symmetry_ops)
+
     def __hash__(self):
         return self.__len__()
 
+    def _symmetry_op_index(self):
+        """
+        Operations of the group by their canonical key, and the operations without a key.
+        The index is rebuilt if the list of operations is replaced.
+        """
+        ops = self.symmetry_ops
+        cached = self.__dict__.get('_op_index')
+        if cached is None or cached[0] is not ops:
+            index = {}
+            unkeyed = []
+            keys = canonical_keys([op.affine_matrix for op in ops]) if len(ops) else []
+            for key, op in zip(keys, ops):
+                if key < 0:
+                    unkeyed.append(op)
+                else:
+                    index.setdefault(int(key), []).append(op)
+            cached = (ops, index, unkeyed)
+            self.__dict__['_op_index'] = cached
+        return cached[1], cached[2]
+
     def __getitem__(self, item):
         return self.symmetry_ops[item]
 
@@ -119,7 +175,10 @@ class PointGroup(SymmetryGroup):
             int_symbol (str): International or Hermann-Mauguin Symbol.
         """
         self.symbol = int_symbol
-        self.generators = [_get_symm_data('generator_matrices')[c] for c in _get_symm_data('point_group_encoding')[int_symbol]]
+        db = get_symmetry_database()
+        self.generators = [
+            db.symm_data_entry('generator_matrices', c) for c in db.symm_data_entry('point_group_encoding', int_symbol)
+        ]
         self._symmetry_ops = {SymmOp.from_rotation_and_translation(m) for m in self._generate_full_symmetry_ops()}
         self.order = len(self._symmetry_ops)
 
@@ -187,25 +246,40 @@ class SpaceGroup(SymmetryGroup):
         Order of Space Group
     """
 
-    with open(os.path.join(os.path.dirname(__file__), '..', 'Databases', 'symm_ops.json'), 'r') as fid:
-        SYMM_OPS = json.load(fid)
-    SG_SYMBOLS = set(_get_symm_data('space_group_encoding').keys())
-    for op in SYMM_OPS:
-        op['hermann_mauguin_fmt'] = op['hermann_mauguin']
-        if ':' in op['universal_h_m']:
-            op['hermann_mauguin_fmt'] = op['hermann_mauguin_fmt'] + ':' + op['universal_h_m'].split(':')[1]
+    # The databases are read on first access, not when the module is imported
+    @_lazy_class_attribute
+    def SYMM_OPS():
+        return [_format_symm_op(op) for op in get_symmetry_database().symm_ops()]
+
+    @_lazy_class_attribute
+    def SG_SYMBOLS():
+        symbols = set(_get_symm_data('space_group_encoding').keys())
+        for op in SpaceGroup.SYMM_OPS:
+            symbols.add(op['hermann_mauguin'])
+            symbols.add(op['universal_h_m'])
+        return symbols
 
-        op['hermann_mauguin'] = re.sub(r' ', '', op['hermann_mauguin'])
-        op['universal_h_m'] = re.sub(r' ', '', op['universal_h_m'])
-        SG_SYMBOLS.add(op['hermann_mauguin'])
-        SG_SYMBOLS.add(op['universal_h_m'])
+    @_lazy_class_attribute
+    def gen_matrices():
+        return _get_symm_data('generator_matrices')
 
-    gen_matrices = _get_symm_data('generator_matrices')
     # POINT_GROUP_ENC = SYMM_DATA["point_group_encoding"]
-    sgencoding = _get_symm_data('space_group_encoding')
-    abbrev_sg_mapping = _get_symm_data('abbreviated_spacegroup_symbols')
-    translations = {k: Fraction(v) for k, v in _get_symm_data('translations').items()}
-    full_sg_mapping = {v['full_symbol']: k for k, v in _get_symm_data('space_group_encoding').items()}
+    @_lazy_class_attribute
+    def sgencoding():
+        return _get_symm_data('space_group_encoding')
+
+    @_lazy_class_attribute
+    def abbrev_sg_mapping():
+        return _get_symm_data('abbreviated_spacegroup_symbols')
+
+    @_lazy_class_attribute
+    def translations():
+        return {k: Fraction(v) for k, v in _get_symm_data('translations').items()}
+
+    @_lazy_class_attribute
+    def full_sg_mapping():
+        full_symbols = get_symmetry_database().symm_data_field('space_group_encoding', 'full_symbol')
+        return {v: k for k, v in full_symbols.items()}
 
     def __init__(self, int_symbol):
         """
@@ -231,27 +305,30 @@ class SpaceGroup(SymmetryGroup):
         elif int_symbol in SpaceGroup.full_sg_mapping:
             int_symbol = SpaceGroup.full_sg_mapping[int_symbol]
 
-        for spg in SpaceGroup.SYMM_OPS:
-            if int_symbol in [spg['hermann_mauguin'], spg['universal_h_m']]:
-                ops = [SymmOp.from_xyz_string(s) for s in spg['symops']]
-                self.symbol = re.sub(r':', '', re.sub(r' ', '', spg['universal_h_m']))
-                if int_symbol in SpaceGroup.sgencoding:
-                    self.full_symbol = SpaceGroup.sgencoding[int_symbol]['full_symbol']
-                    self.point_group = SpaceGroup.sgencoding[int_symbol]['point_group']
-                else:
-                    self.full_symbol = re.sub(r' ', '', spg['universal_h_m'])
-                    self.point_group = spg['schoenflies']
-                self.hm_for_cif = spg['hermann_mauguin_fmt']
-                self.int_number = spg['number']
-                self.order = len(ops)
-                self._symmetry_ops = ops
-                break
+        # Only the records of this symbol are read from the databases
+        db = get_symmetry_database()
+        try:
+            spg = _format_symm_op(db.symm_ops_record(int_symbol))
+        except KeyError:
+            spg = None
+        data = _get_symm_data_entry('space_group_encoding', int_symbol)
+        if spg is not None:
+            ops = [SymmOp.from_xyz_string(s) for s in spg['symops']]
+            self.symbol = re.sub(r':', '', re.sub(r' ', '', spg['universal_h_m']))
+            if data is not None:
+                self.full_symbol = data['full_symbol']
+                self.point_group = data['point_group']
+            else:
+                self.full_symbol = re.sub(r' ', '', spg['universal_h_m'])
+                self.point_group = spg['schoenflies']
+            self.hm_for_cif = spg['hermann_mauguin_fmt']
+            self.int_number = spg['number']
+            self.order = len(ops)
+            self._symmetry_ops = ops
         else:
-            if int_symbol not in SpaceGroup.sgencoding:
+            if data is None:
                 raise ValueError('Bad international symbol %s' % int_symbol)
 
-            data = SpaceGroup.sgencoding[int_symbol]
-
             self.symbol = int_symbol
             # TODO: Support different origin choices.
             enc = list(data['enc'])
@@ -262,7 +339,7 @@ class SpaceGroup(SymmetryGroup):
                 symm_ops.append(np.array([[-1, 0, 0, 0], [0, -1, 0, 0], [0, 0, -1, 0], [0, 0, 0, 1]]))
             for i in range(ngen):
                 m = np.eye(4)
-                m[:3, :3] = SpaceGroup.gen_matrices[enc.pop(0)]
+                m[:3, :3] = db.symm_data_entry('generator_matrices', enc.pop(0))
                 m[0, 3] = SpaceGroup.translations[enc.pop(0)]
                 m[1, 3] = SpaceGroup.translations[enc.pop(0)]
                 m[2, 3] = SpaceGroup.translations[enc.pop(0)]
@@ -460,11 +537,11 @@ class SpaceGroup(SymmetryGroup):
 
         groups = [[supergroup.int_number]]
         all_groups = [supergroup.int_number]
-        max_subgroups = {int(k): v for k, v in _get_symm_data('maximal_subgroups').items()}
+        database = get_symmetry_database()
         while True:
             new_sub_groups = set()
             for i in groups[-1]:
-                new_sub_groups.update([j for j in max_subgroups[i] if j not in all_groups])
+                new_sub_groups.update([j for j in database.maximal_subgroups(i) if j not in all_groups])
             if self.int_number in new_sub_groups:
                 return True
 
@@ -525,10 +602,7 @@ def sg_symbol_from_int_number(int_number, hexagonal=True):
     Returns:
         (str) Spacegroup symbol
     """
-    syms = []
-    for n, v in _get_symm_data('space_group_encoding').items():
-        if v['int_number'] == int_number:
-            syms.append(n)
+    syms = get_symmetry_database().space_group_symbols(int_number)
     if len(syms) == 0:
         raise ValueError('Invalid international number!')
     if len(syms) == 2:
@@ -9,19 +9,47 @@ from .groups import _get_symm_data
 
 
 def _make_SG_names() -> list:
+    global _SG_NAMES
+    if _SG_NAMES is not None:
+        return _SG_NAMES
     sg_list = []
+    by_number = _get_symm_ops_index()['hermann_mauguin_fmt']
     for ind in range(1, 231):
-        for op in SpaceGroup.SYMM_OPS:
-            if op['number'] == ind:
-                s = op['hermann_mauguin_fmt']
-                if ':' in s:
-                    s = s.split(':')[0]
-                sg_list.append(s)
-                break
+        if ind in by_number:
+            s = by_number[ind][0]
+            if ':' in s:
+                s = s.split(':')[0]
+            sg_list.append(s)
+    _SG_NAMES = sg_list
     return sg_list
 
 
-SG_NAMES = _make_SG_names()
+def _get_symm_ops_index() -> dict:
+    """
+    Index of the space group symmetry data, built on first use. It holds `hermann_mauguin_fmt`
+    (number -> formatted Hermann-Mauguin symbols, in database order) and `number`
+    (Hermann-Mauguin symbol -> first matching number).
+    """
+    global _SYMM_OPS_INDEX
+    if _SYMM_OPS_INDEX is None:
+        by_number = {}
+        by_name = {}
+        for sop in SpaceGroup.SYMM_OPS:
+            by_number.setdefault(sop['number'], []).append(sop['hermann_mauguin_fmt'])
+            by_name.setdefault(sop['hermann_mauguin'], sop['number'])
+        _SYMM_OPS_INDEX = {'hermann_mauguin_fmt': by_number, 'number': by_name}
+    return _SYMM_OPS_INDEX
+
+
+_SYMM_OPS_INDEX = None
+_SG_NAMES = None
+
+
+def __getattr__(name: str):
+    # `SG_NAMES` is built on first access, not when the module is imported
+    if name == 'SG_NAMES':
+        return _make_SG_names()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 class SpacegroupInfo:
@@ -71,11 +99,11 @@ class SpacegroupInfo:
 
     @staticmethod
     def get_symbol_from_int_number(int_number: int):
-        return SG_NAMES[int_number - 1]
+        return _make_SG_names()[int_number - 1]
 
     @staticmethod
     def get_compatible_HM_from_int(int_number: int):
-        return [sop['hermann_mauguin_fmt'] for sop in SpaceGroup.SYMM_OPS if sop['number'] == int_number]
+        return list(_get_symm_ops_index()['hermann_mauguin_fmt'].get(int_number, []))
 
     @staticmethod
     def get_compatible_HM_from_name(name: str):
@@ -87,7 +115,7 @@ class SpacegroupInfo:
 
     @staticmethod
     def get_int_from_HM(HM_str: str):
-        ints = [sop['number'] for sop in SpaceGroup.SYMM_OPS if sop['hermann_mauguin'] == HM_str.replace(' ', '')]
-        if not ints:
+        number = _get_symm_ops_index()['number'].get(HM_str.replace(' ', ''))
+        if number is None:
             raise AttributeError
-        return ints[0]
+        return number
@@ -0,0 +1,171 @@
+# SPDX-FileCopyrightText: 2024 EasyCrystallography contributors
+# SPDX-License-Identifier: BSD-3-Clause
+# © 2022-2024 Contributors to the EasyCrystallography project <https://github.com/EasyScience/EasyCrystallography>
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any
+from typing import Callable
+from typing import Hashable
+from typing import NamedTuple
+from typing import Optional
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+class LRUCache:
+    """
+    A bounded, thread-safe, least recently used cache with hit/miss statistics. A `maxsize` of 0 disables the cache
+    and a `maxsize` of None makes it unbounded.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 128):
+        """
+        Create an empty cache.
+
+        :param maxsize: Maximum number of entries. 0 disables the cache, None makes it unbounded
+        """
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self._maxsize = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self.maxsize = maxsize
+
+    @property
+    def maxsize(self) -> Optional[int]:
+        """
+        Maximum number of entries in the cache.
+
+        :return: Maximum number of entries, None if the cache is unbounded
+        """
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, new_maxsize: Optional[int]):
+        """
+        Set the maximum number of entries. Entries over the new limit are evicted, least recently used first.
+
+        :param new_maxsize: Maximum number of entries. 0 disables the cache, None makes it unbounded
+        """
+        if new_maxsize is not None:
+            new_maxsize = int(new_maxsize)
+            if new_maxsize < 0:
+                raise ValueError('The cache size must be a non-negative integer or None.')
+        with self._lock:
+            self._maxsize = new_maxsize
+            self._evict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._maxsize != 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get an entry from the cache, marking it as recently used.
+
+        :param key: Key of the entry
+        :param default: Value returned if the key is not in the cache
+        :return: Cached value or the default
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Add an entry to the cache, evicting the least recently used entry if the cache is full.
+
+        :param key: Key of the entry
+        :param value: Value to be cached
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Get an entry from the cache, creating and caching it with `factory` on a miss. The factory is called outside
+        of the lock, so a slow factory does not block other threads. Exceptions raised by the factory are not cached.
+
+        :param key: Key of the entry
+        :param factory: Callable without arguments which creates the value
+        :return: Cached or newly created value
+        """
+        marker = _MISSING
+        value = self.get(key, marker)
+        if value is not marker:
+            return value
+        value = factory()
+        if not self.enabled:
+            return value
+        with self._lock:
+            # Another thread may have created the entry in the meantime, keep the first one.
+            value = self._data.setdefault(key, value)
+            self._data.move_to_end(key)
+            self._evict()
+        return value
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache. The statistics are not reset.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def reset_stats(self) -> None:
+        """
+        Reset the hit, miss and eviction counters.
+        """
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Statistics of the cache.
+
+        :return: Hits, misses, evictions, maximum size and current size of the cache
+        """
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self._maxsize, len(self._data))
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def __repr__(self) -> str:
+        return '<{:s}: {}>'.format(self.__class__.__name__, self.info())
+
+    def _evict(self) -> None:
+        if self._maxsize is None:
+            return
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+
+_MISSING = object()
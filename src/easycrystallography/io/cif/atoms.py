@@ -7,11 +7,19 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 from typing import ClassVar
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import NamedTuple
 from typing import NoReturn
 from typing import Tuple
 
+import numpy as np
+
 from easycrystallography.Components.AtomicDisplacement import AtomicDisplacement as _AtomicDisplacement
+from easycrystallography.Components.AtomsTable import ADP_PARAMETERS
+from easycrystallography.Components.AtomsTable import MSP_PARAMETERS
+from easycrystallography.Components.AtomsTable import AtomsTable
 from easycrystallography.Components.Site import Atoms as _Atoms
 from easycrystallography.Components.Susceptibility import MagneticSusceptibility as _MagneticSusceptibility
 
@@ -22,6 +30,18 @@ if TYPE_CHECKING:
     from easyscience.Utils.typing import B
 
 
+class AtomsValues(NamedTuple):
+    """
+    Values of the sites of a CIF block, as read by `Atoms.values_from_cif_block`.
+    """
+
+    sites: Dict[str, dict]  #: arguments of each site, by label
+    errors: Dict[str, dict]  #: errors of the parameters of each site, by label
+    is_fixed: Dict[str, dict]  #: fixed flags of the parameters of each site, by label
+    adps: List[Tuple[str, dict, dict, dict]]  #: label, arguments, errors and fixed flags of each displacement
+    msps: List[Tuple[str, dict, dict, dict]]  #: label, arguments, errors and fixed flags of each susceptibility
+
+
 class AtomicDisplacement(CIF_Template):
     _CIF_SECTION_NAME: ClassVar[str] = '_atom_site'
 
@@ -52,7 +72,32 @@ class AtomicDisplacement(CIF_Template):
         self._CIF_CLASS = reference_class
 
     def from_cif_block(self, block: gemmi.cif.Block) -> Dict[str, B]:
+        return self.from_values(self.values_from_cif_block(block))
+
+    def from_values(self, values: Iterable[Tuple[str, dict, dict, dict]]) -> Dict[str, B]:
+        """
+        Create the atomic displacements read by `values_from_cif_block`.
+
+        :param values: Label, arguments, errors and fixed flags of each displacement
+        :return: Dictionary of the labels, containing the arguments of the site
+        """
         atom_dict = {}
+        for label, kwargs, errors, is_fixed in values:
+            obj = _AtomicDisplacement(**kwargs)
+            for error in errors.keys():
+                setattr(getattr(obj, error), 'error', errors[error])
+            for atr in is_fixed.keys():
+                setattr(getattr(obj, atr), 'fixed', is_fixed[atr])
+            atom_dict[label] = {'adp': obj}
+        return atom_dict
+
+    def values_from_cif_block(self, block: gemmi.cif.Block) -> Iterator[Tuple[str, dict, dict, dict]]:
+        """
+        Read the atomic displacements of a block without creating them.
+
+        :param block: CIF block
+        :return: Iterator over the label, the arguments, the errors and the fixed flags of each displacement
+        """
         # ADP CHECKER
         keys = [
             self._CIF_SECTION_NAME + name[1] if 'label' in name[1] else '?' + self._CIF_SECTION_NAME + name[1]
@@ -90,12 +135,7 @@ class AtomicDisplacement(CIF_Template):
                         errors[kwargs['adp_type']] = E
                     if F is not None and not F:
                         is_fixed[kwargs['adp_type']] = F
-            obj = _AtomicDisplacement(**kwargs)
-            for error in errors.keys():
-                setattr(getattr(obj, error), 'error', errors[error])
-            for atr in is_fixed.keys():
-                setattr(getattr(obj, atr), 'fixed', is_fixed[atr])
-            atom_dict[row[0]] = {'adp': obj}
+            yield row[0], kwargs, errors, is_fixed
 
         keys = [
             self._CIF_SECTION_NAME + name[1] if 'label' in name[1] else '?' + self._CIF_SECTION_NAME + name[1]
@@ -125,13 +165,7 @@ class AtomicDisplacement(CIF_Template):
                         errors[ll] = E
                     if F is not None and not F:
                         is_fixed[ll] = F
-            obj = _AtomicDisplacement(**kwargs)
-            for error in errors.keys():
-                setattr(getattr(obj, error), 'error', errors[error])
-            for atr in is_fixed.keys():
-                setattr(getattr(obj, atr), 'fixed', is_fixed[atr])
-            atom_dict[row[0]] = {'adp': obj}
-        return atom_dict
+            yield row[0], kwargs, errors, is_fixed
 
     def add_to_cif_block(self, obj: B, block: gemmi.cif.Block) -> NoReturn:
         # Add the additional anisotropic loops
@@ -217,7 +251,32 @@ class MagneticSusceptibility(CIF_Template):
         self._CIF_CLASS = reference_class
 
     def from_cif_block(self, block: gemmi.cif.Block) -> Dict[str, B]:
+        return self.from_values(self.values_from_cif_block(block))
+
+    def from_values(self, values: Iterable[Tuple[str, dict, dict, dict]]) -> Dict[str, B]:
+        """
+        Create the magnetic susceptibilities read by `values_from_cif_block`.
+
+        :param values: Label, arguments, errors and fixed flags of each susceptibility
+        :return: Dictionary of the labels, containing the arguments of the site
+        """
         atom_dict = {}
+        for label, kwargs, errors, is_fixed in values:
+            obj = _MagneticSusceptibility(**kwargs)
+            for error in errors.keys():
+                setattr(getattr(obj, error), 'error', errors[error])
+            for atr in is_fixed.keys():
+                setattr(getattr(obj, atr), 'fixed', is_fixed[atr])
+            atom_dict[label] = {'msp': obj}
+        return atom_dict
+
+    def values_from_cif_block(self, block: gemmi.cif.Block) -> Iterator[Tuple[str, dict, dict, dict]]:
+        """
+        Read the magnetic susceptibilities of a block without creating them.
+
+        :param block: CIF block
+        :return: Iterator over the label, the arguments, the errors and the fixed flags of each susceptibility
+        """
         keys = [
             self._CIF_SECTION_NAME + name[1] if 'label' in name[1] else '?' + self._CIF_SECTION_NAME + name[1]
             for name in self._CIF_MSP_ANISO_CONVERSIONS
@@ -243,13 +302,7 @@ class MagneticSusceptibility(CIF_Template):
                         errors[ll] = E
                     if F is not None and not F:
                         is_fixed[ll] = F
-            obj = _MagneticSusceptibility(**kwargs)
-            for error in errors.keys():
-                setattr(getattr(obj, error), 'error', errors[error])
-            for atr in is_fixed.keys():
-                setattr(getattr(obj, atr), 'fixed', is_fixed[atr])
-            atom_dict[row[0]] = {'msp': obj}
-        return atom_dict
+            yield row[0], kwargs, errors, is_fixed
 
     def add_to_cif_block(self, obj: B, block: gemmi.cif.Block) -> NoReturn:
         # Then add the additional loops
@@ -293,7 +346,7 @@ class Atoms(CIF_Template):
         super().__init__()
         self._CIF_CLASS = reference_class
 
-    def _site_runner(self, block):
+    def _site_values(self, block) -> Tuple[Dict[str, dict], Dict[str, dict], Dict[str, dict]]:
         keys = [
             self._CIF_SECTION_NAME + name[1] if 'occupancy' not in name[1] else '?' + self._CIF_SECTION_NAME + name[1]
             for name in self._CIF_CONVERSIONS
@@ -327,17 +380,41 @@ class Atoms(CIF_Template):
             atom_dict[kwargs['label']] = kwargs
             error_dict[kwargs['label']] = errors
             fixed_dict[kwargs['label']] = is_fixed
+        return atom_dict, error_dict, fixed_dict
+
+    def values_from_cif_block(self, block: gemmi.cif.Block) -> AtomsValues:
+        """
+        Read the sites of a block without creating them. The values are plain python objects, so they can be read in
+        another process.
+
+        :param block: CIF block
+        :return: Values of the sites and of their displacements and susceptibilities
+        """
+        return AtomsValues(
+            *self._site_values(block),
+            list(AtomicDisplacement().values_from_cif_block(block)),
+            list(MagneticSusceptibility().values_from_cif_block(block)),
+        )
+
+    def from_values(self, values: AtomsValues) -> B:
+        """
+        Create the sites read by `values_from_cif_block`.
+
+        :param values: Values of the sites
+        :return: Collection of the sites
+        """
+        atom_dict = {label: dict(kwargs) for label, kwargs in values.sites.items()}
+        error_dict = values.errors
+        fixed_dict = values.is_fixed
 
         # ADP CHECKER
-        ADP_RUNNER = AtomicDisplacement()
-        adp_dict = ADP_RUNNER.from_cif_block(block)
+        adp_dict = AtomicDisplacement().from_values(values.adps)
         for label, adp in adp_dict.items():
             if label in atom_dict:
                 atom_dict[label].update(adp)
 
         # MSP Checker
-        MSP_RUNNER = MagneticSusceptibility()
-        msp_dict = MSP_RUNNER.from_cif_block(block)
+        msp_dict = MagneticSusceptibility().from_values(values.msps)
         for label, msp in msp_dict.items():
             if label in atom_dict:
                 atom_dict[label].update(msp)
@@ -353,11 +430,51 @@ class Atoms(CIF_Template):
                 for atr in fixed_dict[label].keys():
                     setattr(getattr(obj, atr), 'fixed', fixed_dict[label][atr])
             atoms.append(obj)
-        return atoms
+        return self._CIF_CLASS('from_cif', *atoms)
 
     def from_cif_block(self, block: gemmi.cif.Block) -> B:
-        atoms = self._site_runner(block)
-        return self._CIF_CLASS('from_cif', *atoms)
+        return self.from_values(self.values_from_cif_block(block))
+
+    def table_from_cif_block(self, block: gemmi.cif.Block) -> AtomsTable:
+        """
+        Read the sites of a block into a table of their values, without creating any site.
+
+        :param block: CIF block
+        :return: Table of the sites, in the order of the block
+        """
+        values = self.values_from_cif_block(block)
+        atom_dict = values.sites
+        adps = {label: kwargs for label, kwargs, _, _ in values.adps}
+        msps = {label: kwargs for label, kwargs, _, _ in values.msps}
+        n = len(atom_dict)
+        fract_coords = np.zeros((n, 3))
+        occupancies = np.ones(n)
+        adp_types = ['Uiso'] * n
+        adp_values = np.full((n, 6), np.nan)
+        msp_types = [''] * n
+        msp_values = np.full((n, 6), np.nan)
+        for idx, (label, kwargs) in enumerate(atom_dict.items()):
+            fract_coords[idx] = [kwargs.get(key, 0.0) for key in ('fract_x', 'fract_y', 'fract_z')]
+            occupancies[idx] = kwargs.get('occupancy', 1.0)
+            adp = adps.get(label, {'adp_type': 'Uiso'})
+            adp_types[idx] = adp['adp_type']
+            names = ADP_PARAMETERS[adp['adp_type']]
+            adp_values[idx, : len(names)] = [adp.get(name, 0.0) for name in names]
+            if label in msps:
+                msp = msps[label]
+                msp_types[idx] = msp['msp_type']
+                names = MSP_PARAMETERS[msp['msp_type']]
+                msp_values[idx, : len(names)] = [msp.get(name, 0.0) for name in names]
+        return AtomsTable(
+            [str(label) for label in atom_dict],
+            [str(kwargs['specie']) for kwargs in atom_dict.values()],
+            fract_coords,
+            occupancies,
+            adp_types,
+            adp_values,
+            msp_types,
+            msp_values,
+        )
 
     def add_to_cif_block(self, obj: B, block: gemmi.cif.Block) -> NoReturn:
         additional_keys = []
@@ -35,6 +35,15 @@ class Lattice(CIF_Template):
         self._CIF_CLASS = reference_class
 
     def from_cif_block(self, block: gemmi.cif.Block) -> B:
+        return self.from_values(self.values_from_cif_block(block))
+
+    def values_from_cif_block(self, block: gemmi.cif.Block) -> Tuple[dict, dict, dict]:
+        """
+        Read the cell parameters of a block without creating the lattice.
+
+        :param block: CIF block
+        :return: The arguments, the errors and the fixed flags of the lattice
+        """
         kwargs = {}
         errors = {}
         is_fixed = {}
@@ -49,6 +58,16 @@ class Lattice(CIF_Template):
             if F is not None and not F:
                 is_fixed[item[0]] = F
             kwargs[item[0]] = V
+        return kwargs, errors, is_fixed
+
+    def from_values(self, values: Tuple[dict, dict, dict]) -> B:
+        """
+        Create the lattice read by `values_from_cif_block`.
+
+        :param values: The arguments, the errors and the fixed flags of the lattice
+        :return: Lattice
+        """
+        kwargs, errors, is_fixed = values
         obj = self._CIF_CLASS(**kwargs)
         for error in errors.keys():
             setattr(getattr(obj, error), 'error', errors[error])
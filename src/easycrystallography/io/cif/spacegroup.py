@@ -49,6 +49,15 @@ class SpaceGroup(CIF_Template):
         self._CIF_CLASS = reference_class
 
     def from_cif_block(self, block: gemmi.cif.Block) -> B:
+        return self.from_values(self.values_from_cif_block(block))
+
+    def values_from_cif_block(self, block: gemmi.cif.Block) -> dict:
+        """
+        Read the space group of a block without creating it.
+
+        :param block: CIF block
+        :return: The arguments of the space group
+        """
         kwargs = {}
         for item in self._CIF_CONVERSIONS[0:2]:
             value = block.find_pair_item(self._CIF_SECTION_NAME + item[1])
@@ -71,7 +80,16 @@ class SpaceGroup(CIF_Template):
             for this_item in list(loop):
                 ops.append(SymmOp.from_xyz_string(this_item))
             kwargs[item[0]] = ops
-        return self._CIF_CLASS(**kwargs)
+        return kwargs
+
+    def from_values(self, values: dict) -> B:
+        """
+        Create the space group read by `values_from_cif_block`.
+
+        :param values: The arguments of the space group
+        :return: Space group
+        """
+        return self._CIF_CLASS(**values)
 
     def add_to_cif_block(self, obj: B, block: gemmi.cif.Block) -> NoReturn:
         if not obj.is_custom:
@@ -3,18 +3,159 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # © 2022-2024 Contributors to the EasyCrystallography project <https://github.com/EasyScience/EasyCrystallography>
 
+import hashlib
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import NamedTuple
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
 from gemmi import cif
 
+from easycrystallography.Utils.cache import LRUCache
+
 from .cif import *
+from .cif.atoms import AtomsValues
 from .template import AbstractStructureParser
 from .template import AbstractStructureReader
 from .template import AbstractStructureWriter
 
 
+# Process-wide cache of parsed CIF documents, keyed on a hash of the CIF text. The documents are only read from, the
+# size can be changed, or the cache disabled with a size of 0, through `CIF_DOCUMENT_CACHE.maxsize`.
+CIF_DOCUMENT_CACHE = LRUCache(maxsize=16)
+
+
+def read_cif_string(in_str: str) -> cif.Document:
+    """
+    Parse a CIF string, reusing the document of an earlier parse of the same text.
+
+    :param in_str: CIF text
+    :return: The parsed document, which must not be modified
+    """
+    key = hashlib.sha256(in_str.encode('utf-8')).hexdigest()
+    return CIF_DOCUMENT_CACHE.get_or_create(key, lambda: cif.read_string(in_str))
+
+
+def iter_cif_blocks(lines: Iterable[str], block_names: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Split CIF text into its data blocks without parsing it, so that a large file can be read one block at a time.
+    Text before the first data block is dropped.
+
+    :param lines: Lines of the CIF text, e.g. an open file
+    :param block_names: Names of the blocks to keep. None keeps all blocks
+    :return: Iterator over the name and the text of each kept block
+    """
+    if block_names is not None:
+        block_names = set(block_names)
+    name = None
+    block = []
+    in_text_field = False
+    for line in lines:
+        # Lines starting with ';' open and close text fields, which may hold anything
+        if line.startswith(';'):
+            in_text_field = not in_text_field
+        elif not in_text_field and line.lstrip().lower().startswith('data_'):
+            if name is not None:
+                yield name, ''.join(block)
+            name = line.split(None, 1)[0][5:]
+            if block_names is not None and name not in block_names:
+                name = None
+            block = []
+        if name is not None:
+            block.append(line if line.endswith('\n') else line + '\n')
+    if name is not None:
+        yield name, ''.join(block)
+
+
+class PhaseValues(NamedTuple):
+    """
+    Values of the phase of a data block, as plain python objects, so that a block can be read in a worker process
+    and its phase created in the calling one.
+    """
+
+    name: str
+    cell: Tuple[dict, dict, dict]  #: arguments, errors and fixed flags of the lattice
+    space_group: dict  #: arguments of the space group
+    atoms: AtomsValues  #: values of the sites
+
+
+def read_phase_values(block: cif.Block) -> PhaseValues:
+    """
+    Read the values of the phase of a data block, without creating any object.
+
+    :param block: CIF block
+    :return: Values of the phase
+    """
+    return PhaseValues(
+        block.name,
+        Lattice().values_from_cif_block(block),
+        SpaceGroup().values_from_cif_block(block),
+        Atoms().values_from_cif_block(block),
+    )
+
+
+def phase_from_values(values: PhaseValues, phase_class: Optional = None):
+    """
+    Create the phase read by `read_phase_values`.
+
+    :param values: Values of the phase
+    :param phase_class: Class of the phase. Default `Phase`
+    :return: The phase
+    """
+    if phase_class is None:
+        from easycrystallography.Structures.Phase import Phase as phase_class
+    return phase_class(
+        name=values.name,
+        cell=Lattice().from_values(values.cell),
+        space_group=SpaceGroup().from_values(values.space_group),
+        atoms=Atoms().from_values(values.atoms),
+    )
+
+
+def read_phase_record(block: cif.Block):
+    """
+    Read a data block into a read-only phase record, with the sites in a table instead of `Site` objects.
+
+    :param block: CIF block
+    :return: Record of the phase
+    :rtype: PhaseRecord
+    """
+    from easycrystallography.Structures.Phase import PhaseRecord
+
+    return PhaseRecord(
+        block.name,
+        Lattice().CLASS_READER(block),
+        SpaceGroup().CLASS_READER(block),
+        Atoms().table_from_cif_block(block),
+    )
+
+
+def iter_structures(
+    lines: Iterable[str],
+    block_names: Optional[Iterable[str]] = None,
+    phase_class: Optional = None,
+    read_only: bool = False,
+) -> Iterator:
+    """
+    Create the phase of each data block of CIF text, one block at a time.
+
+    :param lines: Lines of the CIF text, e.g. an open file
+    :param block_names: Names of the blocks to read. None reads all blocks
+    :param phase_class: Class of the phases. Default `Phase`
+    :param read_only: Give read-only `PhaseRecord`s instead of phases
+    :return: Iterator over the phases, in the order of the blocks
+    """
+    for _, text in iter_cif_blocks(lines, block_names):
+        block = cif.read_string(text).sole_block()
+        if read_only:
+            yield read_phase_record(block)
+        else:
+            yield phase_from_values(read_phase_values(block), phase_class)
+
+
 class CifFileReader(AbstractStructureReader):
     """
     Reads a structure from a CIF file.
@@ -62,11 +203,13 @@ class CifFileReader(AbstractStructureReader):
         block = self._block_finder(data_name)
         return self.read(block, SpaceGroup().CLASS_READER)
 
-    def structure(self, data_name: Optional[str] = None, phase_class: Optional = None):
+    def structure(self, data_name: Optional[str] = None, phase_class: Optional = None, read_only: bool = False):
         block = self._block_finder(data_name)
+        if read_only:
+            return read_phase_record(block)
         if phase_class is None:
             from easycrystallography.Structures.Phase import Phase as phase_class
-        components = {'cell': Lattice, 'spacegroup': SpaceGroup, 'atoms': Atoms}
+        components = {'cell': Lattice, 'space_group': SpaceGroup, 'atoms': Atoms}
         kwargs = {'name': block.name}
         for key, value in components.items():
             kwargs[key] = self.read(block, value().CLASS_READER)
@@ -77,7 +220,7 @@ class CifFileReader(AbstractStructureReader):
             from easycrystallography.Structures.Phase import Phase as phase_class
         if phases_class is None:
             from easycrystallography.Structures.Phase import Phases as phases_class
-        components = {'cell': Lattice, 'spacegroup': SpaceGroup, 'atoms': Atoms}
+        components = {'cell': Lattice, 'space_group': SpaceGroup, 'atoms': Atoms}
         phases = []
         document = self._block_finder(-1)
         for block in document:
@@ -162,12 +305,12 @@ class CifFileWriter(AbstractStructureWriter):
         if data_name is None:
             data_name = obj.name
         block = self.get_data_block(data_name)
-        components = {'cell': Lattice, 'spacegroup': SpaceGroup, 'atoms': Atoms}
+        components = {'cell': Lattice, 'space_group': SpaceGroup, 'atoms': Atoms}
         for key, value in components.items():
             self.write(getattr(obj, key), value().CLASS_WRITER, block)
 
     def structures(self, objs):
-        components = {'cell': Lattice, 'spacegroup': SpaceGroup, 'atoms': Atoms}
+        components = {'cell': Lattice, 'space_group': SpaceGroup, 'atoms': Atoms}
         for obj in objs:
             data_name = obj.name
             block = self.get_data_block(data_name)
@@ -210,22 +353,23 @@ class CifStringReader(AbstractStructureReader):
         in_str: Optional[str] = None,
         block_name: Optional[str] = None,
         phase_class: Optional = None,
+        read_only: bool = False,
     ):
         if phase_class is None:
             from easycrystallography.Structures.Phase import Phase as phase_class
-        components = {'cell': Lattice, 'spacegroup': SpaceGroup, 'atoms': Atoms}
-        document = cif.read_string(in_str)
-        data_names = [block.name for block in document]
-        idx = 0
-        if block_name is not None:
-            if block_name in data_names:
-                idx = data_names.index(block_name)
-            else:
+        components = {'cell': Lattice, 'space_group': SpaceGroup, 'atoms': Atoms}
+        document = read_cif_string(in_str)
+        if block_name is None:
+            block = document[0]
+        else:
+            block = document.find_block(block_name)
+            if block is None:
                 raise ValueError('Block name not found')
-        block = document[idx]
+        if read_only:
+            return read_phase_record(block)
         kwargs = {'name': block.name}
         for key, value in components.items():
-            kwargs[key] = self.read(in_str, value().STRING_READER)[idx]
+            kwargs[key] = self.read(block, value().CLASS_READER)
         return phase_class(**kwargs)
 
     def structures(self, document, phase_class: Optional = None):
@@ -233,9 +377,9 @@ class CifStringReader(AbstractStructureReader):
 
         if phase_class is None:
             from easycrystallography.Structures.Phase import Phase as phase_class
-        components = {'cell': Lattice, 'spacegroup': SpaceGroup, 'atoms': Atoms}
+        components = {'cell': Lattice, 'space_group': SpaceGroup, 'atoms': Atoms}
         phases = []
-        document = cif.read_string(document)
+        document = read_cif_string(document)
         for block in document:
             kwargs = {'name': block.name}
             for key, value in components.items():
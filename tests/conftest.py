@@ -0,0 +1,25 @@
+# SPDX-FileCopyrightText: 2024 EasyCrystallography contributors
+# SPDX-License-Identifier: BSD-3-Clause
+# © 2022-2024 Contributors to the EasyCrystallography project <https://github.com/EasyScience/EasyCrystallography>
+
+import os
+import shutil
+import tempfile
+
+from easycrystallography.Symmetry.database import CACHE_DIR_VARIABLE
+
+_CACHE_DIR = None
+
+
+def pytest_configure(config):
+    # The symmetry database is opened while the tests are collected, so the cache directory is set up before that
+    # and the suite never writes into the user cache.
+    global _CACHE_DIR
+    _CACHE_DIR = tempfile.mkdtemp(prefix='easycrystallography-cache-')
+    os.environ[CACHE_DIR_VARIABLE] = _CACHE_DIR
+
+
+def pytest_unconfigure(config):
+    if _CACHE_DIR is not None:
+        os.environ.pop(CACHE_DIR_VARIABLE, None)
+        shutil.rmtree(_CACHE_DIR, ignore_errors=True)
@@ -86,4 +86,83 @@ def test_Atoms_get_item_str(sites: List[Site]):
 
     for site in sites:
         atom = atoms[site.label.value]
-        assert atom.label == site.label
\ No newline at end of file
+        assert atom.label == site.label
+
+
+def test_Atoms_label_index():
+    atoms = Atoms('test', Site('A', 'Fe'), Site('B', 'O'), Site('C', 'O'))
+    assert atoms.has_label('B')
+    atoms.insert(0, Site('D', 'H'))
+    assert atoms.atom_labels == ['D', 'A', 'B', 'C']
+    assert atoms['D'].label.value == 'D'
+
+    atoms['B'].label = 'E'
+    assert not atoms.has_label('B')
+    assert atoms['E'] is atoms[2]
+    atoms[2].label.value = 'B'
+    assert atoms['B'] is atoms[2]
+    # Swapping labels is found from the labels of the found sites
+    atoms['B'].label = 'C'
+    atoms[3].label = 'B'
+    assert atoms['B'] is atoms[3]
+    assert atoms['C'] is atoms[2]
+    atoms[2].label = 'B'
+    atoms[3].label = 'C'
+    # The labels are encoded as plain descriptors
+    assert all(site.as_dict()['label']['@class'] == 'DescriptorStr' for site in atoms)
+
+    del atoms['A']
+    assert not atoms.has_label('A')
+    del atoms[0]
+    assert atoms.atom_labels == ['B', 'C']
+    assert not atoms.has_label('D')
+    assert atoms['C'] is atoms[1]
+
+
+def test_Atoms_label_index_no_rebuild(monkeypatch):
+    from easycrystallography.Components.Lattice import PeriodicLattice
+    from easycrystallography.Components.Site import PeriodicAtoms
+
+    builds = []
+    build = Atoms._build_label_index
+    monkeypatch.setattr(Atoms, '_build_label_index', lambda self: builds.append(1) or build(self))
+    atoms = PeriodicAtoms('test', lattice=PeriodicLattice(spacegroup='P 1'))
+    for idx in range(20):
+        atoms.append(Site(f'A{idx}', 'Fe'))
+    # Only the index of the empty collection is built, appending keeps it up to date
+    assert len(builds) <= 1
+    assert not atoms.has_label('B')
+    atoms['A3'].label = 'B'
+    assert atoms.has_label('B') and not atoms.has_label('A3')
+    del atoms['A5']
+    atoms.insert(0, Site('C', 'O'))
+    assert atoms['C'] is atoms[0]
+    assert not atoms.has_label('A5')
+    assert len(builds) <= 1
+
+
+def test_Atoms_label_index_undo():
+    from easyscience import global_object
+
+    atoms = Atoms('test', Site('A', 'Fe'), Site('B', 'O'))
+    assert atoms.has_label('B')
+    global_object.stack.enabled = True
+    try:
+        atoms['B'].label = 'E'
+        assert atoms['E'] is atoms[1]
+        global_object.stack.undo()
+        assert atoms['B'] is atoms[1]
+        assert not atoms.has_label('E')
+        global_object.stack.redo()
+        assert atoms['E'] is atoms[1]
+    finally:
+        global_object.stack.enabled = False
+
+
+def test_Atoms_label_index_duplicates():
+    atoms = Atoms('test', Site('A', 'Fe'), Site('B', 'O'))
+    atoms.append(Site('A', 'O'))
+    assert atoms['A'] is atoms[0]
+    del atoms['A']
+    assert atoms['A'] is atoms[1]
+    assert str(atoms['A'].specie) == 'O'
@@ -0,0 +1,126 @@
+# SPDX-FileCopyrightText: 2024 EasyCrystallography contributors
+# SPDX-License-Identifier: BSD-3-Clause
+# © 2022-2024 Contributors to the EasyCrystallography project <https://github.com/EasyScience/EasyCrystallography>
+
+import numpy as np
+import pytest
+
+from easycrystallography.Components.AtomsTable import AtomsTable
+from easycrystallography.Components.Lattice import Lattice
+from easycrystallography.Components.Lattice import PeriodicLattice
+from easycrystallography.Components.Site import Atoms
+from easycrystallography.Components.Site import PeriodicAtoms
+from easycrystallography.Components.Site import Site
+from easycrystallography.Components.SpaceGroup import SpaceGroup
+
+COLUMNS = ('labels', 'species', 'fract_coords', 'occupancies', 'adp_types', 'adp_values', 'msp_types', 'msp_values')
+
+
+@pytest.fixture
+def atoms():
+    return Atoms(
+        'atoms',
+        Site('Fe1', 'Fe3+', 0.5, 0.1, 0.2, 0.3, adp='Uani', U_11=0.01, U_12=0.002, U_33=0.03),
+        Site('O1', 'O', 1, 0.5, 0.5, 0.5, b_iso_or_equiv=0.4, msp='Cani', chi_11=1.5, chi_23=0.5),
+        Site('Fe2', 'Fe3+', 1, 0.7, 0.2, 0.1, msp='Ciso', chi=2),
+    )
+
+
+def assert_same_table(t1, t2):
+    assert t1.species_names == t2.species_names
+    for column in COLUMNS:
+        assert np.array_equal(getattr(t1, column), getattr(t2, column), equal_nan=column.endswith('values'))
+
+
+def test_from_atoms(atoms):
+    table = AtomsTable.from_atoms(atoms)
+    assert len(table) == 3
+    assert table.labels.tolist() == atoms.atom_labels
+    assert table.species.tolist() == atoms.atom_species
+    assert table.species_names == ['Fe3+', 'O']
+    assert table.specie_codes.tolist() == [0, 1, 0]
+    assert np.array_equal(table.occupancies, atoms.atom_occupancies)
+    assert np.array_equal(table.fract_coords, [site.fract_coords for site in atoms])
+    assert table.adp_types.tolist() == ['Uani', 'Biso', 'Uiso']
+    assert table.msp_types.tolist() == ['', 'Cani', 'Ciso']
+    assert np.array_equal(table.adp_matrices[0], [[0.01, 0.002, 0], [0.002, 0, 0], [0, 0, 0.03]])
+    assert np.array_equal(table.adp_matrices[1], 0.4 * np.eye(3))
+    assert np.array_equal(table.msp_matrices[1], [[1.5, 0, 0], [0, 0, 0.5], [0, 0.5, 0]])
+    assert np.array_equal(table.msp_matrices[0], np.zeros((3, 3)))
+
+
+def test_round_trip(atoms):
+    table = AtomsTable.from_atoms(atoms)
+    new_atoms = table.to_atoms('copy')
+    assert isinstance(new_atoms, Atoms)
+    assert new_atoms.atom_labels == atoms.atom_labels
+    assert_same_table(AtomsTable.from_atoms(new_atoms), table)
+
+    lattice = PeriodicLattice.from_lattice_and_spacegroup(Lattice(), SpaceGroup())
+    periodic = table.to_atoms(lattice=lattice)
+    assert isinstance(periodic, PeriodicAtoms)
+    assert periodic.lattice is lattice
+    assert_same_table(AtomsTable.from_atoms(periodic), table)
+
+
+def test_views(atoms):
+    table = AtomsTable.from_atoms(atoms)
+    assert table.fract_coords.flags.c_contiguous
+    assert np.shares_memory(table.fract_x, table.fract_coords)
+    assert np.shares_memory(table[1:].fract_coords, table.fract_coords)
+    coords = np.random.default_rng(0).random((3, 3))
+    assert np.shares_memory(AtomsTable(table.labels, table.species, coords).fract_coords, coords)
+    assert table[-1].labels.tolist() == ['Fe2']
+    assert table[table.occupancies == 1].labels.tolist() == ['O1', 'Fe2']
+
+
+def test_defaults():
+    table = AtomsTable(['a', 'b'], ['H', 'D'], np.zeros((2, 3)))
+    assert np.array_equal(table.occupancies, [1, 1])
+    assert table.adp_types.tolist() == ['Uiso', 'Uiso']
+    assert np.array_equal(table.adp_matrices, np.zeros((2, 3, 3)))
+    assert table.msp_types.tolist() == ['', '']
+    assert table.to_atoms().atom_labels == ['a', 'b']
+    assert len(AtomsTable.from_atoms([])) == 0
+
+
+def test_records(atoms):
+    table = AtomsTable.from_atoms(atoms)
+    records = table.records()
+    assert [record.label for record in records] == atoms.atom_labels
+    fe1, o1, fe2 = records
+    assert fe1.specie == 'Fe3+'
+    assert fe1.occupancy == 0.5
+    assert (fe1.fract_x, fe1.fract_y, fe1.fract_z) == (0.1, 0.2, 0.3)
+    assert fe1.adp_type == 'Uani'
+    assert fe1.adp_values['U_12'] == 0.002
+    assert fe1.msp_type == ''
+    assert fe1.msp_values == {}
+    assert o1.msp_values['chi_23'] == 0.5
+    assert fe2.msp_values == {'chi': 2.0}
+    with pytest.raises(ValueError):
+        fe1.fract_coords[0] = 1
+    with pytest.raises(AttributeError):
+        fe1.other = 1
+    with pytest.raises(IndexError):
+        table.record(3)
+
+
+def test_records_promotion(atoms):
+    table = AtomsTable.from_atoms(atoms)
+    record = table.record(-1)
+    assert record.label == 'Fe2'
+    assert not record.is_promoted
+    # Attributes of the site promote the record
+    assert record.msp.msp_type.value == 'Ciso'
+    assert record.is_promoted
+    assert record.site is table.record(2).site
+    assert not table.record(0).is_promoted
+    # Other attributes do not create the site
+    first = table.record(0)
+    with pytest.raises(AttributeError):
+        first.ocupancy
+    assert not hasattr(first, 'lattice')
+    assert not first.is_promoted
+    record.site.occupancy = 0.2
+    assert record.occupancy == 1
@@ -713,3 +713,139 @@ def test_lattice_copy(value):
         f2 = getattr(l2, item)
         assert np.isclose(f1.value, f2.value)
         assert f1 != f2
+
+
+@pytest.mark.parametrize("value", basic_pars)
+def test_Lattice_get_neighbor_list(value: list):
+    l = Lattice(*value)
+    rng = np.random.default_rng(0)
+    frac = rng.random((10, 3))
+    centers = l.get_cartesian_coords(rng.random((4, 3)))
+    r = 3.0
+
+    neighbors = l.get_neighbor_list(frac, centers, r)
+    assert neighbors.offsets[0] == 0
+    assert neighbors.offsets[-1] == len(neighbors.indices)
+    # brute force over a block of images
+    images = np.stack(np.meshgrid(*[np.arange(-4, 5)] * 3, indexing="ij"), axis=3).reshape((-1, 3))
+    for i, center in enumerate(centers):
+        sl = slice(neighbors.offsets[i], neighbors.offsets[i + 1])
+        cart = l.get_cartesian_coords(frac[None, :, :] + images[:, None, :])
+        dist = np.linalg.norm(cart - center, axis=2)
+        assert np.sum(dist < r) == sl.stop - sl.start
+        assert np.allclose(np.sort(dist[dist < r]), np.sort(neighbors.distances[sl]))
+        coords = l.get_cartesian_coords(frac[neighbors.indices[sl]] + neighbors.images[sl])
+        assert np.allclose(coords, neighbors.coords[sl])
+        assert np.allclose(np.linalg.norm(coords - center, axis=1), neighbors.distances[sl])
+
+    # the same neighbors as get_points_in_sphere
+    points = l.get_points_in_sphere(frac, centers[0], r)
+    assert sorted(p[2] for p in points) == sorted(neighbors.indices[: neighbors.offsets[1]].tolist())
+
+    capped = l.get_neighbor_list(frac, centers, r, max_neighbors=3)
+    for i in range(len(centers)):
+        d = np.sort(neighbors.distances[neighbors.offsets[i] : neighbors.offsets[i + 1]])[:3]
+        assert np.allclose(capped.distances[capped.offsets[i] : capped.offsets[i + 1]], d)
+
+
+@pytest.mark.parametrize("value", basic_pars)
+def test_Lattice_d_hkl(value: list):
+    l = Lattice(*value)
+    hkl = np.array([[1, 0, 0], [1, 1, 0], [1, 2, 3], [-2, 1, 4]])
+    gstar = l.reciprocal_lattice_crystallographic.metric_tensor
+    expected = [1 / np.sqrt(h @ gstar @ h) for h in hkl]
+    assert np.allclose(l.d_hkl(hkl), expected)
+    assert np.isclose(l.d_hkl(hkl[2]), expected[2])
+    assert isinstance(l.d_hkl(hkl[2]), float)
+
+
+@pytest.mark.parametrize("value", basic_pars)
+def test_Lattice_generate_reflections(value: list):
+    l = Lattice(*value)
+    d_min, d_max = 0.8, 2.5
+    hkl, d = l.generate_reflections(d_min, d_max)
+    assert np.allclose(l.d_hkl(hkl), d)
+    assert np.all(np.diff(d) <= 0)
+    assert np.all((d >= d_min) & (d <= d_max))
+    # brute force over a large block of Miller indices
+    grid = np.stack(np.meshgrid(*[np.arange(-12, 13)] * 3, indexing="ij"), axis=3).reshape((-1, 3))
+    grid = grid[np.any(grid != 0, axis=1)]
+    all_d = l.d_hkl(grid)
+    expected = grid[(all_d >= d_min) & (all_d <= d_max)]
+    assert len(hkl) == len(expected)
+    assert {tuple(h) for h in hkl} == {tuple(h) for h in expected}
+    with pytest.raises(ValueError):
+        l.generate_reflections(0)
+
+
+@pytest.mark.parametrize("value", basic_pars)
+def test_Lattice_b_matrix(value: list):
+    l = Lattice(*value)
+    B = l.b_matrix
+    assert np.allclose(B.T @ B, l.reciprocal_metric_tensor)
+    assert np.allclose(np.tril(B, -1), 0)
+    hkl = np.array([[1, 0, 0], [1, 2, 3], [-2, 1, 4]])
+    assert np.allclose(np.linalg.norm(hkl @ B.T, axis=1), 1 / l.d_hkl(hkl))
+    assert np.allclose(l.reciprocal_matrix, np.linalg.inv(l.matrix).T)
+
+
+def test_Lattice_geometry_cache():
+    l = Lattice(3, 4, 5, 80, 99, 110)
+    m = l.matrix
+    assert np.array_equal(l.matrix, m)
+    assert l._matrix() is l._matrix()
+    assert not l._matrix().flags.writeable
+    l.inv_matrix
+    l.inv_matrix
+    info = l.geometry_cache_info()
+    assert info.misses == 2
+    assert info.hits >= 2
+    assert info.currsize == 2
+    # Setting the same value keeps the cache
+    cached = l._matrix()
+    l.a = 3
+    assert l._matrix() is cached
+    # A new value invalidates it
+    l.a = 3.5
+    assert l._matrix() is not cached
+    assert l.geometry_cache_info().evictions == 2
+    assert np.isclose(l.matrix[0, 0], Lattice(3.5, 4, 5, 80, 99, 110).matrix[0, 0])
+    assert np.allclose(l.inv_matrix, np.linalg.inv(l.matrix))
+
+
+@pytest.mark.parametrize("name", ["matrix", "inv_matrix", "metric_tensor", "reciprocal_metric_tensor",
+                                  "reciprocal_matrix", "b_matrix"])
+def test_Lattice_derived_arrays_are_copies(name):
+    l = Lattice(3, 4, 5, 80, 99, 110)
+    value = getattr(l, name)
+    expected = value.copy()
+    assert value.flags.writeable
+    value[:] = 0
+    assert np.array_equal(getattr(l, name), expected)
+    assert np.array_equal(getattr(Lattice(3, 4, 5, 80, 99, 110), name), expected)
+
+
+def test_Lattice_matrix_cache():
+    from easycrystallography.Components.Lattice import LATTICE_MATRIX_CACHE
+
+    old_size = LATTICE_MATRIX_CACHE.maxsize
+    Lattice.clear_matrix_cache()
+    try:
+        LATTICE_MATRIX_CACHE.maxsize = 2
+        l1 = Lattice(3, 4, 5, 80, 99, 110)
+        l2 = Lattice(3, 4, 5, 80, 99, 110)
+        assert l1._matrix() is l2._matrix()
+        info = Lattice.matrix_cache_info()
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+        for a in (3.1, 3.2, 3.3):
+            Lattice(a, 4, 5, 80, 99, 110).matrix
+        info = Lattice.matrix_cache_info()
+        assert info.currsize == 2
+        assert info.evictions == 2
+        # A disabled cache still gives the right matrix
+        LATTICE_MATRIX_CACHE.maxsize = 0
+        assert np.allclose(Lattice(3, 4, 5, 80, 99, 110).matrix, l1.matrix)
+        assert Lattice.matrix_cache_info().currsize == 0
+    finally:
+        LATTICE_MATRIX_CACHE.maxsize = old_size
+        Lattice.clear_matrix_cache()
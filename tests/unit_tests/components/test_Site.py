@@ -9,6 +9,7 @@ from copy import deepcopy
 import easyscience
 import numpy as np
 from easycrystallography.Components.Site import Site, PeriodicSite, Parameter, _SITE_DETAILS
+from easycrystallography.Components.Specie import Specie
 from easyscience import global_object
 
 
@@ -429,4 +430,26 @@ def test_site_with_adp():
     adp = AtomicDisplacement()
     site = Site(adp=adp)
     assert hasattr(site, "adp")
-    assert site.adp is adp
\ No newline at end of file
+    assert site.adp is adp
+
+def test_Specie_cache():
+    Specie.clear_cache()
+    s1 = Specie("Fe3+")
+    s2 = Specie("Fe3+")
+    info = Specie.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+    assert s1._props is s2._props
+    assert s1.charge == 3
+    assert s1.common_name == "iron"
+    with pytest.raises(TypeError):
+        s1._props["charge"] = 2
+    s2.value = "O2-"
+    assert str(s2) == "O2-"
+    assert s2.charge == -2
+    assert s1.charge == 3
+    with pytest.raises(AttributeError):
+        s2.not_a_property
+    with pytest.raises(ValueError):
+        Specie("Xx")
+    assert Specie.cache_info().currsize == 2
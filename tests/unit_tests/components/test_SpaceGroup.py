@@ -335,3 +335,242 @@ def testSpaceGroup_from_gemmi_ops():
 
     spg = SpaceGroup.from_gemmi_operations(GroupOps(ops))
     assert spg.int_number == 15
+
+
+@pytest.mark.parametrize('point,multiplicity', [([0, 0, 0], 4),
+                                                ([0.5, 0.5, 0.5], 4),
+                                                ([0.25, 0.25, 0.25], 8),
+                                                ([0.11, 0.23, 0.37], 192)])
+def test_SpaceGroup_get_orbit(point, multiplicity):
+    sg = SpaceGroup('F m -3 m')
+    orbit = sg.get_orbit(point)
+    assert orbit.shape == (multiplicity, 3)
+    assert np.all(orbit >= 0) and np.all(orbit < 1)
+    assert np.allclose(orbit[0], point)
+
+
+def test_SpaceGroup_get_orbits():
+    sg = SpaceGroup('P 21/c')
+    points = np.array([[0, 0, 0], [0.1, 0.2, 0.3], [0.5, 0.5, 0.5]])
+    orbits, index = sg.get_orbits(points)
+    assert orbits.shape == (8, 3)
+    assert np.all(np.bincount(index) == [2, 4, 2])
+    for idx, point in enumerate(points):
+        assert np.allclose(orbits[index == idx], sg.get_orbit(point))
+    ref = SG('P2_1/c').get_orbit(points[1])
+    assert len(ref) == 4
+    for pos in ref:
+        assert np.any(np.all(np.isclose(orbits[index == 1], pos), axis=1))
+
+
+def test_SpaceGroup_symmetry_op_set():
+    from easycrystallography.Symmetry.SymOp import SymmOpSet
+    sg = SpaceGroup('P 21/c')
+    op_set = sg.symmetry_op_set
+    assert isinstance(op_set, SymmOpSet)
+    assert len(op_set) == len(sg.symmetry_ops)
+    assert op_set.as_xyz_string() == sg.symmetry_xyz.split(';')
+    assert sg.symmetry_op_set is op_set
+    rot, trans = sg.symmetry_matrices()
+    assert np.allclose(rot, op_set.rotation_matrices)
+    assert np.allclose(trans, op_set.translation_vectors)
+    sg.space_group_HM_name = 'F m -3 m'
+    assert len(sg.symmetry_op_set) == 192
+
+
+def test_SymmOpSet_batched_operations():
+    from easycrystallography.Symmetry.SymOp import SymmOpSet
+    sg = SpaceGroup('P 4/m m m')
+    ops = sg.symmetry_ops
+    op_set = SymmOpSet.from_symm_ops(ops)
+    point = np.array([0.1, 0.2, 0.3])
+    points = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]])
+    tensor = np.arange(9.).reshape((3, 3))
+    assert np.allclose(op_set.operate(point), [op.operate(point) for op in ops])
+    assert op_set.operate(points).shape == (len(ops), 2, 3)
+    assert np.allclose(op_set.apply_rotation_only(point), [op.apply_rotation_only(point) for op in ops])
+    assert np.allclose(op_set.transform_tensor(tensor), [op.transform_tensor(tensor) for op in ops])
+    assert np.allclose((op_set * op_set.inverse).affine_matrices, np.eye(4))
+    assert np.allclose((op_set * ops[1]).affine_matrices, [(op * ops[1]).affine_matrix for op in ops])
+    assert op_set[1] == ops[1]
+    assert len(op_set[1:3]) == 2
+    assert SymmOpSet.from_xyz_strings(sg.symmetry_xyz) == op_set
+    assert SymmOpSet.from_rotations_and_translations(*sg.symmetry_matrices()) == op_set
+    with pytest.raises(ValueError):
+        op_set.affine_matrices[0, 0, 0] = 2
+    with pytest.raises(ValueError):
+        op_set * op_set[0:2]
+
+
+def test_SpaceGroup_cache():
+    SpaceGroup.clear_cache()
+    sg1 = SpaceGroup('P 21/c')
+    info = SpaceGroup.cache_info()
+    assert info.misses == 1
+    assert info.hits == 0
+    sg2 = SpaceGroup('P 21/c')
+    info = SpaceGroup.cache_info()
+    assert info.hits == 1
+    assert info.currsize == 1
+    assert sg1.symmetry_op_set is sg2.symmetry_op_set
+    assert sg1.symmetry_ops is not sg2.symmetry_ops
+    assert sg1.symmetry_ops == sg2.symmetry_ops
+    with pytest.raises(ValueError):
+        sg1.symmetry_ops[0].affine_matrix[0, 0] = 2
+    with pytest.raises(ValueError):
+        SpaceGroup('P 21/x')
+    assert SpaceGroup.cache_info().currsize == 1
+    sg2.space_group_HM_name = 'F m -3 m'
+    assert sg1.hermann_mauguin == 'P 1 21/c 1'
+    assert len(sg2.symmetry_ops) == 192
+
+
+def test_SpaceGroup_find_settings_by_number():
+    assert SpaceGroup.find_settings_by_number(1) == ['1']
+    assert SpaceGroup.find_settings_by_number(167) == ['Hh', 'Rh']
+    assert SpaceGroup.find_settings_by_number(232) == []
+    settings = SpaceGroup.find_settings_by_number(14)
+    settings.append('x')
+    assert 'x' not in SpaceGroup.find_settings_by_number(14)
+
+
+def test_setting_index(tmp_path):
+    from easycrystallography.Symmetry import functions
+    sg = functions.get_spacegroup_by_name_ext(167, 'R')
+    assert sg.xhm() == 'R -3 c:R'
+    assert functions.get_spacegroup_by_name_ext(167, 'x') is None
+    assert functions.get_spacegroup_by_name_ext(2, None).hm == 'P -1'
+    assert functions.get_it_number_by_name('P 21/c') == 14
+    assert functions.get_it_number_by_name('-P 2ybc') == 14
+    assert functions.get_it_number_by_name('P 21/x') is None
+
+    path = tmp_path / 'index.json'
+    functions.save_setting_index(path)
+    assert functions.load_setting_index(path)
+    assert functions.get_spacegroup_by_name_ext(167, 'R').xhm() == 'R -3 c:R'
+    assert not functions.load_setting_index(tmp_path / 'missing.json')
+    path.write_text('{"gemmi_version": "0.0.0"}')
+    assert not functions.load_setting_index(path)
+    assert functions.get_settings_by_it_number(14) == SpaceGroup.find_settings_by_number(14)
+
+
+def test_SymmOp_canonical_key():
+    from easycrystallography.Symmetry.SymOp import SymmOp, SymmOpSet
+    op1 = SymmOp.from_xyz_string('-y+1/2, x, z+3/4')
+    op2 = SymmOp.from_xyz_string('-y-1/2, x, z-1/4')
+    op3 = SymmOp.from_xyz_string('-y+1/2, x, z+1/4')
+    assert op1.canonical_key is not None
+    assert op1.canonical_key == op2.canonical_key
+    assert op1.canonical_key != op3.canonical_key
+    assert hash(op1) == hash(op3) == op1.rotation_key
+    assert SymmOp.from_xyz_string('x+0.1234, y, z').canonical_key is None
+    assert len({op1, op3, SymmOp.from_xyz_string('-y+1/2, x, z+3/4')}) == 2
+    keys = SymmOpSet.from_symm_ops([op1, op3, SymmOp.from_xyz_string('x+0.1234, y, z')]).canonical_keys()
+    assert keys.tolist() == [op1.canonical_key, op3.canonical_key, -1]
+
+
+def test_SymmetryGroup_contains_and_eq():
+    from easycrystallography.Symmetry.SymOp import SymmOp
+    sg = SG('Fm-3m')
+    assert all(op in sg for op in sg.symmetry_ops)
+    assert SymmOp.from_xyz_string('x+1/2, y+1/2, z') in sg
+    assert SymmOp.from_xyz_string('x+1, y, z') not in sg
+    assert SymmOp.from_xyz_string('x+1/3, y, z') not in sg
+    assert sg == SG('Fm-3m')
+    assert sg != SG('Pm-3m')
+    assert len(set(sg.symmetry_ops)) == len(sg)
+
+
+def test_SpaceGroup_custom_orbit():
+    xyz = 'x,y,z;-x,-y,z+1/2;x+1/3,y,z'
+    sg = SpaceGroup.from_xyz_string(xyz)
+    assert sg.is_custom
+    assert len(sg.symmetry_op_set) == 3
+    orbit = sg.get_orbit([0.1, 0.2, 0.3])
+    assert np.allclose(orbit, [[0.1, 0.2, 0.3], [0.9, 0.8, 0.8], [0.1 + 1 / 3, 0.2, 0.3]])
+    # A tabulated space group set up from its operations is not custom
+    sg_ref = SpaceGroup('P 21/c')
+    sg_ops = SpaceGroup.from_symOps(sg_ref.symmetry_ops)
+    assert not sg_ops.is_custom
+    # Custom operations give the same orbits as the tabulated group
+    sg_custom = SpaceGroup(symmetry_ops=sg_ref.symmetry_ops)
+    assert sg_custom.is_custom
+    point = [0.1, 0.2, 0.3]
+    assert np.allclose(sg_custom.get_orbit(point), sg_ref.get_orbit(point))
+
+
+def test_SpaceGroup_orbit_cache():
+    sg = SpaceGroup('P 21/c')
+    orbit = sg.get_orbit([0.1, 0.2, 0.3])
+    assert not orbit.flags.writeable
+    assert sg.get_orbit([0.1, 0.2, 0.3]) is orbit
+    assert sg.get_orbit([0.1, 0.2, 0.4]) is not orbit
+    # Changing the operations drops the cached orbits
+    sg.symmetry_ops = [op for op in sg.symmetry_ops[:2]]
+    new_orbit = sg.get_orbit([0.1, 0.2, 0.3])
+    assert len(new_orbit) == 2
+
+
+def test_SpaceGroup_orbit_cache_bytes(monkeypatch):
+    from easycrystallography.Components import SpaceGroup as module
+    sg = SpaceGroup('P 21/c')
+    first = sg.get_orbit([0.1, 0.2, 0.3])
+    entry_bytes = sg._orbit_cache_bytes
+    monkeypatch.setattr(module, 'ORBIT_CACHE_BYTES', 3 * entry_bytes)
+    for z in (0.4, 0.5, 0.6):
+        sg.get_orbit([0.1, 0.2, z])
+    assert len(sg._orbit_cache) == 3
+    assert sg._orbit_cache_bytes == 3 * entry_bytes
+    # The least recently used orbit was dropped
+    assert sg.get_orbit([0.1, 0.2, 0.3]) is not first
+
+
+def test_SpaceGroup_orbit_cache_site():
+    from easycrystallography.Components.Site import Site
+    sg = SpaceGroup('P 21/c')
+    site = Site('Fe', 'Fe', fract_x=0.1, fract_y=0.2, fract_z=0.3)
+    orbit = sg.get_orbit(site)
+    assert sg.get_orbit(site) is orbit
+    assert np.allclose(orbit, sg.get_orbit([0.1, 0.2, 0.3]))
+    # A moved site replaces its orbit
+    for z in (0.4, 0.5, 0.6):
+        site.fract_z = z
+        assert np.allclose(sg.get_orbit(site), sg.get_orbits([0.1, 0.2, z])[0])
+    assert len(sg._orbit_cache) == 5
+    assert site.unique_name in sg._orbit_cache
+
+
+def test_SpaceGroup_orbit_cache_undo():
+    sg = SpaceGroup('P 1')
+    point = [0.11, 0.23, 0.37]
+    assert len(sg.get_orbit(point)) == 1
+    global_object.stack.enabled = True
+    try:
+        sg.space_group_HM_name = 'F m -3 m'
+        assert len(sg.symmetry_op_set.rotation_matrices) == 192
+        assert len(sg.get_orbit(point)) == 192
+        global_object.stack.undo()
+        assert len(sg.symmetry_ops) == 1
+        assert len(sg.symmetry_op_set.rotation_matrices) == 1
+        assert len(sg.get_orbit(point)) == 1
+        global_object.stack.redo()
+        assert len(sg.symmetry_ops) == 192
+        assert len(sg.symmetry_op_set.rotation_matrices) == 192
+        assert len(sg.get_orbit(point)) == 192
+    finally:
+        global_object.stack.enabled = False
+
+
+def test_SymmOp_hash_near_grid():
+    from easycrystallography.Symmetry.SymOp import SymmOp
+    on_grid = SymmOp.from_xyz_string('-y, x, z+1/3')
+    # A translation as written in a CIF file, equal within the tolerance but off the 1/24 grid
+    off_grid = SymmOp.from_xyz_string('-y, x, z+0.333')
+    assert on_grid.canonical_key is not None
+    assert off_grid.canonical_key is None
+    assert on_grid == off_grid
+    assert hash(on_grid) == hash(off_grid)
+    assert off_grid in {on_grid}
+    assert {on_grid: 1}[off_grid] == 1
+    assert len({on_grid, off_grid}) == 1
+    assert SymmOp.from_xyz_string('y, x, z+1/3') != on_grid
@@ -0,0 +1,108 @@
+# SPDX-FileCopyrightText: 2024 EasyCrystallography contributors
+# SPDX-License-Identifier: BSD-3-Clause
+# © 2022-2024 Contributors to the EasyCrystallography project <https://github.com/EasyScience/EasyCrystallography>
+
+import importlib
+import json
+import sys
+import types
+
+import pytest
+
+MODULE = 'easycrystallography.Elements.periodic_table'
+
+
+class _Descriptor:
+    def __init__(self, name, value, unit=''):
+        self.name = name
+        self.value = value
+        self.unit = unit
+
+
+@pytest.fixture
+def periodic_table(monkeypatch):
+    # The module imports `Descriptor` from `easyscience.Objects.Variable`, which newer versions of
+    # easyscience do not provide
+    try:
+        importlib.import_module('easyscience.Objects.Variable')
+    except ImportError:
+        variable = types.ModuleType('easyscience.Objects.Variable')
+        variable.Descriptor = _Descriptor
+        monkeypatch.setitem(sys.modules, 'easyscience.Objects.Variable', variable)
+    yield importlib.import_module(MODULE)
+    sys.modules.pop(MODULE, None)
+
+
+@pytest.fixture
+def table_file(tmp_path):
+    data = {
+        'H': {'Atomic no': 1, 'Name': 'Hydrogen', 'Melting point': '14.01 K'},
+        'D': {'Atomic no': 1, 'Name': 'Deuterium', 'Melting point': '18.7 K'},
+        'Fe': {'Atomic no': 26, 'Name': 'Iron', 'Melting point': '1811 K', 'Boiling point': '3134 K'},
+        'Og': {'Atomic no': 118, 'Name': 'Oganesson', 'Melting point': 'no data'},
+    }
+    path = tmp_path / 'periodic_table.json'
+    path.write_text(json.dumps(data))
+    return path
+
+
+def test_store_is_loaded_on_first_use(periodic_table, tmp_path, table_file):
+    store = periodic_table._PeriodicTableStore(str(tmp_path / 'later.json'))
+    # Nothing is read when the store is made
+    table_file.rename(tmp_path / 'later.json')
+    assert store._data is None
+    assert store.entry('Fe')['Name'] == 'Iron'
+    assert store.data is store.data
+
+
+def test_store_index(periodic_table, table_file):
+    store = periodic_table._PeriodicTableStore(str(table_file))
+    assert store.symbol_from_Z(26) == 'Fe'
+    assert store.symbol_from_Z(118) == 'Og'
+    # The first element of an atomic number is kept
+    assert store.symbol_from_Z(1) == 'H'
+    assert store.symbol_from_Z(50) is None
+    assert store._by_Z == {1: 'H', 26: 'Fe', 118: 'Og'}
+    assert store.symbol_from_row_and_group(4, 8) == 'Fe'
+    assert store.symbol_from_row_and_group(1, 1) == 'H'
+    assert store.symbol_from_row_and_group(7, 18) == 'Og'
+    assert store.symbol_from_row_and_group(2, 1) is None
+    with pytest.raises(KeyError):
+        store.entry('Zz')
+
+
+def test_store_parses_requested_properties(periodic_table, table_file, monkeypatch):
+    calls = []
+
+    def parse_property(item, val):
+        calls.append((item, val))
+        return parse(item, val)
+
+    parse = periodic_table._parse_property
+    monkeypatch.setattr(periodic_table, '_parse_property', parse_property)
+    store = periodic_table._PeriodicTableStore(str(table_file))
+    store.entry('Fe')
+    assert calls == []
+    assert store.property('Fe', 'melting_point') == ('1811', 'K')
+    assert store.property('Fe', 'melting_point') == ('1811', 'K')
+    assert store.property('Og', 'melting_point') is None
+    assert store.property('Fe', 'boiling_point') == ('3134', 'K')
+    assert calls == [('melting_point', '1811 K'), ('melting_point', 'no data'), ('boiling_point', '3134 K')]
+    assert ('H', 'melting_point') not in store._properties
+
+
+def test_element_lookups(periodic_table):
+    Element = periodic_table.Element
+    assert Element.from_Z(26) is Element.Fe
+    assert Element.from_Z(1) is Element.H
+    assert Element.from_row_and_group(4, 8) is Element.Fe
+    assert Element.from_row_and_group(2, 18) is Element.Ne
+    assert Element('Fe').Z == 26
+    assert Element('Fe').long_name == 'Iron'
+    assert Element.is_valid_symbol('Fe')
+    assert not Element.is_valid_symbol('Zebra')
+    with pytest.raises(ValueError):
+        Element.from_Z(500)
+    with pytest.raises(ValueError):
+        Element.from_row_and_group(1, 5)
+    assert all(Element.from_Z(Element(symbol).Z) is Element(symbol) for symbol in ('O', 'Fe', 'La', 'U'))
@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: 2024 EasyCrystallography contributors
+# SPDX-License-Identifier: BSD-3-Clause
+# © 2022-2024 Contributors to the EasyCrystallography project <https://github.com/EasyScience/EasyCrystallography>
+
+import pytest
+
+from easycrystallography.io.cif_parser import CIF_DOCUMENT_CACHE
+from easycrystallography.io.cif_parser import iter_cif_blocks
+from easycrystallography.io.cif_parser import read_cif_string
+from easycrystallography.io.parser import Parsers
+
+BLOCK = """data_{name}
+_cell_length_a {a}
+_cell_length_b {a}
+_cell_length_c {a}
+_cell_angle_alpha 90
+_cell_angle_beta 90
+_cell_angle_gamma 90
+_space_group_name_H-M_alt '{space_group}'
+loop_
+_atom_site_label
+_atom_site_type_symbol
+_atom_site_fract_x
+_atom_site_fract_y
+_atom_site_fract_z
+_atom_site_occupancy
+{atom} {atom} 0 0 0 1
+"""
+
+CIF = BLOCK.format(name='Cu', a=3.6, space_group='F m -3 m', atom='Cu') + BLOCK.format(
+    name='Fe', a=2.9, space_group='I m -3 m', atom='Fe'
+)
+
+
+@pytest.mark.parametrize('block_name, a, atom', [(None, 3.6, 'Cu'), ('Cu', 3.6, 'Cu'), ('Fe', 2.9, 'Fe')])
+def test_string_reader_structure(block_name, a, atom):
+    with Parsers('cif_str').reader() as r:
+        phase = r.structure(CIF, block_name=block_name)
+    assert phase.name == (block_name or 'Cu')
+    assert phase.cell.length_a.value == pytest.approx(a)
+    assert [site.label.value for site in phase.atoms] == [atom]
+
+
+def test_string_reader_structure_unknown_block():
+    with Parsers('cif_str').reader() as r:
+        with pytest.raises(ValueError):
+            r.structure(CIF, block_name='Ni')
+
+
+def test_read_cif_string_cache():
+    CIF_DOCUMENT_CACHE.clear()
+    CIF_DOCUMENT_CACHE.reset_stats()
+    document = read_cif_string(CIF)
+    assert read_cif_string(CIF) is document
+    assert read_cif_string(CIF + '\n') is not document
+    info = CIF_DOCUMENT_CACHE.info()
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+    with Parsers('cif_str').reader() as r:
+        r.structure(CIF, block_name='Fe')
+        r.structures(CIF)
+    assert CIF_DOCUMENT_CACHE.info().hits == 3
+
+
+def test_iter_cif_blocks():
+    text = '# header\n' + CIF.replace('_cell_angle_alpha', '_publ_section_comment\n;\ndata_Ni\n;\n_cell_angle_alpha', 1)
+    blocks = list(iter_cif_blocks(text.splitlines(keepends=True)))
+    assert [name for name, _ in blocks] == ['Cu', 'Fe']
+    assert ''.join(block for _, block in blocks) == text[len('# header\n') :]
+    assert [name for name, _ in iter_cif_blocks(text.splitlines(), ['Fe', 'Ni'])] == ['Fe']
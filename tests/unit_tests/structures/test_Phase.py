@@ -0,0 +1,371 @@
+# SPDX-FileCopyrightText: 2024 EasyCrystallography contributors
+# SPDX-License-Identifier: BSD-3-Clause
+# © 2022-2024 Contributors to the EasyCrystallography project <https://github.com/EasyScience/EasyCrystallography>
+
+import numpy as np
+import pytest
+
+from easycrystallography.Components.AtomsTable import AtomsTable
+from easycrystallography.Components.Lattice import Lattice
+from easycrystallography.Components.SpaceGroup import SpaceGroup
+from easycrystallography.Structures.Phase import Phase
+from easycrystallography.Structures.Phase import PhaseRecord
+from easycrystallography.Structures.Phase import Phases
+
+
+@pytest.fixture
+def phase():
+    p = Phase('phase', space_group=SpaceGroup('P n m a'))
+    p.add_atom('Fe', 'Fe', 0.1, 0.2, 0.3)
+    p.add_atom('O', 'O', 0.5, 0.25, 0)
+    return p
+
+
+@pytest.mark.parametrize('extent', [[0, 0, 0], [1, 1, 1], [2, 3, 1]])
+def test_supercell_sites(phase, extent):
+    extent = np.array(extent)
+    sites = phase.supercell_sites(extent)
+    assert sites.labels == ['Fe', 'O']
+    assert sites.positions.shape == (len(sites.site_index), 3)
+    assert np.all(sites.positions >= -phase.atom_tolerance)
+    assert np.all(sites.positions <= extent + phase.atom_tolerance)
+    for idx, site in enumerate(phase.atoms):
+        orbit = phase.space_group.get_orbit(site.fract_coords)
+        positions = sites.positions[sites.site_index == idx]
+        orbit_index = sites.orbit_index[sites.site_index == idx]
+        # every position is a translation of its orbit position
+        shift = positions - orbit[orbit_index]
+        assert np.allclose(shift, np.round(shift))
+    by_label = sites.by_label()
+    all_sites = phase.all_sites(extent)
+    assert by_label.keys() == all_sites.keys()
+    for label in all_sites:
+        assert np.array_equal(by_label[label], all_sites[label])
+
+
+def test_iter_supercell_sites(phase):
+    extent = np.array([3, 2, 4])
+    sites = phase.supercell_sites(extent)
+    chunks = list(phase.iter_supercell_sites(extent, chunk_size=50))
+    assert len(chunks) > 1
+    assert np.array_equal(np.vstack([c.positions for c in chunks]), sites.positions)
+    assert np.array_equal(np.concatenate([c.site_index for c in chunks]), sites.site_index)
+    assert np.array_equal(np.concatenate([c.orbit_index for c in chunks]), sites.orbit_index)
+
+
+def test_supercell_sites_centered(phase):
+    phase.center = [0.5, 0.2, 0.1]
+    extent = np.array([1, 2, 1])
+    positions = phase.supercell_sites(extent).positions - phase.center
+    assert len(positions) > 0
+    assert np.all(positions >= -phase.atom_tolerance)
+    assert np.all(positions <= extent + phase.atom_tolerance)
+
+
+def test_supercell_sites_no_atoms():
+    p = Phase('empty', space_group=SpaceGroup('P 1'))
+    assert p.supercell_sites().positions.shape == (0, 3)
+    assert p.all_sites() == {}
+
+
+def test_supercell_sites_no_space_group(phase):
+    phase._spacegroup = None
+    sites = phase.supercell_sites([2, 2, 2])
+    assert sites.labels == ['Fe', 'O']
+    assert np.allclose(sites.positions, [site.fract_coords for site in phase.atoms])
+    assert np.array_equal(sites.site_index, [0, 1])
+    assert np.array_equal(sites.orbit_index, [0, 0])
+    chunks = list(phase.iter_supercell_sites([2, 2, 2]))
+    assert len(chunks) == 1
+    assert np.array_equal(chunks[0].positions, sites.positions)
+    assert np.allclose(sites.positions, list(phase.all_sites().values()))
+    assert np.allclose(phase.cartesian_positions().positions, sites.positions @ phase.cell.matrix)
+
+
+def test_positions(phase):
+    extent = np.array([2, 1, 3])
+    phase.cell.length_b = 7
+    sites = phase.supercell_sites(extent)
+    fractional = phase.fractional_positions(extent)
+    assert np.array_equal(fractional.positions, sites.positions)
+    assert np.array_equal(fractional.site_index, sites.site_index)
+    assert np.array_equal(fractional.orbit_index, sites.orbit_index)
+    cartesian = phase.cartesian_positions(extent)
+    assert cartesian.positions.dtype == np.float64
+    assert np.allclose(cartesian.positions, phase.cell.get_cartesian_coords(sites.positions))
+    single = phase.cartesian_positions(extent, dtype=np.float32)
+    assert single.positions.dtype == np.float32
+    assert single.positions.flags.c_contiguous
+    assert np.allclose(single.positions, cartesian.positions, atol=1e-4)
+
+
+@pytest.mark.parametrize('center', [[0, 0, 0], [0.5, 0.2, 0.1]])
+def test_positions_chunks(phase, center):
+    phase.center = center
+    extent = np.array([3, 2, 4])
+    sites = phase.supercell_sites(extent)
+    for chunk_size in (None, 50):
+        chunked = phase.fractional_positions(extent, chunk_size=chunk_size)
+        assert np.array_equal(chunked.positions, sites.positions)
+        assert np.array_equal(chunked.site_index, sites.site_index)
+        assert np.array_equal(chunked.orbit_index, sites.orbit_index)
+    single = phase.cartesian_positions(extent, dtype=np.float32, chunk_size=50)
+    assert np.allclose(single.positions, phase.cell.get_cartesian_coords(sites.positions), atol=1e-4)
+
+
+def test_positions_out(phase):
+    n = len(phase.supercell_sites().positions)
+    out = np.full((n + 5, 3), -1, dtype=np.float32)
+    sites = phase.cartesian_positions(out=out)
+    assert np.shares_memory(sites.positions, out)
+    assert len(sites.positions) == n
+    assert np.allclose(out[:n], phase.cartesian_positions().positions, atol=1e-4)
+    assert np.all(out[n:] == -1)
+    phase.fractional_positions(out=out)
+    assert np.allclose(out[:n], phase.supercell_sites().positions)
+    with pytest.raises(ValueError):
+        phase.cartesian_positions(out=out[: n - 1])
+    with pytest.raises(ValueError):
+        phase.cartesian_positions(out=np.zeros((n, 3), dtype=int))
+    with pytest.raises(ValueError):
+        phase.fractional_positions(dtype=np.int32)
+
+
+def test_get_orbits(phase):
+    orbits = phase.get_orbits()
+    assert list(orbits.keys()) == ['Fe', 'O']
+    for site in phase.atoms:
+        assert np.allclose(orbits[site.label.value], phase.space_group.get_orbit(site.fract_coords))
+    all_orbits = phase.all_orbits(np.array([1, 1, 1]))
+    all_sites = phase.all_sites(np.array([1, 1, 1]))
+    for label in all_sites:
+        assert np.allclose(all_orbits[label], all_sites[label])
+
+
+def brute_force_structure_factors(phase, hkl):
+    # Sum over the orbit positions of every site, isotropic displacements only
+    g_star = phase.cell.reciprocal_metric_tensor
+    f = np.zeros(len(hkl), dtype=complex)
+    for h_idx, h in enumerate(hkl):
+        s2 = h @ g_star @ h / 4
+        for site in phase.atoms:
+            b = site.specie.scattering_length * site.occupancy.value
+            dw = np.exp(-8 * np.pi**2 * site.adp.Uiso.value * s2)
+            for x in phase.space_group.get_orbit(site.fract_coords):
+                f[h_idx] += b * dw * np.exp(2j * np.pi * h @ x)
+    return f
+
+
+def test_structure_factors_fcc():
+    p = Phase('Cu', space_group=SpaceGroup('F m -3 m'), cell=Lattice(3.6, 3.6, 3.6))
+    p.add_atom('Cu', 'Cu', 1, 0, 0, 0)
+    hkl = np.array([[1, 0, 0], [1, 1, 0], [1, 1, 1], [2, 0, 0], [2, 1, 0], [2, 2, 0]])
+    f = p.structure_factors(hkl)
+    allowed = np.all(hkl % 2 == hkl[:, :1] % 2, axis=1)
+    assert np.allclose(f[~allowed], 0)
+    assert np.allclose(f[allowed], 4 * p.atoms[0].specie.scattering_length)
+    f_xray = p.structure_factors(hkl, radiation='xray')
+    assert np.allclose(f_xray[~allowed], 0)
+    assert np.all(np.diff(f_xray[allowed].real) < 0)
+
+
+def test_structure_factors_brute_force(phase):
+    phase.atoms[0].adp.Uiso = 0.01
+    phase.atoms[1].adp.Uiso = 0.02
+    hkl = np.stack(np.meshgrid(*[np.arange(-2, 3)] * 3), -1).reshape(-1, 3)
+    f = phase.structure_factors(hkl, chunk_size=100)
+    assert np.allclose(f, brute_force_structure_factors(phase, hkl))
+    assert np.allclose(f, phase.structure_factors(hkl, chunk_size=None))
+
+
+def test_structure_factors_anisotropic():
+    # Equal diagonal B_ii in a tetragonal cell are an isotropic displacement
+    hkl = np.array([[1, 0, 0], [1, 2, 3], [0, 0, 4], [3, 1, 2]])
+    f = []
+    adps = ({'adp': 'Bani', 'B_11': 0.4, 'B_22': 0.4, 'B_33': 0.4}, {'adp': 'Biso', 'Biso': 0.4}, {'adp': 'Biso', 'Biso': 0})
+    for adp in adps:
+        p = Phase('p', space_group=SpaceGroup('P 4/m m m'), cell=Lattice(4, 4, 6))
+        p.add_atom('Fe', 'Fe', 1, 0.1, 0.2, 0.3, **adp)
+        f.append(p.structure_factors(hkl))
+    assert np.allclose(f[0], f[1])
+    assert np.all(np.abs(f[0]) < np.abs(f[2]))
+
+
+def test_structure_factors_unknown_radiation(phase):
+    with pytest.raises(ValueError):
+        phase.structure_factors([1, 0, 0], radiation='electron')
+
+
+def test_structure_factors_incremental(phase):
+    phase.add_atom('Fe2', 'Fe', 1, 0.3, 0.1, 0.6)
+    hkl = np.stack(np.meshgrid(*[np.arange(-2, 3)] * 3), -1).reshape(-1, 3)
+    f = phase.structure_factors(hkl)
+    assert phase.structure_factor_cache_info().misses == 3
+    assert np.array_equal(phase.structure_factors(hkl), f)
+    info = phase.structure_factor_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (3, 3, 3)
+
+    # only the changed site is recomputed
+    phase.atoms[2].fract_x = 0.35
+    phase.atoms[0].adp.Uiso = 0.02
+    f = phase.structure_factors(hkl)
+    info = phase.structure_factor_cache_info()
+    assert (info.hits, info.misses) == (4, 5)
+    phase.clear_structure_factor_cache()
+    assert np.allclose(phase.structure_factors(hkl), f)
+
+    # new reflections, removed sites and a changed cell invalidate the contributions
+    phase.structure_factors(hkl[:10])
+    assert phase.structure_factor_cache_info().misses == 11
+    phase.remove_atom('Fe2')
+    phase.structure_factors(hkl[:10])
+    assert phase.structure_factor_cache_info().currsize == 2
+    phase.cell.length_a = 5
+    f = phase.structure_factors(hkl[:10])
+    assert phase.structure_factor_cache_info().misses == 13
+    phase.clear_structure_factor_cache()
+    assert np.array_equal(phase.structure_factors(hkl[:10]), f)
+
+
+CIF = """data_{name}
+_cell_length_a 3.6
+_cell_length_b 3.6
+_cell_length_c 3.6
+_cell_angle_alpha 90
+_cell_angle_beta 90
+_cell_angle_gamma 90
+_space_group_name_H-M_alt 'F m -3 m'
+loop_
+_atom_site_label
+_atom_site_type_symbol
+_atom_site_fract_x
+_atom_site_fract_y
+_atom_site_fract_z
+_atom_site_occupancy
+Cu Cu 0 0 0 1
+"""
+
+
+def test_from_cif_file(tmp_path):
+    filename = tmp_path / 'Cu.cif'
+    filename.write_text(CIF.format(name='Cu'))
+    phases = Phases.from_cif_file(str(filename))
+    assert phases.phase_names == ['Cu']
+    assert phases[0].space_group.space_group_HM_name.value == 'F m -3 m'
+    assert phases[0].cell.length_a.value == pytest.approx(3.6)
+
+
+@pytest.mark.parametrize('executor', ['process', 'thread'])
+def test_from_cif_files(tmp_path, executor):
+    filenames = []
+    for name in ('a', 'b', 'c', 'd'):
+        filenames.append(tmp_path / f'{name}.cif')
+        filenames[-1].write_text(CIF.format(name=name))
+    (tmp_path / 'bad.cif').write_text('data_bad\nloop_ x\n')
+    filenames[1:1] = [tmp_path / 'bad.cif', tmp_path / 'missing.cif']
+    filenames.append(tmp_path / 'a.cif')
+
+    phases = Phases.from_cif_files(filenames, workers=2, executor=executor)
+    assert phases.phase_names == ['a', 'b', 'c', 'd']
+    errors = phases.load_errors
+    assert list(errors) == [str(tmp_path / 'bad.cif'), str(tmp_path / 'missing.cif'), str(tmp_path / 'a.cif')]
+    assert isinstance(errors[str(tmp_path / 'missing.cif')], FileNotFoundError)
+    assert Phases.from_cif_files(filenames, workers=1).phase_names == phases.phase_names
+
+
+def test_iter_cif_file(tmp_path):
+    filename = tmp_path / 'all.cif'
+    filename.write_text(''.join(CIF.format(name=name) for name in ('a', 'b', 'c')))
+    phases = Phases.iter_cif_file(str(filename))
+    phase = next(phases)
+    assert isinstance(phase, Phase)
+    assert phase.name == 'a'
+    assert [phase.name for phase in phases] == ['b', 'c']
+    assert [phase.name for phase in Phases.iter_cif_file(str(filename), block_names=['c', 'a'])] == ['a', 'c']
+    assert [phase.name for phase in Phases.iter_cif_string(filename.read_text(), ['b'])] == ['b']
+
+
+def test_from_cif_files_values(tmp_path):
+    import pickle
+
+    from easycrystallography.Structures.Phase import _read_cif_file
+    filename = tmp_path / 'x.cif'
+    filename.write_text(CIF_ADP.replace('_cell_length_a 5', '_cell_length_a 5.1(2)'))
+    # The workers give plain values, the phases are only created by the caller
+    values, error = _read_cif_file(str(filename))
+    assert error is None
+    assert pickle.loads(pickle.dumps(values)) == values
+    assert values[0].name == 'x'
+    assert values[0].cell[1] == {'length_a': pytest.approx(0.2)}
+    phase = Phases.from_cif_files([filename, filename.with_name('missing.cif')], workers=2)[0]
+    expected = Phases.from_cif_file(str(filename))[0]
+    assert phase.cell.length_a.error == pytest.approx(expected.cell.length_a.error)
+    assert phase.atoms['O1'].adp.adp_type.value == expected.atoms['O1'].adp.adp_type.value == 'Uani'
+    assert phase.atoms['Fe1'].msp.msp_type.value == expected.atoms['Fe1'].msp.msp_type.value
+
+
+def test_from_cif_files_unknown_executor(tmp_path):
+    with pytest.raises(ValueError):
+        Phases.from_cif_files([], executor='cluster')
+
+
+CIF_ADP = """data_x
+_cell_length_a 5
+_cell_length_b 5
+_cell_length_c 6
+_cell_angle_alpha 90
+_cell_angle_beta 90
+_cell_angle_gamma 90
+_space_group_name_H-M_alt 'P 4/m'
+loop_
+_atom_site_label
+_atom_site_type_symbol
+_atom_site_fract_x
+_atom_site_fract_y
+_atom_site_fract_z
+_atom_site_occupancy
+_atom_site_adp_type
+_atom_site_U_iso_or_equiv
+Fe1 Fe3+ 0.1 0.2 0.3 0.5 Uiso 0.01
+O1 O2- 0 0 0.5 1 Uiso 0.02
+loop_
+_atom_site_aniso_label
+_atom_site_aniso_U_11
+_atom_site_aniso_U_22
+_atom_site_aniso_U_33
+_atom_site_aniso_U_12
+_atom_site_aniso_U_13
+_atom_site_aniso_U_23
+O1 0.01 0.02 0.03 0 0 0
+loop_
+_atom_site_susceptibility_label
+_atom_site_susceptibility_chi_type
+_atom_site_susceptibility_chi_11
+_atom_site_susceptibility_chi_22
+_atom_site_susceptibility_chi_33
+_atom_site_susceptibility_chi_12
+_atom_site_susceptibility_chi_13
+_atom_site_susceptibility_chi_23
+Fe1 Cani 1 2 3 0 0 0
+"""
+
+
+def test_iter_cif_string_read_only():
+    record = next(Phases.iter_cif_string(CIF_ADP, read_only=True))
+    assert isinstance(record, PhaseRecord)
+    assert record.name == 'x'
+    assert record.space_group.space_group_HM_name.value == 'P 4/m'
+    assert record.cell.length_c.value == pytest.approx(6)
+    assert [site.label for site in record.atoms.records()] == ['Fe1', 'O1']
+
+    phase = Phase.from_cif_string(CIF_ADP)[0]
+    expected = AtomsTable.from_atoms(phase.atoms)
+    for table in (record.atoms, AtomsTable.from_atoms(record.to_phase().atoms), phase.to_record().atoms):
+        assert table.labels.tolist() == expected.labels.tolist()
+        assert table.species.tolist() == expected.species.tolist()
+        assert np.array_equal(table.fract_coords, expected.fract_coords)
+        assert np.array_equal(table.occupancies, expected.occupancies)
+        assert table.adp_types.tolist() == expected.adp_types.tolist()
+        assert np.array_equal(table.adp_values, expected.adp_values, equal_nan=True)
+        assert table.msp_types.tolist() == expected.msp_types.tolist()
+        assert np.array_equal(table.msp_values, expected.msp_values, equal_nan=True)
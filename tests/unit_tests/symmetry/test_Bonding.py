@@ -0,0 +1,106 @@
+# SPDX-FileCopyrightText: 2024 EasyCrystallography contributors
+# SPDX-License-Identifier: BSD-3-Clause
+# © 2022-2024 Contributors to the EasyCrystallography project <https://github.com/EasyScience/EasyCrystallography>
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from easycrystallography.Components.SpaceGroup import SpaceGroup
+from easycrystallography.Symmetry.Bonding import bond
+from easycrystallography.Symmetry.Bonding import bond_keys
+from easycrystallography.Symmetry.Bonding import generate_bonds
+from easycrystallography.Symmetry.Bonding import orbit_map
+from easycrystallography.Symmetry.Bonding import uniqueB
+
+
+class _Phase:
+    # The parts of a phase used by `generate_bonds`
+    def __init__(self, matrix, positions, space_group='P 1'):
+        self.cell = SimpleNamespace(matrix=np.array(matrix, dtype=float))
+        self.space_group = SpaceGroup(space_group)
+        self._positions = np.array(positions, dtype=float)
+
+    def get_orbits(self, magnetic_only=False):
+        return {'A': self._positions}
+
+
+def assert_same_bonds(b1, b2):
+    assert b1.nSym == b2.nSym
+    for key in ('dl', 'atom1', 'atom2', 'idx'):
+        assert np.array_equal(getattr(b1, key), getattr(b2, key))
+
+
+@pytest.mark.parametrize('max_distance', [3.0, 6.0])
+@pytest.mark.parametrize('max_memory', [2000, 2**30])
+def test_generate_bonds_engines_random(max_distance, max_memory):
+    rng = np.random.default_rng(0)
+    phase = _Phase([[5, 0, 0], [1, 6, 0], [0.5, 0.3, 7]], rng.random((30, 3)))
+    dense = generate_bonds(phase, force_no_sym=True, max_distance=max_distance, d_min=0, engine='dense')
+    cell_list = generate_bonds(
+        phase, force_no_sym=True, max_distance=max_distance, d_min=0, engine='cell_list', max_memory=max_memory
+    )
+    assert_same_bonds(dense, cell_list)
+    r = phase._positions
+    lengths = np.linalg.norm((r[dense.atom2] + dense.dl.T - r[dense.atom1]) @ phase.cell.matrix, axis=1)
+    assert np.all(lengths <= max_distance + 1e-5)
+    assert np.all(np.diff(lengths) >= 0)
+
+
+def test_generate_bonds_engines_symmetry():
+    phase = _Phase(4 * np.eye(3), [[0, 0, 0], [0.5, 0.5, 0], [0.5, 0, 0.5], [0, 0.5, 0.5]], 'F m -3 m')
+    dense = generate_bonds(phase, max_distance=6, engine='dense')
+    cell_list = generate_bonds(phase, max_distance=6, engine='cell_list', max_memory=5000)
+    assert_same_bonds(dense, cell_list)
+    assert dense.nSym == 4
+    # 12 nearest neighbours per atom, every bond is counted once
+    assert np.sum(dense.idx == 0) == 4 * 12 // 2
+
+
+def test_generate_bonds_unknown_engine():
+    phase = _Phase(4 * np.eye(3), [[0, 0, 0]])
+    with pytest.raises(ValueError):
+        generate_bonds(phase, engine='kd_tree')
+
+
+def test_bond_keys_fold_reverse():
+    bonds = np.array([[1, 0, -1, 0, 2], [-1, 0, 1, 2, 0], [1, 0, -1, 2, 0]]).T
+    keys = bond_keys(bonds)
+    assert keys[0] == keys[1]
+    assert keys[0] != keys[2]
+
+
+def test_orbit_map():
+    sg = SpaceGroup('P n m a')
+    r = np.vstack([sg.get_orbit(p) for p in ([0.11, 0.27, 0.39], [0.5, 0.5, 0.5])])
+    atom_idx, cell_shift = orbit_map(r, sg.symmetry_op_set)
+    assert atom_idx.shape == (len(sg.symmetry_op_set), len(r))
+    assert np.all(atom_idx >= 0)
+    # every operation permutes the atoms
+    assert np.all(np.sort(atom_idx, axis=1) == np.arange(len(r)))
+    images = sg.symmetry_op_set.operate(r)
+    assert np.allclose(images - cell_shift, r[atom_idx])
+
+
+def test_bond_unique_matches_uniqueB():
+    sg = SpaceGroup('P 4/m')
+    r = sg.get_orbit([0.1, 0.2, 0.3])
+    gen_c, un_c = bond(r, np.diag([5.0, 5.0, 7.0]), np.array([0, 0, 1, 0, 3]), sg.symmetry_op_set)
+    assert gen_c.shape[1] == len(sg.symmetry_op_set)
+    assert np.array_equal(un_c, uniqueB(gen_c))
+
+
+def test_generate_bonds_symmetry_classes():
+    sg = 'P n m a'
+    positions = np.vstack([SpaceGroup(sg).get_orbit(p) for p in ([0.11, 0.27, 0.39], [0.5, 0.5, 0.5])])
+    phase = _Phase(np.diag([6.0, 7.0, 8.0]), positions, sg)
+    bonds = generate_bonds(phase, max_distance=7, d_min=0.1)
+    lengths = np.linalg.norm(
+        (positions[bonds.atom2] + bonds.dl.T - positions[bonds.atom1]) @ phase.cell.matrix, axis=1
+    )
+    assert np.all(np.diff(bonds.idx) >= 0)
+    for idx in np.unique(bonds.idx[bonds.idx < bonds.nSym]):
+        assert np.ptp(lengths[bonds.idx == idx]) < 1e-5
+    # every bond is found once, either way round
+    assert len(set(bond_keys(np.vstack((bonds.dl, bonds.atom1, bonds.atom2))))) == len(bonds.idx)
@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: 2024 EasyCrystallography contributors
+# SPDX-License-Identifier: BSD-3-Clause
+# © 2022-2024 Contributors to the EasyCrystallography project <https://github.com/EasyScience/EasyCrystallography>
+
+import json
+
+import pytest
+
+from easycrystallography.Symmetry import database
+from easycrystallography.Symmetry.database import SymmetryDatabase
+from easycrystallography.Symmetry.database import build_symmetry_database
+
+
+@pytest.fixture(scope='module')
+def store(tmp_path_factory):
+    return build_symmetry_database(tmp_path_factory.mktemp('symm') / 'symm_db.bin')
+
+
+def test_build_round_trip(store):
+    db = SymmetryDatabase(store)
+    assert db.is_binary
+    assert not db._store['symm_ops/number::int'].flags.writeable
+    with open(database.SYMM_DATA_JSON, 'r') as fid:
+        symm_data = json.load(fid)
+    for name, section in symm_data.items():
+        assert db.symm_data(name) == section
+    with open(database.SYMM_OPS_JSON, 'r') as fid:
+        assert db.symm_ops() == json.load(fid)
+
+
+def test_sections_are_shared(store):
+    db = SymmetryDatabase(store)
+    assert db.symm_data('space_group_encoding') is db.symm_data('space_group_encoding')
+    assert db.symm_ops() is not db.symm_ops()
+
+
+def test_maximal_subgroups(store):
+    db = SymmetryDatabase(store)
+    assert db.maximal_subgroups(225) == [139, 166, 202, 209, 216, 221, 224]
+    assert 'maximal_subgroups' not in db._sections
+    assert db.maximal_subgroups(1) == [1]
+    with pytest.raises(KeyError):
+        db.maximal_subgroups(500)
+
+
+@pytest.mark.parametrize('binary', [True, False])
+def test_row_lookups(store, tmp_path, binary):
+    db = SymmetryDatabase(store if binary else tmp_path / 'missing.bin')
+    assert db.is_binary == binary
+    with open(database.SYMM_DATA_JSON, 'r') as fid:
+        symm_data = json.load(fid)
+    with open(database.SYMM_OPS_JSON, 'r') as fid:
+        symm_ops = json.load(fid)
+    for name in ('space_group_encoding', 'point_group_encoding', 'generator_matrices', 'maximal_subgroups'):
+        for key, value in symm_data[name].items():
+            assert db.symm_data_entry(name, key) == value
+        with pytest.raises(KeyError):
+            db.symm_data_entry(name, 'bad')
+    encoding = symm_data['space_group_encoding']
+    assert db.symm_data_field('space_group_encoding', 'full_symbol') == {k: v['full_symbol'] for k, v in encoding.items()}
+    assert db.space_group_symbols(166) == ['R-3m', 'R-3mH']
+    assert db.space_group_symbols(500) == []
+    record = db.symm_ops_record('P121/c1')
+    assert record == next(op for op in symm_ops if op['hermann_mauguin'] == 'P 1 21/c 1')
+    record['symops'].clear()
+    assert db.symm_ops_record('P121/c1')['symops']
+    assert db.symm_ops_record('R-3m:R')['universal_h_m'] == 'R -3 m :R'
+    with pytest.raises(KeyError):
+        db.symm_ops_record('bad')
+    if binary:
+        assert not db._sections
+
+
+def test_json_fallback(tmp_path):
+    db = SymmetryDatabase(tmp_path / 'missing.bin')
+    assert not db.is_binary
+    assert db.maximal_subgroups(225) == [139, 166, 202, 209, 216, 221, 224]
+    assert db.symm_data('translations')['A'] == '1/6'
+
+
+def test_stale_store_is_ignored(store, monkeypatch):
+    monkeypatch.setattr(database, '_SOURCE_DIGEST', 'changed')
+    assert not SymmetryDatabase(store).is_binary
+
+
+def test_store_is_built_in_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(database.CACHE_DIR_VARIABLE, str(tmp_path))
+    path = database.default_store_path()
+    assert path.parent == tmp_path
+    assert database._source_digest()[:16] in path.name
+    db = SymmetryDatabase()
+    assert db.is_binary
+    assert path.is_file()
+    assert list(tmp_path.iterdir()) == [path]
+    assert db.maximal_subgroups(225) == [139, 166, 202, 209, 216, 221, 224]
+
+
+def test_unwritable_cache_dir(tmp_path, monkeypatch):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    monkeypatch.setenv(database.CACHE_DIR_VARIABLE, str(blocker / 'cache'))
+    db = SymmetryDatabase()
+    assert not db.is_binary
+    assert db.symm_data('translations')['A'] == '1/6'
+
+
+def test_failed_build(tmp_path, monkeypatch):
+    def build(path=None):
+        raise ValueError('cannot encode')
+
+    monkeypatch.setenv(database.CACHE_DIR_VARIABLE, str(tmp_path))
+    monkeypatch.setattr(database, 'build_symmetry_database', build)
+    db = SymmetryDatabase()
+    assert not db.is_binary
+    assert db.symm_data('translations')['A'] == '1/6'
@@ -0,0 +1,96 @@
+# SPDX-FileCopyrightText: 2024 EasyCrystallography contributors
+# SPDX-License-Identifier: BSD-3-Clause
+# © 2022-2024 Contributors to the EasyCrystallography project <https://github.com/EasyScience/EasyCrystallography>
+
+import threading
+
+import pytest
+
+from easycrystallography.Utils.cache import LRUCache
+
+
+def test_LRUCache_get_put():
+    cache = LRUCache(maxsize=2)
+    assert cache.get('a') is None
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    # 'b' is the least recently used entry
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    info = cache.info()
+    assert info.hits == 1
+    assert info.misses == 1
+    assert info.evictions == 1
+    assert info.maxsize == 2
+    assert info.currsize == 2
+
+
+def test_LRUCache_get_or_create():
+    cache = LRUCache(maxsize=4)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return 'value'
+
+    assert cache.get_or_create('key', factory) == 'value'
+    assert cache.get_or_create('key', factory) == 'value'
+    assert len(calls) == 1
+    assert cache.info()[:2] == (1, 1)
+
+    def bad_factory():
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        cache.get_or_create('bad', bad_factory)
+    assert 'bad' not in cache
+
+
+def test_LRUCache_maxsize():
+    cache = LRUCache(maxsize=0)
+    assert not cache.enabled
+    cache.put('a', 1)
+    assert len(cache) == 0
+    assert cache.get_or_create('a', lambda: 2) == 2
+    assert len(cache) == 0
+
+    cache = LRUCache(maxsize=None)
+    for i in range(1000):
+        cache.put(i, i)
+    assert len(cache) == 1000
+    cache.maxsize = 10
+    assert len(cache) == 10
+    assert list(range(990, 1000)) == [i for i in range(1000) if i in cache]
+    assert cache.info().evictions == 990
+    with pytest.raises(ValueError):
+        cache.maxsize = -1
+
+
+def test_LRUCache_clear():
+    cache = LRUCache()
+    cache.put('a', 1)
+    cache.get('a')
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.info().hits == 1
+    cache.reset_stats()
+    assert cache.info()[:3] == (0, 0, 0)
+
+
+def test_LRUCache_threads():
+    cache = LRUCache(maxsize=8)
+
+    def worker():
+        for i in range(200):
+            cache.get_or_create(i % 16, lambda: object())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    info = cache.info()
+    assert info.currsize == 8
+    assert info.hits + info.misses == 800